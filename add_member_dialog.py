@@ -1,17 +1,19 @@
 # add_member_dialog.py
 
 from PySide6.QtWidgets import (
-    QDialog, QFormLayout, QLineEdit,
+    QDialog, QFormLayout, QLineEdit, QComboBox,
     QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox
 )
 
+from loan_policy_dao import MEMBER_CATEGORIES
+
 
 class AddMemberDialog(QDialog):
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("➕ Add New Member")
-        self.setFixedSize(400, 250)
+        self.setFixedSize(400, 280)
 
         self.result_data = None
 
@@ -32,10 +34,15 @@ class AddMemberDialog(QDialog):
         self.password_input.setEchoMode(QLineEdit.Password)
         self.password_input.setPlaceholderText("temp_password")
 
+        # Decides the member's loan limit, loan period and fines (LoanPolicy)
+        self.category_input = QComboBox()
+        self.category_input.addItems(MEMBER_CATEGORIES)
+
         form_layout.addRow("First Name:", self.first_name_input)
         form_layout.addRow("Last Name:", self.last_name_input)
         form_layout.addRow("Username:", self.username_input)
         form_layout.addRow("Password:", self.password_input)
+        form_layout.addRow("Category:", self.category_input)
 
         main_layout.addLayout(form_layout)
 
@@ -64,6 +71,7 @@ class AddMemberDialog(QDialog):
         if not all(data.values()):
             QMessageBox.warning(self, "Input Error", "All fields are required.")
             return
+        data['category'] = self.category_input.currentText()
 
         self.result_data = data
         self.accept()
@@ -0,0 +1,309 @@
+# api_server.py
+# Headless JSON API over the DAO layer for kiosks and self-checkout stations.
+# All clients share this process's single connection pool instead of opening their own.
+# Members sign in at /login and send the returned token as "Authorization: Bearer <token>";
+# circulation, club and member routes act for the member the token names.
+# Usage: python api_server.py [--host 127.0.0.1] [--port 8080] [--pool-size 20] [--pgbouncer]
+# Set SMARTLIBRARY_API_SECRET to share tokens between server processes (and keep them across restarts).
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from aiohttp import web
+
+import db_connector
+from book_dao import BookDAO
+from loan_dao import LoanDAO
+from bookclub_dao import BookClubDAO
+from library_errors import BusinessRuleError, NotFoundError
+from member_dao import MemberDAO
+from user_dao import UserDAO
+from records import Record
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Identical catalog pages requested within this window are served from memory
+CATALOG_CACHE_SECONDS = 5
+# Cached catalog pages kept at most; the least recently used page is dropped beyond this
+CATALOG_CACHE_ENTRIES = 256
+# Lifetime of a sign-in token; kiosks sign in again after it expires
+TOKEN_SECONDS = 30 * 60
+
+log = logging.getLogger('smartlibrary.api')
+
+
+class LibraryAPI:
+    """aiohttp handlers that run the blocking DAO calls on a worker pool sized to the connection pool."""
+
+    def __init__(self, pool_size, secret):
+        # One worker per pooled connection: the psycopg2 pool raises instead of waiting,
+        # so the executor's queue is what makes excess requests wait their turn.
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="dao")
+        self.book_dao = BookDAO()
+        self.member_dao = MemberDAO()
+        self.loan_dao = LoanDAO(self.book_dao, self.member_dao)
+        self.club_dao = BookClubDAO()
+        self.user_dao = UserDAO()
+        self.secret = secret  # HMAC key for sign-in tokens
+        self.catalog_cache = OrderedDict()  # (page, page_size) -> (expires_at, body, etag), in LRU order
+
+    def routes(self):
+        return [
+            web.get('/catalog', self.get_catalog),
+            web.get('/books/{book_id}', self.get_book),
+            web.get('/search', self.search),
+            web.post('/login', self.login),
+            web.post('/checkout', self.checkout),
+            web.post('/return', self.return_loan),
+            web.get('/clubs', self.get_clubs),
+            web.post('/clubs/{club_id}/join', self.join_club),
+            web.post('/clubs/{club_id}/leave', self.leave_club),
+            web.get('/members/me', self.get_member),
+            web.get('/members/me/home', self.get_member_home),
+        ]
+
+    async def run_dao(self, func, *args):
+        """Runs a blocking DAO call on the worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # --- Sign-in tokens ---
+
+    def issue_token(self, member_id):
+        """Signed "member_id.expires_at.signature" token; stateless, so any server sharing the secret accepts it."""
+        payload = f"{member_id}.{int(time.time()) + TOKEN_SECONDS}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def authenticated_member(self, request):
+        """The member_id of the request's bearer token. Raises 401 if it is missing, forged or expired."""
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        parts = token.strip().split('.')
+        if scheme.lower() == 'bearer' and len(parts) == 3 and all(part.isdigit() for part in parts[:2]):
+            payload = f"{parts[0]}.{parts[1]}"
+            if hmac.compare_digest(parts[2], self._sign(payload)) and int(parts[1]) > time.time():
+                return int(parts[0])
+        raise web.HTTPUnauthorized(text=json.dumps({'error': "Sign in required."}),
+                                   content_type='application/json',
+                                   headers={'WWW-Authenticate': 'Bearer'})
+
+    def _sign(self, payload):
+        return hmac.new(self.secret, payload.encode('ascii'), hashlib.sha256).hexdigest()
+
+    # --- Catalog & Search ---
+
+    async def get_catalog(self, request):
+        page = _int_param(request.query, 'page', 1, minimum=1)
+        page_size = min(_int_param(request.query, 'page_size', DEFAULT_PAGE_SIZE, minimum=1), MAX_PAGE_SIZE)
+        cache_key = (page, page_size)
+
+        cached = self.catalog_cache.get(cache_key)
+        if cached is None or cached[0] < time.monotonic():
+            books = await self.run_dao(self.book_dao.get_books_page, page_size, (page - 1) * page_size)
+            body = _dumps({'page': page, 'page_size': page_size, 'books': books}).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            cached = (time.monotonic() + CATALOG_CACHE_SECONDS, body, etag)
+            self.catalog_cache[cache_key] = cached
+        # Clients choose the page, so the cache is bounded rather than keyed without limit
+        self.catalog_cache.move_to_end(cache_key)
+        while len(self.catalog_cache) > CATALOG_CACHE_ENTRIES:
+            self.catalog_cache.popitem(last=False)
+
+        _, body, etag = cached
+        headers = {'ETag': etag, 'Cache-Control': f'max-age={CATALOG_CACHE_SECONDS}'}
+        if _etag_matches(request.headers.get('If-None-Match', ''), etag):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    async def get_book(self, request):
+        book_id = _int_param(request.match_info, 'book_id')
+        book = await self.run_dao(self.book_dao.get_book_details, book_id)
+        if book is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': f"Book ID {book_id} not found."}),
+                                   content_type='application/json')
+        return _json_response(book)
+
+    async def search(self, request):
+        term = request.query.get('q', '').strip()
+        if not term:
+            raise _bad_request("Query parameter 'q' is required.")
+        return _json_response({'books': await self.run_dao(self.book_dao.search_books, term)})
+
+    # --- Login & Circulation ---
+
+    async def login(self, request):
+        data = await _json_body(request)
+        user = await self.run_dao(self.user_dao.verify_login, data.get('username', ''), data.get('password', ''))
+        if user is None:
+            raise web.HTTPUnauthorized(text=json.dumps({'error': "Invalid username or password."}),
+                                       content_type='application/json')
+        # Kiosks serve members only; staff work from the desktop client
+        if user['role'] != 'Member':
+            raise web.HTTPForbidden(text=json.dumps({'error': "Only members can sign in at a kiosk."}),
+                                    content_type='application/json')
+        return web.json_response({'token': self.issue_token(user['user_id']), 'expires_in': TOKEN_SECONDS,
+                                  'user': user})
+
+    async def checkout(self, request):
+        member_id = self.authenticated_member(request)
+        book_id = _int_param(await _json_body(request), 'book_id')
+        loan_id = await self.run_dao(self.loan_dao.process_checkout, book_id, member_id)
+        return web.json_response({'loan_id': loan_id}, status=201)
+
+    async def return_loan(self, request):
+        member_id = self.authenticated_member(request)
+        loan_id = _int_param(await _json_body(request), 'loan_id')
+        # Members can only return their own loans
+        fine = await self.run_dao(self.loan_dao.process_return, loan_id, member_id)
+        return web.json_response({'loan_id': loan_id, 'fine': fine})
+
+    # --- Clubs & Members ---
+
+    async def get_clubs(self, request):
+        self.authenticated_member(request)
+        return _json_response({'clubs': await self.run_dao(self.club_dao.get_all_clubs)})
+
+    async def join_club(self, request):
+        member_id = self.authenticated_member(request)
+        club_id = _int_param(request.match_info, 'club_id')
+        await self.run_dao(self.club_dao.join_club, club_id, member_id)
+        return web.json_response({'club_id': club_id, 'member_id': member_id, 'joined': True})
+
+    async def leave_club(self, request):
+        member_id = self.authenticated_member(request)
+        club_id = _int_param(request.match_info, 'club_id')
+        await self.run_dao(self.club_dao.leave_club, club_id, member_id)
+        return web.json_response({'club_id': club_id, 'member_id': member_id, 'joined': False})
+
+    async def get_member(self, request):
+        member_id = self.authenticated_member(request)
+        member = await self.run_dao(self.member_dao.get_member_details, member_id)
+        if member is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': f"Member ID {member_id} not found."}),
+                                   content_type='application/json')
+        member = member.to_dict()
+        member['clubs'] = await self.run_dao(self.club_dao.get_member_clubs, member_id)
+        return _json_response(member)
+
+    async def get_member_home(self, request):
+        member_id = self.authenticated_member(request)
+        home = await self.run_dao(self.member_dao.get_member_home, member_id)
+        if home is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': f"Member ID {member_id} not found."}),
+                                   content_type='application/json')
+        return _json_response(home)
+
+
+# --- Helpers ---
+
+def _json_default(value):
+    """Serialises DAO record objects as plain JSON objects."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+_dumps = functools.partial(json.dumps, default=_json_default)
+
+
+def _json_response(data, status=200):
+    return web.json_response(data, status=status, dumps=_dumps)
+
+
+def _etag_matches(if_none_match, etag):
+    """True if an If-None-Match header (a comma-separated list of entity tags, or '*') matches etag.
+
+    If-None-Match uses the weak comparison, so W/"x" matches "x".
+    """
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def _bad_request(message):
+    return web.HTTPBadRequest(text=json.dumps({'error': message}), content_type='application/json')
+
+
+def _int_param(source, name, default=None, minimum=None):
+    value = source.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise _bad_request(f"'{name}' must be an integer.")
+    if minimum is not None and value < minimum:
+        raise _bad_request(f"'{name}' must be at least {minimum}.")
+    return value
+
+
+async def _json_body(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        raise _bad_request("Request body must be JSON.")
+    if not isinstance(data, dict):
+        raise _bad_request("Request body must be a JSON object.")
+    return data
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    """DAO refusals reach the client (404/409); anything else is logged and answered with a bare 500/503."""
+    try:
+        return await handler(request)
+    except web.HTTPException:
+        raise
+    except NotFoundError as e:
+        return web.json_response({'error': str(e)}, status=404)
+    except BusinessRuleError as e:
+        return web.json_response({'error': str(e)}, status=409)
+    except psycopg2.Error:
+        log.exception("Database error in %s %s", request.method, request.path)
+        return web.json_response({'error': "Database unavailable. Please try again."}, status=503)
+    except Exception:
+        log.exception("Unhandled error in %s %s", request.method, request.path)
+        return web.json_response({'error': "Internal server error."}, status=500)
+
+
+def create_app(pool_size, secret=None):
+    """Builds the aiohttp application with a single shared pool of pool_size connections.
+
+    secret signs the sign-in tokens; without one, a random key is used and tokens end with the process.
+    """
+    db_connector.POOL_CONFIG["max_connections"] = pool_size
+    api = LibraryAPI(pool_size, secret.encode('utf-8') if secret else secrets.token_bytes(32))
+
+    app = web.Application(middlewares=[error_middleware])
+    app.add_routes(api.routes())
+
+    async def close_pool(app):
+        api.executor.shutdown(wait=True)
+        db_connector.get_db_connector().close_connection()
+
+    app.on_cleanup.append(close_pool)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SmartLibrary kiosk API server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--pool-size', type=int, default=20,
+                        help="Postgres connections shared by all clients of this server.")
+    parser.add_argument('--pgbouncer', action='store_true',
+                        help="Connect through the transaction pooler in db_connector.POOLER_CONFIG.")
+    args = parser.parse_args()
+    db_connector.POOLER_CONFIG["enabled"] = args.pgbouncer
+
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(args.pool_size, os.environ.get('SMARTLIBRARY_API_SECRET')), host=args.host, port=args.port)
@@ -0,0 +1,413 @@
+# autocomplete_index.py
+# In-process autocomplete for the catalog search boxes: title and author word prefixes and ISBN
+# prefixes, answered from memory without a database round trip.
+#
+# Each index is a sorted array of (item slot, byte offset) suffix entries over one UTF-8 blob of
+# item texts: "The Lord of the Rings" is entered at "the lord...", "lord of...", "rings" (stop
+# words are skipped), so every word prefix is one binary search plus a short scan. Keys are the
+# blob slices folded on the fly (lower case, accents stripped), which keeps the steady state to
+# a few flat arrays: roughly 60-90 MB for 1M titles (see bench_autocomplete.py).
+# Usage: python autocomplete_index.py --build [--snapshot autocomplete.idx]
+#        python autocomplete_index.py --query "lord of"
+
+import argparse
+import array
+import bisect
+import heapq
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+
+SUGGESTION_LIMIT = 10
+# Titles and authors are entered at every word except these
+STOPWORDS = frozenset({'a', 'an', 'and', 'at', 'de', 'for', 'in', 'la', 'le', 'of', 'on', 'the', 'to', 'with'})
+# Incremental additions wait in a small sorted list; past this many they are merged into the arrays
+DELTA_LIMIT = 5000
+# Offsets are stored in one byte; words starting later than this are not entered
+MAX_ENTRY_OFFSET = 255
+# A query with at least this many digits (and only digits, hyphens and spaces) is an ISBN prefix
+ISBN_QUERY = re.compile(r'^[\d\- ]*\d[\d\- ]*\d[\d\- ]*\d[\d\- ]*[xX]?$')
+
+# ISBN suggestions read "<isbn> — <title>"; only the part before this is searched for
+DETAIL_SEPARATOR = ' — '
+
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'autocomplete.idx')
+SNAPSHOT_MAGIC = b'SLAC\x01'
+
+WORD = re.compile(r'\w+')
+
+
+def fold(data):
+    """Search key for UTF-8 bytes: lower case with accents removed (ASCII takes the fast path)."""
+    if data.isascii():
+        return data.lower()
+    text = unicodedata.normalize('NFKD', bytes(data).decode('utf-8', 'ignore'))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().encode('utf-8')
+
+
+def word_offsets(text):
+    """Byte offsets of the words an entry is made for: the start of the text and every non-stopword."""
+    offsets = [0]
+    ascii_only = text.isascii()
+    for match in WORD.finditer(text):
+        if match.start() == 0 or match.group().lower() in STOPWORDS:
+            continue
+        offset = match.start() if ascii_only else len(text[:match.start()].encode('utf-8'))
+        if offset > MAX_ENTRY_OFFSET:
+            break
+        offsets.append(offset)
+    return offsets
+
+
+def search_term(suggestion):
+    """The text a chosen suggestion should search for."""
+    return suggestion.split(DETAIL_SEPARATOR, 1)[0]
+
+
+def isbn_key(text):
+    return re.sub(r'[^0-9Xx]', '', text or '').upper()
+
+
+class _EntryKeys:
+    """Sequence view of an index's sorted keys, so bisect can search them without materialising a list."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index.entry_slots)
+
+    def __getitem__(self, position):
+        return self.index.key(self.index.entry_slots[position], self.index.entry_offsets[position])
+
+
+class _PrefixIndex:
+    """Sorted suffix entries over a blob of item texts. Item ids are caller-defined ints."""
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.text_offsets = array.array('I', [0])  # item slot i is blob[text_offsets[i]:text_offsets[i + 1]]
+        self.item_ids = array.array('i')
+        self.entry_slots = array.array('I')
+        self.entry_offsets = array.array('B')
+        self.pending = []  # sorted (key, slot, offset) added since the last merge
+        self.staged = {}  # bulk build only: first two key bytes -> packed (slot << 8 | offset) entries
+        self.removed = set()  # item ids deleted since the last rebuild
+        self.keys = _EntryKeys(self)
+
+    def __len__(self):
+        return len(self.item_ids) - len(self.removed)
+
+    def key(self, slot, offset):
+        return fold(self.blob[self.text_offsets[slot] + offset:self.text_offsets[slot + 1]])
+
+    def text(self, slot):
+        return self.blob[self.text_offsets[slot]:self.text_offsets[slot + 1]].decode('utf-8')
+
+    def _append_item(self, item_id, text):
+        self.blob += text.encode('utf-8')
+        self.text_offsets.append(len(self.blob))
+        self.item_ids.append(item_id)
+        return len(self.item_ids) - 1
+
+    # --- Building ---
+
+    def stage(self, item_id, text, offsets):
+        """Appends an item during a bulk build; its entries are sorted in by sort_staged()."""
+        slot = self._append_item(item_id, text)
+        data = self.blob[self.text_offsets[slot]:]
+        folded = data.lower() if data.isascii() else None
+        for offset in offsets:
+            bucket = bytes(folded[offset:offset + 2] if folded is not None else self.key(slot, offset)[:2])
+            self.staged.setdefault(bucket, array.array('Q')).append(slot << 8 | offset)
+
+    def sort_staged(self):
+        """Sorts the staged entries into the arrays (the index must have had no entries before).
+
+        Entries are bucketed by their first two key bytes and each bucket sorted separately, so the
+        temporary key strings never exist for the whole catalog at once.
+        """
+        for bucket in sorted(self.staged):
+            packed = self.staged.pop(bucket)
+            for entry in sorted(packed, key=lambda e: self.key(e >> 8, e & 0xFF)):
+                self.entry_slots.append(entry >> 8)
+                self.entry_offsets.append(entry & 0xFF)
+
+    def add(self, item_id, text, offsets):
+        slot = self._append_item(item_id, text)
+        for offset in offsets:
+            bisect.insort(self.pending, (self.key(slot, offset), slot, offset))
+        if len(self.pending) > DELTA_LIMIT:
+            self.merge_pending()
+
+    def remove(self, item_id):
+        self.removed.add(item_id)
+
+    def merge_pending(self):
+        """Folds the pending entries into the sorted arrays (one binary search each, then array copies)."""
+        if not self.pending:
+            return
+        positions = [bisect.bisect_left(self.keys, key) for key, _, _ in self.pending]
+        slots, offsets = array.array('I'), array.array('B')
+        previous = 0
+        for position, (_, slot, offset) in zip(positions, self.pending):
+            slots.extend(self.entry_slots[previous:position])
+            offsets.extend(self.entry_offsets[previous:position])
+            slots.append(slot)
+            offsets.append(offset)
+            previous = position
+        slots.extend(self.entry_slots[previous:])
+        offsets.extend(self.entry_offsets[previous:])
+        self.entry_slots, self.entry_offsets = slots, offsets
+        self.pending = []
+
+    # --- Querying ---
+
+    def _scan_entries(self, prefix):
+        position = bisect.bisect_left(self.keys, prefix)
+        while position < len(self.entry_slots):
+            slot, offset = self.entry_slots[position], self.entry_offsets[position]
+            key = self.key(slot, offset)
+            if not key.startswith(prefix):
+                return
+            yield key, slot
+            position += 1
+
+    def _scan_pending(self, prefix):
+        position = bisect.bisect_left(self.pending, (prefix,))
+        while position < len(self.pending):
+            key, slot, _ = self.pending[position]
+            if not key.startswith(prefix):
+                return
+            yield key, slot
+            position += 1
+
+    def lookup(self, prefix, limit):
+        """Item slots whose entries start with prefix (folded bytes), in key order, one per item."""
+        seen = set()
+        for _, slot in heapq.merge(self._scan_entries(prefix), self._scan_pending(prefix)):
+            if slot in seen or self.item_ids[slot] in self.removed:
+                continue
+            seen.add(slot)
+            yield slot
+            if len(seen) >= limit:
+                return
+
+    # --- Snapshot ---
+
+    def write(self, f):
+        self.merge_pending()
+        removed = array.array('i', sorted(self.removed))
+        for part in (self.blob, self.text_offsets, self.item_ids, self.entry_slots, self.entry_offsets, removed):
+            data = bytes(part) if isinstance(part, bytearray) else part.tobytes()
+            f.write(struct.pack('<Q', len(data)))
+            f.write(data)
+
+    def read(self, f):
+        parts = []
+        for _ in range(6):
+            (size,) = struct.unpack('<Q', f.read(8))
+            parts.append(f.read(size))
+        self.blob = bytearray(parts[0])
+        for name, typecode, data in (('text_offsets', 'I', parts[1]), ('item_ids', 'i', parts[2]),
+                                     ('entry_slots', 'I', parts[3]), ('entry_offsets', 'B', parts[4])):
+            values = array.array(typecode)
+            values.frombytes(data)
+            setattr(self, name, values)
+        removed = array.array('i')
+        removed.frombytes(parts[5])
+        self.removed = set(removed)
+
+
+class AutocompleteIndex:
+    """Title, author and ISBN suggestions for the catalog search boxes.
+
+    Title and ISBN items are books (item id = book_id, same slot in both); author items are unique
+    author names. Updates (add_book/remove_book) are meant for the GUI thread; building happens
+    once, usually on a background thread, before the index is published.
+    """
+
+    def __init__(self):
+        self.titles = _PrefixIndex()
+        self.isbns = _PrefixIndex()
+        self.authors = _PrefixIndex()
+        self.author_names = set()  # folded names already in self.authors
+        self.stamp = None
+
+    def __len__(self):
+        return len(self.titles)
+
+    @staticmethod
+    def _split_authors(authors_display):
+        if not authors_display or authors_display == "N/A":
+            return []
+        return [name.strip() for name in authors_display.split(',') if name.strip()]
+
+    def stage_rows(self, rows):
+        """Stages a batch of (book_id, title, authors_display, isbn) rows for a bulk build."""
+        for book_id, title, authors, isbn in rows:
+            self.titles.stage(book_id, title, word_offsets(title))
+            self.isbns.stage(book_id, isbn_key(isbn), [0])
+            for name in self._split_authors(authors):
+                folded = fold(name.encode('utf-8'))
+                if folded not in self.author_names:
+                    self.author_names.add(folded)
+                    self.authors.stage(0, name, word_offsets(name))
+
+    def finish_build(self):
+        for index in (self.titles, self.isbns, self.authors):
+            index.sort_staged()
+
+    def load_rows(self, rows):
+        """Builds the index from (book_id, title, authors_display, isbn) rows. Replaces any content."""
+        stamp = self.stamp
+        self.__init__()
+        self.stamp = stamp
+        self.stage_rows(rows)
+        self.finish_build()
+
+    def add_book(self, book_id, title, authors_display=None, isbn=None):
+        self.titles.add(book_id, title, word_offsets(title))
+        self.isbns.add(book_id, isbn_key(isbn), [0])
+        for name in self._split_authors(authors_display):
+            folded = fold(name.encode('utf-8'))
+            if folded not in self.author_names:
+                self.author_names.add(folded)
+                self.authors.add(0, name, word_offsets(name))
+
+    def remove_book(self, book_id):
+        """Authors stay suggestible until the next rebuild; searching them simply finds nothing."""
+        self.titles.remove(book_id)
+        self.isbns.remove(book_id)
+
+    def suggest(self, text, limit=SUGGESTION_LIMIT):
+        """Returns up to limit suggestion strings for what has been typed so far."""
+        text = text.strip()
+        if not text:
+            return []
+        if ISBN_QUERY.match(text):
+            prefix = isbn_key(text).encode('ascii')
+            return [f"{self.isbns.text(slot)}{DETAIL_SEPARATOR}{self.titles.text(slot)}"
+                    for slot in self.isbns.lookup(prefix, limit)]
+
+        prefix = fold(text.encode('utf-8'))
+        # A few author names first (they are few and specific), then titles; no duplicates
+        suggestions = [self.authors.text(slot) for slot in self.authors.lookup(prefix, max(limit // 3, 1))]
+        seen = set(suggestions)
+        for slot in self.titles.lookup(prefix, limit * 2):
+            title = self.titles.text(slot)
+            if title not in seen:
+                seen.add(title)
+                suggestions.append(title)
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+    # --- Snapshot ---
+
+    def save(self, path=DEFAULT_SNAPSHOT):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            stamp = (self.stamp or '').encode('utf-8')
+            f.write(struct.pack('<I', len(stamp)))
+            f.write(stamp)
+            for index in (self.titles, self.isbns, self.authors):
+                index.write(f)
+        os.replace(tmp, path)  # readers never see a half-written snapshot
+
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT):
+        index = cls()
+        with open(path, 'rb') as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise Exception(f"{path} is not an autocomplete snapshot.")
+            (size,) = struct.unpack('<I', f.read(4))
+            index.stamp = f.read(size).decode('utf-8') or None
+            for part in (index.titles, index.isbns, index.authors):
+                part.read(f)
+        index.author_names = {fold(index.authors.text(slot).encode('utf-8'))
+                              for slot in range(len(index.authors.item_ids))}
+        return index
+
+    @classmethod
+    def from_catalog(cls, book_dao, stamp=None):
+        """Builds the index from the database catalog, one streamed batch at a time."""
+        index = cls()
+        index.stamp = stamp or book_dao.get_catalog_stamp()
+        book_dao.stream_catalog_keys(index.stage_rows)
+        index.finish_build()
+        return index
+
+
+# --- Shared instance ---
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_autocomplete_index(wait=True, snapshot_path=DEFAULT_SNAPSHOT):
+    """Returns the process-wide index, loading the snapshot if it matches the catalog or building
+    (and saving) a new one otherwise. With wait=False, never builds: returns None until it exists."""
+    global _shared_index
+    if _shared_index is not None or not wait:
+        return _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            from book_dao import BookDAO
+            book_dao = BookDAO()
+            stamp = book_dao.get_catalog_stamp()
+            index = None
+            if os.path.exists(snapshot_path):
+                try:
+                    index = AutocompleteIndex.load(snapshot_path)
+                except Exception as e:
+                    print(f"Ignoring unreadable autocomplete snapshot: {e}")
+                if index is not None and index.stamp != stamp:
+                    index = None
+            if index is None:
+                index = AutocompleteIndex.from_catalog(book_dao, stamp)
+                try:
+                    index.save(snapshot_path)
+                except OSError as e:
+                    print(f"Could not save the autocomplete snapshot: {e}")
+            _shared_index = index
+        return _shared_index
+
+
+def warm_autocomplete_index():
+    """Thread target for startup: prepares the shared index; failures only disable suggestions."""
+    try:
+        get_autocomplete_index()
+    except Exception as e:
+        print(f"Autocomplete suggestions unavailable: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build or query the catalog autocomplete index.")
+    parser.add_argument('--build', action='store_true', help="Rebuild from the database and save the snapshot.")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('--query', help="Print suggestions for this text.")
+    args = parser.parse_args()
+
+    from db_connector import get_db_connector
+    from book_dao import BookDAO
+    try:
+        if args.build:
+            start = time.perf_counter()
+            index = AutocompleteIndex.from_catalog(BookDAO())
+            index.save(args.snapshot)
+            print(f"Indexed {len(index):,} books in {time.perf_counter() - start:.1f} s -> {args.snapshot}")
+        else:
+            index = get_autocomplete_index(snapshot_path=args.snapshot)
+        if args.query:
+            start = time.perf_counter()
+            suggestions = index.suggest(args.query)
+            print(f"{len(suggestions)} suggestion(s) in {(time.perf_counter() - start) * 1e6:.0f} µs:")
+            for suggestion in suggestions:
+                print(f"  {suggestion}")
+    finally:
+        get_db_connector().close_connection()
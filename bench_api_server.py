@@ -0,0 +1,76 @@
+# bench_api_server.py
+# Load test for api_server.py: N concurrent kiosk clients browsing the catalog and searching.
+# Start the server first (python api_server.py), then:
+#   python bench_api_server.py [--url http://127.0.0.1:8080] [--clients 200] [--duration 30]
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import aiohttp
+
+SEARCH_TERMS = ["the", "king", "love", "war", "978", "smith", "night", "house"]
+
+
+async def kiosk_client(session, base_url, deadline, pages, results):
+    """One kiosk: pages through the catalog (revalidating with ETags) and searches occasionally."""
+    etags = {}
+    while time.monotonic() < deadline:
+        if random.random() < 0.8:
+            page = random.randint(1, pages)
+            url = f"{base_url}/catalog?page={page}"
+            headers = {'If-None-Match': etags[page]} if page in etags else {}
+        else:
+            page = None
+            url = f"{base_url}/search?q={random.choice(SEARCH_TERMS)}"
+            headers = {}
+
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers) as response:
+                await response.read()
+                if page is not None and 'ETag' in response.headers:
+                    etags[page] = response.headers['ETag']
+                results.append((time.perf_counter() - start, response.status))
+        except aiohttp.ClientError:
+            results.append((time.perf_counter() - start, 'error'))
+
+
+async def run_load_test(base_url, clients, duration, pages):
+    results = []
+    deadline = time.monotonic() + duration
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(kiosk_client(session, base_url, deadline, pages, results)
+                               for _ in range(clients)))
+    return results
+
+
+def report(results, duration, clients):
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"--- 📚 SmartLibrary API Load Test ({clients} clients, {duration}s) ---")
+    print(f"Requests:      {len(results):,}")
+    print(f"Requests/sec:  {len(results) / duration:,.1f}")
+    if latencies:
+        print(f"Latency p50:   {statistics.median(latencies):.1f} ms")
+        print(f"Latency p95:   {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms")
+        print(f"Latency p99:   {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+    print("Status codes:  " + ", ".join(f"{status}: {count:,}" for status, count in sorted(statuses.items(), key=str)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the SmartLibrary API server.")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=int, default=30, help="Seconds to run.")
+    parser.add_argument('--pages', type=int, default=20, help="Catalog pages the kiosks browse.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(args.url.rstrip('/'), args.clients, args.duration, args.pages))
+    report(results, args.duration, args.clients)
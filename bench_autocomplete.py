@@ -0,0 +1,117 @@
+# bench_autocomplete.py
+# Builds the autocomplete index over N synthetic titles and reports its memory, snapshot load time
+# and suggestion latency (targets: under 100 MB for 1M titles, top-10 in well under a millisecond).
+# Needs no database: titles are synthesised from a word list with realistic author repetition.
+# Usage: python bench_autocomplete.py [--books 1000000] [--authors 50000] [--queries 2000]
+
+import argparse
+import gc
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from autocomplete_index import AutocompleteIndex
+
+MEMORY_TARGET_MB = 100
+WORDS = ("time night river house winter garden shadow light stone world secret last king queen city war "
+         "summer island child road fire sea star dark little lost glass iron silent road empire blood "
+         "heart storm forest dream mountain golden book story letters journey return song wind north "
+         "memory ghost paper silver daughter school bridge orchard harbor station crow wolf tide").split()
+FIRST_NAMES = "Anna Ben Clara David Elena Frank Grace Hugo Iris José Kate Liam Maya Noah Olga Paul Rosa Sam".split()
+LAST_NAMES = "Adams Brontë Chen Dubois Evans Fischer García Hughes Ito Jensen Kim López Müller Novak Okafor".split()
+
+
+def synthetic_rows(count, author_count):
+    """Yields (book_id, title, authors_display, isbn) rows like BookDAO.stream_catalog_keys."""
+    rng = random.Random(7)
+    authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}" for i in range(author_count)]
+    for book_id in range(1, count + 1):
+        words = rng.sample(WORDS, rng.randint(2, 6))
+        title = ("The " if rng.random() < 0.3 else "") + " of the ".join(
+            [" ".join(words[:2]), " ".join(words[2:])] if len(words) > 3 else [" ".join(words)]).title()
+        yield book_id, title, rng.choice(authors), f"978{rng.randrange(10 ** 10):010d}"
+
+
+def sample_queries(count):
+    rng = random.Random(11)
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        word = rng.choice(WORDS)
+        if kind < 0.6:
+            queries.append(word[:rng.randint(2, len(word))])
+        elif kind < 0.85:
+            queries.append(f"{word} {rng.choice(WORDS)[:2]}")
+        elif kind < 0.95:
+            queries.append(rng.choice(LAST_NAMES)[:3])
+        else:
+            queries.append(f"978{rng.randrange(10 ** 4):04d}")
+    return queries
+
+
+def index_bytes(index):
+    """Bytes held by the index's arrays, blobs and sets (the pending list is empty after a build)."""
+    total = sys.getsizeof(index.author_names) + sum(sys.getsizeof(name) for name in index.author_names)
+    for part in (index.titles, index.isbns, index.authors):
+        total += sum(sys.getsizeof(getattr(part, name)) for name in
+                     ('blob', 'text_offsets', 'item_ids', 'entry_slots', 'entry_offsets', 'removed'))
+    return total
+
+
+def time_queries(index, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure autocomplete index memory and latency.")
+    parser.add_argument('--books', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"--- 📚 SmartLibrary Autocomplete Index ({args.books:,} books) ---")
+    start = time.perf_counter()
+    index = AutocompleteIndex()
+    index.load_rows(synthetic_rows(args.books, args.authors))
+    build_seconds = time.perf_counter() - start
+    held = index_bytes(index)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(f"Build:    {build_seconds:.1f} s, {len(index):,} books, {len(index.authors.item_ids):,} authors")
+    print(f"Memory:   {held / 2**20:.1f} MiB held by the index, process peak RSS {peak_rss / 2**20:.1f} MiB")
+
+    queries = sample_queries(args.queries)
+    median, p99 = time_queries(index, queries)
+    print(f"Suggest:  median {median:.0f} µs, p99 {p99:.0f} µs over {len(queries):,} prefixes")
+
+    # Incremental updates: adds wait in the pending list; deletes are tombstones
+    start = time.perf_counter()
+    for book_id in range(args.books + 1, args.books + 1001):
+        index.add_book(book_id, f"Freshly Catalogued Volume {book_id}", "New Author", f"979{book_id:010d}")
+    index.remove_book(1)
+    print(f"Updates:  1,000 adds + 1 delete in {(time.perf_counter() - start) * 1e3:.1f} ms; "
+          f"'freshly' -> {len(index.suggest('freshly'))} suggestion(s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'autocomplete.idx')
+        index.save(path)
+        size = os.path.getsize(path)
+        del index
+        gc.collect()
+        start = time.perf_counter()
+        index = AutocompleteIndex.load(path)
+        print(f"Snapshot: {size / 2**20:.1f} MiB on disk, loaded in {time.perf_counter() - start:.2f} s")
+    median, p99 = time_queries(index, queries)
+    print(f"Suggest:  median {median:.0f} µs, p99 {p99:.0f} µs after loading the snapshot")
+
+    verdict = "✅" if held / 2**20 < MEMORY_TARGET_MB else "❌"
+    print(f"{verdict} Index memory {held / 2**20:.1f} MiB (target < {MEMORY_TARGET_MB} MB)")
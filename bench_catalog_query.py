@@ -0,0 +1,140 @@
+# bench_catalog_query.py
+# Compares the old STRING_AGG catalog query with the authors_display read (migration 0005).
+# Usage: python bench_catalog_query.py [--books 500000] [--rounds 5] [--keep]
+# WARNING: inserts synthetic books and authors (ISBNs starting with 'BENCH') and removes them
+# afterwards unless --keep is given. Run python migrate.py up first.
+
+import argparse
+import statistics
+import time
+
+from db_connector import get_db_connector
+
+BENCH_ISBN_PREFIX = "BENCH"
+
+OLD_CATALOG_QUERY = """
+    SELECT
+        b.book_id, b.title, b.isbn, b.publication_year,
+        b.total_copies, b.available_copies,
+        STRING_AGG(CONCAT(a.first_name, ' ', a.last_name), ', ') AS authors
+    FROM Book b
+    LEFT JOIN BookAuthor ba ON b.book_id = ba.book_id
+    LEFT JOIN Author a ON ba.author_id = a.author_id
+    GROUP BY b.book_id
+    ORDER BY b.title;
+"""
+
+NEW_CATALOG_QUERY = """
+    SELECT book_id, title, isbn, publication_year,
+        total_copies, available_copies, authors_display
+    FROM Book
+    ORDER BY title, book_id;
+"""
+
+
+def run_sql(connector, statements, autocommit=False):
+    conn = connector.get_connection()
+    try:
+        conn.autocommit = autocommit
+        with conn.cursor() as cursor:
+            for statement, params in statements:
+                cursor.execute(statement, params)
+        if not autocommit:
+            conn.commit()
+    except Exception as e:
+        if not autocommit:
+            conn.rollback()
+        raise e
+    finally:
+        conn.autocommit = False
+        connector.putconn(conn)
+
+
+def setup_data(connector, book_count):
+    """Adds book_count books with one to three authors each; the triggers fill authors_display."""
+    author_count = max(book_count // 10, 1)
+    run_sql(connector, [
+        ("""
+            INSERT INTO Author (first_name, last_name)
+            SELECT 'Bench', 'Author ' || g FROM generate_series(1, %s) g;
+        """, (author_count,)),
+        ("""
+            INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+            SELECT md5(g::text), %s || g, 1900 + g %% 125, 3, 3
+            FROM generate_series(1, %s) g;
+        """, (BENCH_ISBN_PREFIX, book_count)),
+        ("""
+            INSERT INTO BookAuthor (book_id, author_id)
+            SELECT DISTINCT b.book_id, a.author_id
+            FROM Book b
+            CROSS JOIN LATERAL generate_series(0, b.book_id %% 3) k
+            JOIN (
+                SELECT author_id, row_number() OVER (ORDER BY author_id) - 1 AS n
+                FROM Author WHERE first_name = 'Bench'
+            ) a ON a.n = (b.book_id * 7 + k) %% %s
+            WHERE b.isbn LIKE %s;
+        """, (author_count, BENCH_ISBN_PREFIX + '%')),
+    ])
+    # VACUUM sets the visibility map bits that make the index-only scan possible
+    run_sql(connector, [("VACUUM ANALYZE Book;", None), ("VACUUM ANALYZE BookAuthor;", None),
+                        ("VACUUM ANALYZE Author;", None)], autocommit=True)
+
+
+def teardown_data(connector):
+    """Removes everything created by setup_data."""
+    run_sql(connector, [
+        ("""
+            DELETE FROM BookAuthor WHERE book_id IN (SELECT book_id FROM Book WHERE isbn LIKE %s);
+        """, (BENCH_ISBN_PREFIX + '%',)),
+        ("DELETE FROM Book WHERE isbn LIKE %s;", (BENCH_ISBN_PREFIX + '%',)),
+        ("DELETE FROM Author WHERE first_name = 'Bench';", None),
+    ])
+
+
+def time_query(connector, query, rounds):
+    """Returns (per-round seconds, row count, plan lines) for a full catalog read."""
+    conn = connector.get_connection()
+    try:
+        timings = []
+        with conn.cursor() as cursor:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                cursor.execute(query)
+                rows = len(cursor.fetchall())
+                timings.append(time.perf_counter() - start)
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query)
+            plan = [record[0] for record in cursor.fetchall()]
+        conn.rollback()
+        return timings, rows, plan
+    finally:
+        connector.putconn(conn)
+
+
+def report(label, timings, rows, plan):
+    print(f"\n{label}: {rows:,} rows, median {statistics.median(timings) * 1000:.0f} ms, "
+          f"best {min(timings) * 1000:.0f} ms")
+    for line in plan:
+        print("    " + line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the catalog query before/after authors_display.")
+    parser.add_argument('--books', type=int, default=500_000, help="Synthetic books to add (0 to use existing data).")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help="Leave the synthetic books in place.")
+    args = parser.parse_args()
+
+    connector = get_db_connector()
+    try:
+        if args.books:
+            print(f"Seeding {args.books:,} books...")
+            setup_data(connector, args.books)
+        try:
+            print("--- 📚 SmartLibrary Catalog Query ---")
+            report("Before (STRING_AGG over BookAuthor/Author)", *time_query(connector, OLD_CATALOG_QUERY, args.rounds))
+            report("After (authors_display, covering index)", *time_query(connector, NEW_CATALOG_QUERY, args.rounds))
+        finally:
+            if args.books and not args.keep:
+                teardown_data(connector)
+    finally:
+        connector.close_connection()
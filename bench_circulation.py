@@ -0,0 +1,275 @@
+# bench_circulation.py
+# Replays circulation traffic from N librarian desks and M member kiosks directly against the DAO layer.
+# Usage:
+#   python bench_circulation.py [--desks 10] [--kiosks 40] [--duration 60] [--think-ms 200]
+#                              [--desk-mix checkout=4,return=4,search=2,catalog=1]
+#                              [--kiosk-mix login=2,catalog=3,search=4,checkout=1,join_club=1]
+#                              [--pool-size 10] [--lock-timeout-ms 2000] [--pgbouncer]
+# Runs headless against the database in db_connector.DB_CONFIG; it creates real loans and memberships.
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import psycopg2
+
+import db_connector
+from book_dao import BookDAO
+from bookclub_dao import BookClubDAO
+from library_errors import BusinessRuleError
+from loan_dao import LoanDAO
+from password_utility import plaintext_condition
+from user_dao import UserDAO
+
+SEARCH_TERMS = ["the", "king", "love", "war", "978", "smith", "night", "house"]
+
+# Postgres error codes we break out separately
+DEADLOCK = '40P01'
+LOCK_TIMEOUT = '55P03'
+QUERY_CANCELED = '57014'
+
+
+class InstrumentedConnector:
+    """Wraps the shared DBConnector to measure pool waits instead of failing when it is exhausted."""
+
+    def __init__(self, connector, max_connections, lock_timeout_ms):
+        self.connector = connector
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock_timeout_ms = lock_timeout_ms
+        self.local = threading.local()
+        self.configured = set()  # connections that already have lock_timeout set
+
+    def get_connection(self):
+        start = time.perf_counter()
+        self.slots.acquire()
+        self.local.pool_wait = time.perf_counter() - start
+        conn = self.connector.get_connection()
+        if self.lock_timeout_ms and self.connector.transaction_pooling:
+            # No session state behind the pooler: scope it to the transaction the DAO is about to run
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = %s;", (f"{self.lock_timeout_ms}ms",))
+        elif self.lock_timeout_ms and id(conn) not in self.configured:
+            with conn.cursor() as cursor:
+                cursor.execute("SET lock_timeout = %s;", (f"{self.lock_timeout_ms}ms",))
+            conn.commit()
+            self.configured.add(id(conn))
+        return conn
+
+    def putconn(self, conn):
+        self.connector.putconn(conn)
+        self.slots.release()
+
+    def last_pool_wait(self):
+        return getattr(self.local, 'pool_wait', 0.0)
+
+
+class OperationStats:
+    """Latency and outcome counters for one operation type."""
+
+    def __init__(self):
+        self.latencies = []
+        self.pool_waits = []
+        self.outcomes = {'ok': 0, 'rejected': 0, 'deadlock': 0, 'lock_timeout': 0, 'error': 0}
+
+
+class LoadTest:
+    """Runs desk and kiosk worker threads and aggregates per-operation statistics."""
+
+    def __init__(self, args):
+        self.args = args
+        db_connector.POOL_CONFIG["max_connections"] = args.pool_size
+        self.connector = InstrumentedConnector(db_connector.get_db_connector(), args.pool_size,
+                                               args.lock_timeout_ms)
+
+        self.book_dao = BookDAO()
+        self.club_dao = BookClubDAO()
+        self.user_dao = UserDAO()
+        self.loan_dao = LoanDAO(self.book_dao)
+        for dao in (self.book_dao, self.club_dao, self.user_dao, self.loan_dao,
+                    self.loan_dao.hold_dao):
+            dao.db_connector = self.connector
+
+        self.stats_lock = threading.Lock()
+        self.load_fixtures()
+
+    def load_fixtures(self):
+        """Samples the IDs and logins the workers will use."""
+        conn = self.connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT book_id FROM Book ORDER BY random() LIMIT 1000;")
+                self.book_ids = [record[0] for record in cursor.fetchall()]
+                cursor.execute("SELECT member_id FROM Member ORDER BY random() LIMIT 1000;")
+                self.member_ids = [record[0] for record in cursor.fetchall()]
+                cursor.execute("SELECT club_id FROM BookClub;")
+                self.club_ids = [record[0] for record in cursor.fetchall()]
+                # Only plaintext passwords can be replayed; bcrypt-hashed ones (password_rehash.py) cannot
+                cursor.execute(f"""
+                    SELECT u.username, u.password FROM "User" u
+                    JOIN Member m ON u.user_id = m.member_id
+                    WHERE {plaintext_condition('u.password')}
+                    ORDER BY random() LIMIT 200;
+                """)
+                self.logins = cursor.fetchall()
+            conn.rollback()
+        finally:
+            self.connector.putconn(conn)
+
+        if not self.book_ids or not self.member_ids:
+            raise Exception("The database needs at least one book and one member to run a load test.")
+        if not self.logins:
+            # After password_rehash.py nothing can be replayed; refused logins would be misleading
+            for mix in (self.args.desk_mix, self.args.kiosk_mix):
+                if mix.pop('login', None) is None:
+                    continue
+                if not mix:
+                    raise Exception("No plaintext member passwords left to replay, and the mix has only 'login'.")
+                print("⚠️ No plaintext member passwords left to replay (already rehashed): skipping 'login'.")
+
+    # --- Operations ---
+
+    def op_login(self, state):
+        username, password = random.choice(self.logins)
+        return self.user_dao.verify_login(username, password) is not None
+
+    def op_catalog(self, state):
+        self.book_dao.get_all_books()
+        return True
+
+    def op_search(self, state):
+        self.book_dao.search_books(random.choice(SEARCH_TERMS))
+        return True
+
+    def op_checkout(self, state):
+        loan_id = self.loan_dao.process_checkout(random.choice(self.book_ids), random.choice(self.member_ids))
+        state['loans'].append(loan_id)
+        return True
+
+    def op_return(self, state):
+        if not state['loans']:
+            return self.op_checkout(state)
+        self.loan_dao.process_return(state['loans'].pop(random.randrange(len(state['loans']))))
+        return True
+
+    def op_join_club(self, state):
+        if not self.club_ids:
+            return False
+        self.club_dao.join_club(random.choice(self.club_ids), random.choice(self.member_ids))
+        return True
+
+    # --- Workers ---
+
+    def worker(self, mix, deadline, results):
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        state = {'loans': []}
+        local_stats = {}
+
+        while time.monotonic() < deadline:
+            name = random.choices(names, weights)[0]
+            stats = local_stats.setdefault(name, OperationStats())
+            start = time.perf_counter()
+            try:
+                outcome = 'ok' if getattr(self, f"op_{name}")(state) else 'rejected'
+            except psycopg2.Error as e:
+                outcome = {DEADLOCK: 'deadlock', LOCK_TIMEOUT: 'lock_timeout',
+                           QUERY_CANCELED: 'lock_timeout'}.get(e.pgcode, 'error')
+            except BusinessRuleError:
+                # Max loans, no copies, club full... (NotFoundError included)
+                outcome = 'rejected'
+            except Exception:
+                # Anything else is a bug in the code under test, not a refusal
+                outcome = 'error'
+            stats.latencies.append(time.perf_counter() - start)
+            stats.pool_waits.append(self.connector.last_pool_wait())
+            stats.outcomes[outcome] += 1
+
+            if self.args.think_ms:
+                time.sleep(random.expovariate(1000.0 / self.args.think_ms))
+
+        # Leave the library as we found it
+        for loan_id in state['loans']:
+            try:
+                self.loan_dao.process_return(loan_id)
+            except Exception:
+                pass
+
+        with self.stats_lock:
+            for name, stats in local_stats.items():
+                merged = results.setdefault(name, OperationStats())
+                merged.latencies.extend(stats.latencies)
+                merged.pool_waits.extend(stats.pool_waits)
+                for outcome, count in stats.outcomes.items():
+                    merged.outcomes[outcome] += count
+
+    def run(self):
+        deadline = time.monotonic() + self.args.duration
+        results = {}
+        threads = []
+        for mix, count in ((self.args.desk_mix, self.args.desks), (self.args.kiosk_mix, self.args.kiosks)):
+            for _ in range(count):
+                thread = threading.Thread(target=self.worker, args=(mix, deadline, results), daemon=True)
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return results
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)] if values else 0.0
+
+
+def report(results, args):
+    print(f"--- 📚 SmartLibrary Load Test: {args.desks} desks, {args.kiosks} kiosks, "
+          f"{args.duration}s, pool {args.pool_size} ---")
+    header = (f"{'operation':<10} {'ops/s':>8} {'ok':>7} {'reject':>7} {'dlock':>6} {'locktmo':>7} "
+              f"{'error':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wait95 ms':>10} {'waitmax ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for name in sorted(results):
+        stats = results[name]
+        outcomes = stats.outcomes
+        print(f"{name:<10} {len(stats.latencies) / args.duration:>8.1f} {outcomes['ok']:>7} "
+              f"{outcomes['rejected']:>7} {outcomes['deadlock']:>6} {outcomes['lock_timeout']:>7} "
+              f"{outcomes['error']:>6} {statistics.median(stats.latencies) * 1000:>8.1f} "
+              f"{percentile(stats.latencies, 0.95) * 1000:>8.1f} {percentile(stats.latencies, 0.99) * 1000:>8.1f} "
+              f"{percentile(stats.pool_waits, 0.95) * 1000:>10.1f} {max(stats.pool_waits) * 1000:>10.1f}")
+
+
+def parse_mix(text):
+    """Parses 'checkout=4,return=4,search=2' into {'checkout': 4.0, ...}."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if not hasattr(LoadTest, f"op_{name.strip()}"):
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}'.")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay circulation traffic against the DAO layer.")
+    parser.add_argument('--desks', type=int, default=10)
+    parser.add_argument('--kiosks', type=int, default=40)
+    parser.add_argument('--duration', type=int, default=60, help="Seconds to run.")
+    parser.add_argument('--think-ms', type=float, default=200, help="Mean think time between operations.")
+    parser.add_argument('--desk-mix', type=parse_mix, default=parse_mix("checkout=4,return=4,search=2,catalog=1"))
+    parser.add_argument('--kiosk-mix', type=parse_mix,
+                        default=parse_mix("login=2,catalog=3,search=4,checkout=1,join_club=1"))
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help="Connections shared by all workers (DBConnector default is 10).")
+    parser.add_argument('--lock-timeout-ms', type=int, default=2000)
+    parser.add_argument('--pgbouncer', action='store_true',
+                        help="Connect through the transaction pooler in db_connector.POOLER_CONFIG.")
+    args = parser.parse_args()
+    db_connector.POOLER_CONFIG["enabled"] = args.pgbouncer
+
+    try:
+        results = LoadTest(args).run()
+        report(results, args)
+    finally:
+        db_connector.get_db_connector().close_connection()
@@ -0,0 +1,122 @@
+# bench_copy_scan.py
+# Times barcode checkout and return (LoanDAO.process_copy_checkout / process_copy_return)
+# against the 5 ms per-scan target, with a large BookCopy table behind the barcode index.
+# Usage: python bench_copy_scan.py [--copies 100000] [--rounds 500]
+# WARNING: creates (and afterwards deletes) a benchmark book, its copies and synthetic members.
+
+import argparse
+import statistics
+import time
+
+from loan_dao import LoanDAO
+from loan_policy_dao import get_loan_policies
+from copy_dao import CopyDAO
+from db_connector import get_db_connector
+
+BENCH_PREFIX = "bench_scan_"
+WARMUP_ROUNDS = 20
+
+
+def setup_data(connector, copy_count, member_count):
+    """Creates one book with copy_count barcoded copies and member_count members. Returns (book_id, member_ids)."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+                VALUES ('Benchmark Scan Title', '0000000000000', 2025, %s, %s) RETURNING book_id;
+            """, (copy_count, copy_count))
+            book_id = cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT INTO BookCopy (barcode, book_id)
+                SELECT %s || g, %s FROM generate_series(1, %s) g;
+            """, (BENCH_PREFIX, book_id, copy_count))
+
+            cursor.execute("""
+                INSERT INTO "User" (username, password, first_name, last_name, role_id)
+                SELECT %s || g, 'x', 'Bench', g::text, (SELECT role_id FROM Role WHERE role_name = 'Member')
+                FROM generate_series(1, %s) g
+                RETURNING user_id;
+            """, (BENCH_PREFIX, member_count))
+            member_ids = [record[0] for record in cursor.fetchall()]
+            cursor.execute("""
+                INSERT INTO Member (member_id, current_loans)
+                SELECT unnest(%s::int[]), 0;
+            """, (member_ids,))
+            conn.commit()
+            cursor.execute("ANALYZE BookCopy;")
+            conn.commit()
+            return book_id, member_ids
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        connector.putconn(conn)
+
+
+def teardown_data(connector, book_id):
+    """Removes everything created by setup_data."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM Loan WHERE book_id = %s;", (book_id,))
+            cursor.execute("DELETE FROM BookCopy WHERE book_id = %s;", (book_id,))
+            cursor.execute("DELETE FROM Book WHERE book_id = %s;", (book_id,))
+            cursor.execute("""
+                DELETE FROM Member WHERE member_id IN (SELECT user_id FROM "User" WHERE username LIKE %s);
+            """, (BENCH_PREFIX + '%',))
+            cursor.execute('DELETE FROM "User" WHERE username LIKE %s;', (BENCH_PREFIX + '%',))
+            conn.commit()
+    finally:
+        connector.putconn(conn)
+
+
+def time_scans(loan_dao, copy_dao, copy_count, member_ids, rounds):
+    """Each round scans a copy out to a member, looks it up, then scans it back in."""
+    lookups, checkouts, returns = [], [], []
+    for i in range(rounds):
+        barcode = f"{BENCH_PREFIX}{i % copy_count + 1}"
+        # Rotate members so nobody reaches the loan limit
+        member_id = member_ids[i % len(member_ids)]
+
+        start = time.perf_counter()
+        copy_dao.get_copy(barcode)
+        lookups.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        loan_dao.process_copy_checkout(barcode, member_id)
+        checkouts.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        loan_dao.process_copy_return(barcode)
+        returns.append((time.perf_counter() - start) * 1000)
+    return lookups, checkouts, returns
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<22} median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark barcode checkout/return latency.")
+    parser.add_argument('--copies', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    connector = get_db_connector()
+    loan_dao = LoanDAO()
+    copy_dao = CopyDAO()
+    print(f"--- 📚 SmartLibrary Barcode Scan Benchmark ({args.copies:,} copies) ---")
+
+    book_id, member_ids = setup_data(connector, args.copies, get_loan_policies().policy_for().max_loans * 10)
+    try:
+        lookups, checkouts, returns = time_scans(loan_dao, copy_dao, args.copies, member_ids,
+                                                 args.rounds + WARMUP_ROUNDS)
+        report("Barcode lookup:", lookups[WARMUP_ROUNDS:])
+        report("Checkout by scan:", checkouts[WARMUP_ROUNDS:])
+        report("Return by scan:", returns[WARMUP_ROUNDS:])
+    finally:
+        teardown_data(connector, book_id)
+        connector.close_connection()
@@ -0,0 +1,109 @@
+# bench_hold_allocation.py
+# Shows that process_return latency does not grow with the length of a book's hold queue.
+# Usage: python bench_hold_allocation.py [--holds 10000] [--rounds 200]
+# WARNING: creates (and afterwards deletes) a benchmark book and synthetic members.
+
+import argparse
+import statistics
+import time
+
+from loan_dao import LoanDAO
+from db_connector import get_db_connector
+
+BENCH_PREFIX = "bench_hold_"
+WARMUP_ROUNDS = 5
+
+
+def setup_data(connector, hold_count):
+    """Creates a one-copy bestseller and hold_count queued members. Returns (book_id, member_ids)."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+                VALUES ('Benchmark Bestseller', '0000000000000', 2025, 1, 1) RETURNING book_id;
+            """)
+            book_id = cursor.fetchone()[0]
+
+            # Synthetic members: the first one borrows, the rest queue up
+            cursor.execute("""
+                INSERT INTO "User" (username, password, first_name, last_name, role_id)
+                SELECT %s || g, 'x', 'Bench', g::text, (SELECT role_id FROM Role WHERE role_name = 'Member')
+                FROM generate_series(0, %s) g
+                RETURNING user_id;
+            """, (BENCH_PREFIX, hold_count))
+            member_ids = [record[0] for record in cursor.fetchall()]
+            cursor.execute("""
+                INSERT INTO Member (member_id, current_loans)
+                SELECT unnest(%s::int[]), 0;
+            """, (member_ids,))
+
+            # Queue everyone except the first member, in member order (FIFO by hold_id)
+            cursor.execute("""
+                INSERT INTO Hold (book_id, member_id)
+                SELECT %s, m FROM unnest(%s::int[]) WITH ORDINALITY AS t(m, n) ORDER BY n;
+            """, (book_id, member_ids[1:]))
+            conn.commit()
+            return book_id, member_ids
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        connector.putconn(conn)
+
+
+def teardown_data(connector, book_id):
+    """Removes everything created by setup_data."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM Hold WHERE book_id = %s;", (book_id,))
+            cursor.execute("DELETE FROM Loan WHERE book_id = %s;", (book_id,))
+            cursor.execute("DELETE FROM Book WHERE book_id = %s;", (book_id,))
+            cursor.execute("""
+                DELETE FROM Member WHERE member_id IN (SELECT user_id FROM "User" WHERE username LIKE %s);
+            """, (BENCH_PREFIX + '%',))
+            cursor.execute('DELETE FROM "User" WHERE username LIKE %s;', (BENCH_PREFIX + '%',))
+            conn.commit()
+    finally:
+        connector.putconn(conn)
+
+
+def time_returns(loan_dao, book_id, member_ids, rounds):
+    """Each round: the member at the head of the queue borrows, then returns (allocating to the next)."""
+    timings = []
+    for i in range(rounds):
+        loan_id = loan_dao.process_checkout(book_id, member_ids[i % len(member_ids)])
+        start = time.perf_counter()
+        loan_dao.process_return(loan_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark return latency against hold queue length.")
+    parser.add_argument('--holds', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    connector = get_db_connector()
+    loan_dao = LoanDAO()
+    print("--- 📚 SmartLibrary Hold Allocation Benchmark ---")
+
+    for queue_length in (0, args.holds):
+        book_id, member_ids = setup_data(connector, queue_length)
+        try:
+            # In the queued run each round is served by the next member in line
+            rounds = args.rounds if queue_length == 0 else min(args.rounds, len(member_ids) - WARMUP_ROUNDS)
+            timings = time_returns(loan_dao, book_id, member_ids, rounds + WARMUP_ROUNDS)
+            report(f"Return with {queue_length} queued:", timings[WARMUP_ROUNDS:])
+        finally:
+            teardown_data(connector, book_id)
+
+    connector.close_connection()
@@ -0,0 +1,91 @@
+# bench_kiosk_switch.py
+# Member-to-member turnaround on a shared kiosk: rebuilding MemberMainWidget per login (the old
+# behaviour) vs logging out and rebinding the existing screen (SmartLibraryApp.logout + bind_member).
+# Usage: python bench_kiosk_switch.py [--rounds 50]
+# Target: rebinding under 200 ms. Runs headless (QT_QPA_PLATFORM=offscreen); read-only.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from db_connector import get_db_connector
+from main import SmartLibraryApp
+from member_main_widget import MemberMainWidget
+
+TURNAROUND_TARGET_MS = 200
+
+
+def sample_members(count):
+    connector = get_db_connector()
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT member_id FROM Member ORDER BY member_id LIMIT %s;", (count,))
+            return [record[0] for record in cursor.fetchall()]
+    finally:
+        connector.putconn(conn)
+
+
+def time_rebuild(window, member_ids):
+    timings = []
+    for member_id in member_ids:
+        start = time.perf_counter()
+        widget = MemberMainWidget(window, member_id)
+        window.stack.addWidget(widget)
+        window.stack.setCurrentWidget(widget)
+        QApplication.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+        window.stack.removeWidget(widget)
+        widget.deleteLater()
+    return timings
+
+
+def time_rebind(window, member_ids):
+    window.current_user = {'user_id': member_ids[0], 'role': 'Member'}
+    window.member_main_widget = MemberMainWidget(window, member_ids[0])
+    window.stack.addWidget(window.member_main_widget)
+    timings = []
+    for member_id in member_ids:
+        start = time.perf_counter()
+        window.logout()
+        window.current_user = {'user_id': member_id, 'role': 'Member'}
+        window.member_main_widget.bind_member(member_id)
+        window.stack.setCurrentWidget(window.member_main_widget)
+        QApplication.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} median {statistics.median(timings):7.1f} ms   p95 {p95:7.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark kiosk member switching.")
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    try:
+        window = SmartLibraryApp()
+        window.show()
+        member_ids = sample_members(args.rounds)
+        if not member_ids:
+            raise Exception("The database needs at least one member.")
+
+        print(f"--- 📚 SmartLibrary Kiosk Switch Benchmark ({len(member_ids)} logins) ---")
+        report("Rebuild screen per login:", time_rebuild(window, member_ids))
+        rebind = time_rebind(window, member_ids)
+        report("Logout + rebind in place:", rebind)
+        verdict = "✅ within" if statistics.median(rebind) < TURNAROUND_TARGET_MS else "❌ over"
+        print(f"{verdict} the {TURNAROUND_TARGET_MS} ms turnaround target.")
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,98 @@
+# bench_notification_dispatch.py
+# Plans and sends due-soon reminders for N synthetic members into a local SMTP sink and reports
+# throughput (target: 50k messages in a few minutes).
+# Usage: python bench_notification_dispatch.py [--members 50000] [--concurrency 20] [--batch-size 1000]
+# WARNING: creates (and afterwards deletes) a benchmark book, synthetic members, loans and notifications.
+
+import argparse
+import asyncio
+import datetime
+import time
+
+from db_connector import get_db_connector
+from notification_dispatcher import NotificationDispatcher, DUE_SOON_DAYS
+from test_notification_dispatcher import start_sink, SINK_HOST, SINK_PORT
+
+BENCH_PREFIX = "bench_notice_"
+
+
+def setup_data(connector, member_count, due_date):
+    """Creates member_count members with an email and one loan due on due_date. Returns the book_id."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+                VALUES ('Benchmark Notice Title', '0000000000001', 2025, %s, 0) RETURNING book_id;
+            """, (member_count,))
+            book_id = cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT INTO "User" (username, password, first_name, last_name, email, role_id)
+                SELECT %s || g, 'x', 'Bench', g::text, %s || g || '@example.test',
+                    (SELECT role_id FROM Role WHERE role_name = 'Member')
+                FROM generate_series(1, %s) g;
+            """, (BENCH_PREFIX, BENCH_PREFIX, member_count))
+            cursor.execute("""
+                INSERT INTO Member (member_id, current_loans)
+                SELECT user_id, 1 FROM "User" WHERE username LIKE %s;
+            """, (BENCH_PREFIX + '%',))
+            cursor.execute("""
+                INSERT INTO Loan (book_id, member_id, loan_date, due_date)
+                SELECT %s, user_id, %s::date - 7, %s FROM "User" WHERE username LIKE %s;
+            """, (book_id, due_date, due_date, BENCH_PREFIX + '%'))
+            conn.commit()
+            return book_id
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        connector.putconn(conn)
+
+
+def teardown_data(connector, book_id):
+    """Removes everything created by setup_data and the notifications sent to it."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM Loan WHERE book_id = %s;", (book_id,))
+            cursor.execute("""
+                DELETE FROM Member WHERE member_id IN (SELECT user_id FROM "User" WHERE username LIKE %s);
+            """, (BENCH_PREFIX + '%',))
+            cursor.execute('DELETE FROM "User" WHERE username LIKE %s;', (BENCH_PREFIX + '%',))
+            cursor.execute("DELETE FROM Book WHERE book_id = %s;", (book_id,))
+            conn.commit()
+    finally:
+        connector.putconn(conn)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the notification dispatcher against a local SMTP sink.")
+    parser.add_argument('--members', type=int, default=50_000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    connector = get_db_connector()
+    # A date far from real loans, so only the synthetic ones are due
+    run_date = datetime.date(2099, 1, 1)
+    due_date = run_date + datetime.timedelta(days=DUE_SOON_DAYS)
+    print(f"--- 📚 SmartLibrary Notification Benchmark ({args.members:,} members, "
+          f"{args.concurrency} SMTP connections) ---")
+
+    book_id = setup_data(connector, args.members, due_date)
+    controller, sink = start_sink()
+    try:
+        dispatcher = NotificationDispatcher(args.concurrency, args.batch_size,
+                                            {'host': SINK_HOST, 'port': SINK_PORT})
+        start = time.perf_counter()
+        queued = dispatcher.plan(run_date)
+        print(f"Plan:     {queued:,} notifications in {time.perf_counter() - start:.2f} s (one query)")
+
+        summary = asyncio.run(dispatcher.dispatch())
+        print(f"Dispatch: {summary['sent']:,} sent, {summary['failed']} failed, {summary['retry_later']} deferred "
+              f"in {summary['seconds']} s ({summary['per_second']:,} msg/s)")
+        print(f"Sink received {len(sink.messages):,} message(s).")
+    finally:
+        controller.stop()
+        teardown_data(connector, book_id)  # Notification rows go with their members (ON DELETE CASCADE)
+        connector.close_connection()
@@ -0,0 +1,47 @@
+# bench_password_rehash.py
+# Measures bcrypt throughput of password_rehash.py's worker pool against one thread pool of the same size.
+# Needs no database: passwords are synthesised and hashed with password_utility.hash_passwords.
+# Usage: python bench_password_rehash.py [--passwords 256] [--rounds 10] [--workers 1 2 4 8]
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from password_utility import DEFAULT_ROUNDS, hash_passwords
+
+BATCH_SIZE = 16
+
+
+def measure(executor, rows, rounds):
+    """Hashes rows in BATCH_SIZE tasks. Returns hashes/second."""
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    start = time.perf_counter()
+    hashed = sum(len(result) for result in executor.map(hash_passwords, batches, [rounds] * len(batches)))
+    return hashed / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure bcrypt rehash throughput per worker count.")
+    parser.add_argument('--passwords', type=int, default=256)
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS - 2,
+                        help="bcrypt cost (lower than production to keep the run short).")
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    rows = [(user_id, f"member{user_id}pass") for user_id in range(args.passwords)]
+    context = multiprocessing.get_context('spawn')
+
+    print(f"--- 📚 SmartLibrary Password Rehash ({args.passwords} passwords, cost {args.rounds}, "
+          f"{os.cpu_count()} core(s)) ---")
+    print(f"{'workers':>8} {'threads h/s':>12} {'procs h/s':>12} {'per core':>10}")
+    for workers in args.workers:
+        with ThreadPoolExecutor(workers) as executor:
+            thread_rate = measure(executor, rows, args.rounds)
+        with ProcessPoolExecutor(workers, mp_context=context) as executor:
+            # Process start-up and the bcrypt import are not part of the hashing rate
+            list(executor.map(hash_passwords, [[(0, "warm-up")]] * workers, [4] * workers))
+            process_rate = measure(executor, rows, args.rounds)
+        print(f"{workers:>8} {thread_rate:>12.1f} {process_rate:>12.1f} {process_rate / workers:>10.1f}")
@@ -0,0 +1,90 @@
+# bench_pgbouncer.py
+# Compares Postgres connection counts and throughput for N client processes (each with its own
+# DBConnector pool, like N desk/kiosk apps) connecting directly vs through PgBouncer in
+# transaction mode.
+# Usage: python bench_pgbouncer.py [--clients 60] [--pool-size 2] [--server-connections 10] [--duration 20]
+# Read-only workload (catalog page, search, member details); requires the pgbouncer binary.
+
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+
+import db_connector
+from book_dao import BookDAO
+from member_dao import MemberDAO
+from local_pgbouncer import LocalPgBouncer
+from test_pgbouncer_mode import count_server_backends
+
+
+def client_process(use_pooler, pool_size, duration, results):
+    """One client application: pool_size threads sharing one DBConnector, for duration seconds."""
+    db_connector.POOLER_CONFIG["enabled"] = use_pooler
+    db_connector.POOL_CONFIG["max_connections"] = pool_size
+    book_dao = BookDAO()
+    member_dao = MemberDAO()
+    operations = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        count = 0
+        while time.monotonic() < deadline:
+            choice = random.random()
+            if choice < 0.4:
+                book_dao.get_books_page(20, random.randrange(0, 1000))
+            elif choice < 0.7:
+                book_dao.search_books(random.choice(["the", "war", "love", "night"]))
+            else:
+                member_dao.get_member_details(random.randrange(1, 1000))
+            count += 1
+        with lock:
+            operations[0] += count
+
+    threads = [threading.Thread(target=worker) for _ in range(pool_size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db_connector.get_db_connector().close_connection()
+    results.put(operations[0])
+
+
+def run_round(use_pooler, clients, pool_size, duration):
+    """Returns (operations per second, peak server backends opened by the clients)."""
+    baseline = count_server_backends()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client_process, args=(use_pooler, pool_size, duration, results))
+                 for _ in range(clients)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    peak = 0
+    while any(process.is_alive() for process in processes):
+        peak = max(peak, count_server_backends() - baseline)
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total / elapsed, peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark direct connections against PgBouncer transaction pooling.")
+    parser.add_argument('--clients', type=int, default=60, help="Client processes.")
+    parser.add_argument('--pool-size', type=int, default=2, help="Connections (and threads) per client.")
+    parser.add_argument('--server-connections', type=int, default=10, help="PgBouncer default_pool_size.")
+    parser.add_argument('--duration', type=int, default=20, help="Seconds per round.")
+    args = parser.parse_args()
+
+    print(f"--- 📚 SmartLibrary Connection Pooling Benchmark ({args.clients} clients x {args.pool_size}) ---")
+    direct = run_round(False, args.clients, args.pool_size, args.duration)
+    print(f"Direct to Postgres:   {direct[0]:8.0f} ops/s   peak server connections {direct[1]}")
+
+    with LocalPgBouncer(server_connections=args.server_connections, max_clients=args.clients * args.pool_size + 10):
+        pooled = run_round(True, args.clients, args.pool_size, args.duration)
+    print(f"Through PgBouncer:    {pooled[0]:8.0f} ops/s   peak server connections {pooled[1]}")
@@ -0,0 +1,63 @@
+# bench_record_memory.py
+# Compares the memory held by a large catalog result set as per-row dicts vs slotted BookRecords.
+# Needs no database: rows are synthesised with a realistic mix of repeated author strings.
+# Usage: python bench_record_memory.py [--rows 200000] [--authors 50000]
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from records import BookRecord, intern_text
+
+
+def synthetic_rows(count, author_count):
+    """Yields (book_id, title, isbn, year, total, available, authors) tuples like the catalog query."""
+    rng = random.Random(42)
+    for book_id in range(1, count + 1):
+        # Build the author string fresh per row, as psycopg2 does when decoding a result
+        author = rng.randrange(author_count)
+        authors = f"Author {author}" if author % 5 else f"Author {author}, Author {author + 1}"
+        total = rng.randint(1, 5)
+        yield (book_id, f"Title {book_id}", f"978{book_id:010d}", rng.randint(1900, 2024),
+               total, rng.randint(0, total), authors)
+
+
+def as_dict(record):
+    return {
+        'book_id': record[0], 'title': record[1], 'isbn': record[2],
+        'year': record[3], 'total_copies': record[4],
+        'available_copies': record[5], 'authors': record[6] if record[6] else "N/A"
+    }
+
+
+def as_record(record):
+    return BookRecord(record[0], record[1], record[2], record[3], record[4], record[5],
+                      intern_text(record[6]) if record[6] else "N/A")
+
+
+def measure(label, build, rows, author_count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = [build(record) for record in synthetic_rows(rows, author_count)]
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {current / 2**20:>10.1f} {peak / 2**20:>10.1f} {current / rows:>10.1f} {elapsed:>8.2f}")
+    del result
+    return current
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure dict vs slotted-record result set memory.")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--authors', type=int, default=50_000, help="Distinct authors in the synthetic catalog.")
+    args = parser.parse_args()
+
+    print(f"--- 📚 SmartLibrary Result Set Memory ({args.rows:,} books) ---")
+    print(f"{'row type':<12} {'held MiB':>10} {'peak MiB':>10} {'bytes/row':>10} {'build s':>8}")
+    dict_bytes = measure("dict", as_dict, args.rows, args.authors)
+    record_bytes = measure("BookRecord", as_record, args.rows, args.authors)
+    print(f"BookRecord rows hold {100 * (1 - record_bytes / dict_bytes):.0f}% less memory than dicts.")
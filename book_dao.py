@@ -2,6 +2,14 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
+from records import BookRecord, WeedResultRecord, intern_text
+
+# Deleted-book tombstones are kept this long (migration 0010); older snapshots must be rebuilt
+TOMBSTONE_RETENTION_DAYS = 30
+
+# Books deleted per weeding transaction: keeps row locks and WAL per commit bounded
+WEED_BATCH_SIZE = 500
 
 
 class BookDAO:
@@ -15,34 +23,139 @@ class BookDAO:
         conn = self.db_connector.get_connection()
         try:
             with conn.cursor() as cursor:
+                # Index-only scan of book_catalog_covering_idx (migration 0005)
                 query = """
-                    SELECT 
-                        b.book_id, b.title, b.isbn, b.publication_year, 
-                        b.total_copies, b.available_copies, 
-                        STRING_AGG(CONCAT(a.first_name, ' ', a.last_name), ', ') AS authors
-                    FROM Book b
-                    LEFT JOIN BookAuthor ba ON b.book_id = ba.book_id
-                    LEFT JOIN Author a ON ba.author_id = a.author_id
-                    GROUP BY b.book_id
-                    ORDER BY b.title;
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    ORDER BY title, book_id;
                 """
                 cursor.execute(query)
                 records = cursor.fetchall()
 
-                books = []
-                for record in records:
-                    books.append({
-                        'book_id': record[0], 'title': record[1], 'isbn': record[2],
-                        'year': record[3], 'total_copies': record[4],
-                        'available_copies': record[5], 'authors': record[6] if record[6] else "N/A"
-                    })
-                return books
+                return [self._book_from_record(record) for record in records]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    @staticmethod
+    def _book_from_record(record):
+        """Maps a (book_id, title, isbn, year, total, available, authors) row to a BookRecord."""
+        # Author lists repeat across a catalog; interning makes equal lists share one string
+        return BookRecord(record[0], record[1], record[2], record[3], record[4], record[5],
+                          intern_text(record[6]) if record[6] else "N/A")
+
+    def get_books_page(self, limit, offset=0):
+        """Fetches one page of the catalog, ordered by title."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    ORDER BY title, book_id
+                    LIMIT %s OFFSET %s;
+                """
+                cursor.execute(query, (limit, offset))
+                return [self._book_from_record(record) for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_book_details(self, book_id):
+        """Fetches a single book with its authors."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    WHERE book_id = %s;
+                """
+                cursor.execute(query, (book_id,))
+                record = cursor.fetchone()
+                return self._book_from_record(record) if record else None
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             self.db_connector.putconn(conn)
 
+    @staticmethod
+    def _contains_pattern(search_term):
+        """LIKE pattern matching search_term anywhere, with its own %, _ and \\ taken literally."""
+        escaped = search_term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"%{escaped}%"
+
+    def search_books(self, search_term):
+        """Finds books whose title, ISBN or author list contains the search term."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    WHERE title ILIKE %(pattern)s OR isbn LIKE %(pattern)s
+                        OR authors_display ILIKE %(pattern)s
+                    ORDER BY title, book_id;
+                """
+                cursor.execute(query, {'pattern': self._contains_pattern(search_term)})
+                return [self._book_from_record(record) for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def stream_search_books(self, search_term, on_batch, batch_size=200, timeout_ms=5000, on_connection=None):
+        """Runs search_books' query through a server-side cursor, handing rows to on_batch as they arrive.
+
+        on_connection(conn) is called once the query owns a connection so another thread can
+        conn.cancel() it; on_batch returning False stops the fetch early. Returns the row count.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            if on_connection:
+                on_connection(conn)
+            with conn.cursor() as cursor:
+                # SET LOCAL: scoped to this transaction, never leaks into the pooled session
+                cursor.execute("SET LOCAL statement_timeout = %s;", (int(timeout_ms),))
+            with conn.cursor(name='stream_search_cursor') as cursor:
+                query = """
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    WHERE title ILIKE %(pattern)s OR isbn LIKE %(pattern)s
+                        OR authors_display ILIKE %(pattern)s
+                    ORDER BY title, book_id;
+                """
+                cursor.execute(query, {'pattern': self._contains_pattern(search_term)})
+
+                total = 0
+                while True:
+                    records = cursor.fetchmany(batch_size)
+                    if not records:
+                        break
+                    total += len(records)
+                    if on_batch([self._book_from_record(record) for record in records]) is False:
+                        break
+            conn.rollback()  # read-only; ends the transaction and closes the cursor
+            return total
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            if on_connection:
+                on_connection(None)
+            self.db_connector.putconn(conn)
+
     def get_book_availability(self, book_id):  # <-- FIX: Implements missing method
         """Checks the available copies for a specific book."""
         conn = self.db_connector.get_connection()
@@ -60,30 +173,304 @@ class BookDAO:
 
     def delete_book_by_id(self, book_id):
         """Deletes a book (and related entries in BookAuthor) by ID."""
+        # Same path as bulk weeding, so the book is archived and its loan history keeps the title
+        result = self.weed_books([book_id])['report'][0]
+        if result.status == 'ACTIVE_LOANS':
+            raise BusinessRuleError(f"Cannot delete Book ID {book_id}. It has {result.active_loans} active loan(s).")
+        if result.status == 'NOT_FOUND':
+            raise NotFoundError(f"Book ID {book_id} not found.")
+        return True
+
+    def find_weeding_candidates(self, not_borrowed_years=None, published_before=None):
+        """Fetches the books matching every given weeding criterion, by book_id.
+
+        not_borrowed_years: no loan (open, returned or archived) started in that many years.
+        published_before: publication_year is earlier than this year.
+        """
+        if not_borrowed_years is None and published_before is None:
+            raise BusinessRuleError("Choose at least one weeding criterion.")
         conn = self.db_connector.get_connection()
         try:
             with conn.cursor() as cursor:
-                # Check for active loans
-                check_query = "SELECT COUNT(*) FROM Loan WHERE book_id = %s AND return_date IS NULL;"
-                cursor.execute(check_query, (book_id,))
-                active_loans = cursor.fetchone()[0]
+                conditions = []
+                if published_before is not None:
+                    conditions.append("b.publication_year < %(published_before)s")
+                if not_borrowed_years is not None:
+                    # Archived loans count too once loan_partition_manager has created LoanHistory
+                    cursor.execute("SELECT to_regclass('loanhistory') IS NOT NULL;")
+                    loans = "LoanHistory" if cursor.fetchone()[0] else "Loan"
+                    # One hash anti-join against the recent loans (only the recent partitions are scanned)
+                    conditions.append(f"""NOT EXISTS (
+                        SELECT 1 FROM {loans} l
+                        WHERE l.book_id = b.book_id
+                          AND l.loan_date >= CURRENT_DATE - make_interval(years => %(years)s))""")
+                query = f"""
+                    SELECT b.book_id, b.title, b.isbn, b.publication_year,
+                        b.total_copies, b.available_copies, b.authors_display
+                    FROM Book b
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY b.book_id;
+                """
+                cursor.execute(query, {'published_before': published_before, 'years': not_borrowed_years})
 
-                if active_loans > 0:
-                    raise Exception(f"Cannot delete Book ID {book_id}. It has {active_loans} active loan(s).")
+                return [self._book_from_record(record) for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def weed_books(self, book_ids, batch_size=WEED_BATCH_SIZE, on_progress=None):
+        """Deletes many books at once, skipping those with active loans.
+
+        Each batch of batch_size ids is one short transaction. Deleted books are archived in
+        WeededBook (their closed loans stay in the members' history), BookAuthor rows cascade and
+        authors left without books are deleted. on_progress(done, total) is called per batch.
+        Returns {'weeded', 'blocked', 'not_found', 'authors_removed', 'report'}, where report
+        holds a WeedResultRecord for every requested id.
+        """
+        book_ids = sorted(set(book_ids))
+        report = []
+        authors_removed = 0
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start:start + batch_size]
+            conn = self.db_connector.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    # Lock the batch (in id order, so concurrent weedings cannot deadlock). A checkout
+                    # of one of these books has either committed, and its loan is seen below, or
+                    # waits for this transaction and then finds the book gone.
+                    cursor.execute(
+                        "SELECT book_id, title FROM Book WHERE book_id = ANY(%s) ORDER BY book_id FOR UPDATE;",
+                        (batch,)
+                    )
+                    titles = dict(cursor.fetchall())
+                    found = list(titles)
+                    cursor.execute("SELECT DISTINCT author_id FROM BookAuthor WHERE book_id = ANY(%s);", (found,))
+                    author_ids = [record[0] for record in cursor.fetchall()]
+
+                    # Active loans of the whole batch in one anti-join (loan_open_book_idx)
+                    cursor.execute("""
+                        WITH weeded AS (
+                            DELETE FROM Book b
+                            WHERE b.book_id = ANY(%s)
+                              AND NOT EXISTS (
+                                  SELECT 1 FROM Loan l WHERE l.book_id = b.book_id AND l.return_date IS NULL)
+                            RETURNING b.book_id, b.title, b.isbn, b.publication_year, b.authors_display
+                        )
+                        INSERT INTO WeededBook (book_id, title, isbn, publication_year, authors_display)
+                        SELECT book_id, title, isbn, publication_year, authors_display FROM weeded
+                        RETURNING book_id;
+                    """, (found,))
+                    weeded = {record[0] for record in cursor.fetchall()}
+
+                    active_loans = {}
+                    blocked = [book_id for book_id in found if book_id not in weeded]
+                    if blocked:
+                        cursor.execute("""
+                            SELECT book_id, COUNT(*) FROM Loan
+                            WHERE book_id = ANY(%s) AND return_date IS NULL
+                            GROUP BY book_id;
+                        """, (blocked,))
+                        active_loans = dict(cursor.fetchall())
+
+                    # The BookAuthor rows went with the books; authors with no book left go too
+                    cursor.execute("""
+                        DELETE FROM Author a
+                        WHERE a.author_id = ANY(%s)
+                          AND NOT EXISTS (SELECT 1 FROM BookAuthor ba WHERE ba.author_id = a.author_id);
+                    """, (author_ids,))
+                    authors_removed += cursor.rowcount
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                self.db_connector.putconn(conn)
 
-                delete_query = "DELETE FROM Book WHERE book_id = %s;"
-                cursor.execute(delete_query, (book_id,))
+            for book_id in batch:
+                if book_id in weeded:
+                    report.append(WeedResultRecord(book_id, titles[book_id], 'WEEDED', 0))
+                elif book_id in titles:
+                    report.append(WeedResultRecord(book_id, titles[book_id], 'ACTIVE_LOANS',
+                                                   active_loans.get(book_id, 0)))
+                else:
+                    report.append(WeedResultRecord(book_id, None, 'NOT_FOUND', 0))
+            if on_progress:
+                on_progress(start + len(batch), len(book_ids))
 
-                if cursor.rowcount == 0:
-                    raise Exception(f"Book ID {book_id} not found.")
+        statuses = [result.status for result in report]
+        return {
+            'weeded': statuses.count('WEEDED'),
+            'blocked': statuses.count('ACTIVE_LOANS'),
+            'not_found': statuses.count('NOT_FOUND'),
+            'authors_removed': authors_removed,
+            'report': report,
+        }
 
+    def add_author(self, first_name, last_name):
+        """Returns the author_id for this name, creating the Author if it does not exist yet."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT author_id FROM Author WHERE first_name = %s AND last_name = %s ORDER BY author_id LIMIT 1;",
+                    (first_name, last_name)
+                )
+                record = cursor.fetchone()
+                if record is None:
+                    cursor.execute(
+                        "INSERT INTO Author (first_name, last_name) VALUES (%s, %s) RETURNING author_id;",
+                        (first_name, last_name)
+                    )
+                    record = cursor.fetchone()
                 conn.commit()
-                return True
+                return record[0]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def add_book(self, title, isbn, year, copies, author_ids):
+        """Adds a book with copies on the shelf and links its authors. Returns the new book as a BookRecord."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+                    VALUES (%s, %s, %s, %s, %s) RETURNING book_id;
+                """, (title, isbn, year, copies, copies))
+                book_id = cursor.fetchone()[0]
+                cursor.execute("""
+                    INSERT INTO BookAuthor (book_id, author_id)
+                    SELECT %s, unnest(%s::int[]) ON CONFLICT DO NOTHING;
+                """, (book_id, list(author_ids)))
+
+                # authors_display was filled in by the BookAuthor trigger (migration 0005)
+                cursor.execute("""
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book WHERE book_id = %s;
+                """, (book_id,))
+                book = self._book_from_record(cursor.fetchone())
+                conn.commit()
+                return book
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def stream_catalog_keys(self, on_batch, batch_size=10000):
+        """Streams (book_id, title, authors_display, isbn) for the whole catalog in book_id order,
+        batch_size rows at a time (for building the autocomplete index). Returns the row count."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor(name='catalog_keys_cursor') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute("""
+                    SELECT book_id, title, authors_display, isbn FROM Book ORDER BY book_id;
+                """)
+                total = 0
+                while True:
+                    records = cursor.fetchmany(batch_size)
+                    if not records:
+                        break
+                    total += len(records)
+                    on_batch(records)
+            conn.rollback()  # read-only; closes the server-side cursor's transaction
+            return total
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             self.db_connector.putconn(conn)
 
-    # NOTE: You must include your other required methods (get_book_details, add_author, add_book, search_books)
-    # in this file, ensuring they all use the try/finally/putconn structure.
\ No newline at end of file
+    def get_catalog_stamp(self):
+        """A cheap fingerprint of the catalog's contents, used to tell whether a cached index is current."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT COUNT(*), COALESCE(MAX(book_id), 0),
+                        COALESCE(SUM(hashtext(title || coalesce(authors_display, '') || coalesce(isbn, ''))::BIGINT), 0)
+                    FROM Book;
+                """)
+                count, max_id, checksum = cursor.fetchone()
+                return f"{count}:{max_id}:{checksum}"
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def stream_catalog(self, on_batch, batch_size=10000):
+        """Streams every catalog row, (book_id, title, isbn, year, total, available, authors_display),
+        in get_all_books order, for writing an offline snapshot. Returns (row count, watermark):
+        the database time the rows are consistent with, for later get_catalog_changes calls."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # NOW() is the transaction start; the cursor below reads the same snapshot
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ;")
+                cursor.execute("SELECT NOW()::TIMESTAMP;")
+                watermark = cursor.fetchone()[0]
+            with conn.cursor(name='catalog_snapshot_cursor') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute("""
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    ORDER BY title, book_id;
+                """)
+                total = 0
+                while True:
+                    records = cursor.fetchmany(batch_size)
+                    if not records:
+                        break
+                    total += len(records)
+                    on_batch(records)
+            conn.rollback()  # read-only
+            return total, watermark
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_catalog_changes(self, since):
+        """Books changed and deleted after `since` (a watermark from stream_catalog or a previous call).
+
+        Returns {'books': [BookRecord], 'deleted': [book_id], 'watermark': datetime}, or None when
+        `since` is older than the tombstone retention and deletions may have been missed.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ;")
+                cursor.execute("""
+                    SELECT NOW()::TIMESTAMP, %s < NOW()::TIMESTAMP - make_interval(days => %s);
+                """, (since, TOMBSTONE_RETENTION_DAYS))
+                watermark, expired = cursor.fetchone()
+                if expired:
+                    conn.rollback()
+                    return None
+
+                # Range scans of book_updated_at_idx / booktombstone_deleted_at_idx
+                cursor.execute("""
+                    SELECT book_id, title, isbn, publication_year,
+                        total_copies, available_copies, authors_display
+                    FROM Book
+                    WHERE updated_at > %s;
+                """, (since,))
+                books = [self._book_from_record(record) for record in cursor.fetchall()]
+                cursor.execute("SELECT book_id FROM BookTombstone WHERE deleted_at > %s;", (since,))
+                deleted = [record[0] for record in cursor.fetchall()]
+            conn.rollback()  # read-only
+            return {'books': books, 'deleted': deleted, 'watermark': watermark}
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
\ No newline at end of file
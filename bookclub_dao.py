@@ -2,7 +2,9 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from library_errors import BusinessRuleError
 from datetime import datetime
+from records import ClubRecord
 
 
 class BookClubDAO:
@@ -40,11 +42,32 @@ class BookClubDAO:
                 cursor.execute(query)
                 records = cursor.fetchall()
 
+                return [ClubRecord(*record) for record in records]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_member_clubs(self, member_id):
+        """Fetches the clubs a member belongs to, with the date they joined."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT c.club_id, c.club_name, cm.join_date
+                    FROM ClubMembership cm
+                    JOIN BookClub c ON cm.club_id = c.club_id
+                    WHERE cm.member_id = %s
+                    ORDER BY c.club_name;
+                """
+                cursor.execute(query, (member_id,))
+                records = cursor.fetchall()
+
                 clubs = []
                 for record in records:
                     clubs.append({
-                        'club_id': record[0], 'name': record[1], 'description': record[2],
-                        'max_members': record[3], 'current_members': record[4]
+                        'club_id': record[0], 'name': record[1], 'join_date': str(record[2])
                     })
                 return clubs
         except Exception as e:
@@ -53,4 +76,60 @@ class BookClubDAO:
         finally:
             self.db_connector.putconn(conn)
 
-    # NOTE: Ensure all other methods (delete_club, join_club, leave_club) are present.
\ No newline at end of file
+    def join_club(self, club_id, member_id):
+        """Adds a member to a club if it has room, updating current_members in the same transaction."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                capacity_query = """
+                    UPDATE BookClub SET current_members = current_members + 1
+                    WHERE club_id = %s AND current_members < max_members
+                    RETURNING club_id;
+                """
+                cursor.execute(capacity_query, (club_id,))
+                if cursor.fetchone() is None:
+                    raise BusinessRuleError(f"Club ID {club_id} not found or is already full.")
+
+                membership_query = """
+                    INSERT INTO ClubMembership (club_id, member_id, join_date)
+                    VALUES (%s, %s, %s);
+                """
+                cursor.execute(membership_query, (club_id, member_id, datetime.now().date()))
+                conn.commit()
+                return True
+        except psycopg2.IntegrityError as e:
+            conn.rollback()
+            if 'duplicate key' in str(e):
+                raise BusinessRuleError("You are already a member of this club.")
+            raise Exception(f"Database Integrity Error: {e}")
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def leave_club(self, club_id, member_id):
+        """Removes a member from a club and frees their place."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "DELETE FROM ClubMembership WHERE club_id = %s AND member_id = %s;",
+                    (club_id, member_id)
+                )
+                if cursor.rowcount == 0:
+                    raise BusinessRuleError(f"Member ID {member_id} is not in Club ID {club_id}.")
+
+                cursor.execute(
+                    "UPDATE BookClub SET current_members = current_members - 1 WHERE club_id = %s;",
+                    (club_id,)
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    # NOTE: Ensure all other methods (delete_club) are present.
\ No newline at end of file
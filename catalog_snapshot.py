@@ -0,0 +1,416 @@
+# catalog_snapshot.py
+# Offline catalog for member kiosks: a versioned binary snapshot of the catalog, memory-mapped
+# read-only so a kiosk starts browsing without running get_all_books, and keeps browsing (read-only)
+# when the database link drops. Changes since the snapshot are fetched by Book.updated_at
+# (migration 0010) and overlaid in memory.
+#
+# File layout (little-endian):
+#   header    magic 'SLCS', version u16, reserved u16, row count u32, heap size u64,
+#             watermark (32 bytes, ISO timestamp the rows are consistent with)
+#   rows      row count x 28 bytes in catalog order (title, book_id): book_id, year (0 = unknown),
+#             total copies, available copies (i32), heap offset (u32), title length (u16),
+#             isbn length (u16), authors length (u32)
+#   id index  row count x u32: row numbers ordered by book_id
+#   heap      UTF-8 title, isbn and authors of each row, in row order
+#
+# Usage: python catalog_snapshot.py --build [--path catalog.snapshot]   (server side, e.g. nightly)
+#        python catalog_snapshot.py --sync [--path catalog.snapshot]    (fold recent changes in)
+#        python catalog_snapshot.py --search "tolkien" [--path catalog.snapshot]
+
+import argparse
+import bisect
+import datetime
+import heapq
+import itertools
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from records import BookRecord, intern_text
+
+SNAPSHOT_MAGIC = b'SLCS'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<4sHHIQ32s')
+ROW = struct.Struct('<iiiiIHHI')
+ROW_INDEX = struct.Struct('<I')
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.snapshot')
+# Changes are fetched from this far before the watermark: a transaction that started earlier but
+# committed later carries an older updated_at. Re-applying a change is harmless.
+DELTA_OVERLAP = datetime.timedelta(minutes=5)
+SYNC_INTERVAL_SECONDS = 60
+# Past this many overlaid changes the snapshot file is rewritten with them folded in
+COMPACT_THRESHOLD = 5000
+
+
+def catalog_key(book):
+    """Sort key of the catalog listing (get_all_books orders by title, book_id)."""
+    return (book['title'], book['book_id'])
+
+
+def book_matches(book, term):
+    """Python mirror of the search_books predicate (title/author ILIKE, ISBN LIKE)."""
+    lowered = term.lower()
+    return (lowered in (book['title'] or '').lower()
+            or term in (book['isbn'] or '')
+            or lowered in (book['authors'] or '').lower())
+
+
+def write_snapshot(path, records, watermark):
+    """Writes (book_id, title, isbn, year, total, available, authors) tuples, already in catalog
+    order, to a snapshot file. The file is replaced atomically. Returns the row count."""
+    rows = bytearray()
+    heap = bytearray()
+    ids = []
+    for row_number, (book_id, title, isbn, year, total, available, authors) in enumerate(records):
+        title_bytes = (title or '').encode('utf-8')
+        isbn_bytes = (isbn or '').encode('utf-8')
+        authors_bytes = (authors or '').encode('utf-8') if authors != "N/A" else b''
+        rows += ROW.pack(book_id, year or 0, total, available, len(heap),
+                         len(title_bytes), len(isbn_bytes), len(authors_bytes))
+        heap += title_bytes + isbn_bytes + authors_bytes
+        ids.append((book_id, row_number))
+
+    count = len(ids)
+    ids.sort()
+    id_index = struct.pack(f'<{count}I', *(row_number for _, row_number in ids))
+    stamp = watermark.isoformat().encode('ascii')
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, count, len(heap), stamp))
+        f.write(rows)
+        f.write(id_index)
+        f.write(heap)
+    os.replace(tmp, path)  # kiosks that have the old file mapped keep reading it
+    return count
+
+
+class _HeapOffsets:
+    """Sequence view of each row's heap offset, for bisecting a heap position back to its row."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def __getitem__(self, row):
+        return struct.unpack_from('<I', self.snapshot.mm, self.snapshot.rows_start + row * ROW.size + 16)[0]
+
+
+class _BookIds:
+    """Sequence view of book_ids in id-index order, for bisecting a book_id to its row."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def __getitem__(self, position):
+        return self.snapshot.book_id(self.snapshot.id_row(position))
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of a snapshot file. Rows are decoded only when asked for."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, self.count, heap_size, stamp = HEADER.unpack_from(self.mm, 0)
+        except struct.error:
+            raise Exception(f"{path} is too short to be a catalog snapshot.")
+        if magic != SNAPSHOT_MAGIC:
+            raise Exception(f"{path} is not a catalog snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise Exception(f"{path} is snapshot version {version}; this build reads version {SNAPSHOT_VERSION}.")
+
+        self.rows_start = HEADER.size
+        self.index_start = self.rows_start + self.count * ROW.size
+        self.heap_start = self.index_start + self.count * ROW_INDEX.size
+        if self.heap_start + heap_size != len(self.mm):
+            raise Exception(f"{path} is truncated or corrupt.")
+        self.watermark = datetime.datetime.fromisoformat(stamp.rstrip(b'\0').decode('ascii'))
+        self.view = memoryview(self.mm)
+        self.heap_offsets = _HeapOffsets(self)
+        self.book_ids = _BookIds(self)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.view.release()
+        self.mm.close()
+
+    def book_id(self, row):
+        return struct.unpack_from('<i', self.mm, self.rows_start + row * ROW.size)[0]
+
+    def id_row(self, position):
+        return ROW_INDEX.unpack_from(self.mm, self.index_start + position * ROW_INDEX.size)[0]
+
+    def record(self, row):
+        book_id, year, total, available, offset, title_len, isbn_len, authors_len = ROW.unpack_from(
+            self.mm, self.rows_start + row * ROW.size)
+        start = self.heap_start + offset
+        title = str(self.view[start:start + title_len], 'utf-8')
+        start += title_len
+        isbn = str(self.view[start:start + isbn_len], 'utf-8')
+        start += isbn_len
+        authors = str(self.view[start:start + authors_len], 'utf-8')
+        return BookRecord(book_id, title, isbn, year or None, total, available,
+                          intern_text(authors) if authors else "N/A")
+
+    def find(self, book_id):
+        """Row number of book_id, or None."""
+        position = bisect.bisect_left(self.book_ids, book_id)
+        if position < self.count and self.book_ids[position] == book_id:
+            return self.id_row(position)
+        return None
+
+    def matching_rows(self, term):
+        """Row numbers (in catalog order) whose title, ISBN or authors contain term, like search_books."""
+        # IGNORECASE on bytes only folds ASCII: for other terms, look for their longest ASCII part
+        needle = term if term.isascii() else max(re.findall(r'[\x00-\x7f]*', term), key=len)
+        if len(needle) < 2:
+            yield from (row for row in range(self.count) if book_matches(self.record(row), term))
+            return
+
+        # Scan the heap in place for the needle, then map each hit back to its row
+        pattern = re.compile(re.escape(needle.encode('ascii')), re.IGNORECASE)
+        position = self.heap_start
+        while True:
+            match = pattern.search(self.mm, position)
+            if match is None:
+                return
+            row = bisect.bisect_right(self.heap_offsets, match.start() - self.heap_start) - 1
+            # A hit can straddle two fields (or be a case-folded ISBN); confirm on the decoded row
+            if book_matches(self.record(row), term):
+                yield row
+            position = self.heap_start + self.heap_offsets[row + 1] if row + 1 < self.count else len(self.mm)
+
+
+class OfflineCatalog:
+    """The catalog as a kiosk browses it: the snapshot plus the changes fetched since it was taken.
+
+    Provides the BookDAO read methods the member screens use (get_books_page, get_book_details,
+    search_books, stream_search_books), so it can stand in for BookDAO. Once a snapshot exists
+    none of them touch the database (until then they pass through to BookDAO); sync() fetches
+    changes. Changed books are merged into listings by Python string order, which can differ
+    slightly from the database collation.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH, book_dao=None):
+        self.path = path
+        self._book_dao = book_dao
+        self.snapshot = CatalogSnapshot(path) if os.path.exists(path) else None
+        self.watermark = self.snapshot.watermark if self.snapshot else None
+        # (book_id -> BookRecord, or None if deleted; changed books sorted by catalog_key),
+        # swapped as one tuple so readers on other threads always see a consistent pair
+        self.state = ({}, [])
+        self.online = None  # unknown until the first sync
+        self.last_synced = None
+        self.sync_lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    @property
+    def book_dao(self):
+        if self._book_dao is None:
+            from book_dao import BookDAO
+            self._book_dao = BookDAO()
+        return self._book_dao
+
+    def __len__(self):
+        changes, overlay = self.state
+        if self.snapshot is None:
+            return len(overlay)
+        replaced = sum(1 for book_id in changes if self.snapshot.find(book_id) is not None)
+        return len(self.snapshot) - replaced + len(overlay)
+
+    # --- Reads (no database) ---
+
+    def _books(self, term=None):
+        """All books (or those matching term) in catalog order, snapshot rows merged with changes."""
+        snapshot, (changes, overlay) = self.snapshot, self.state
+        rows = range(len(snapshot)) if term is None else snapshot.matching_rows(term)
+        snapshot_books = (snapshot.record(row) for row in rows
+                          if not changes or snapshot.book_id(row) not in changes)
+        if not overlay:
+            return snapshot_books
+        changed = overlay if term is None else [book for book in overlay if book_matches(book, term)]
+        return heapq.merge(snapshot_books, changed, key=catalog_key)
+
+    def get_books_page(self, limit, offset=0):
+        if self.snapshot is None:
+            return self.book_dao.get_books_page(limit, offset)
+        changes, _ = self.state
+        if not changes:
+            # Nothing overlaid: the page is a contiguous run of rows
+            stop = min(offset + limit, len(self.snapshot))
+            return [self.snapshot.record(row) for row in range(offset, stop)]
+        return list(itertools.islice(self._books(), offset, offset + limit))
+
+    def get_all_books(self):
+        if self.snapshot is None:
+            return self.book_dao.get_all_books()
+        return list(self._books())
+
+    def get_book_details(self, book_id):
+        if self.snapshot is None:
+            return self.book_dao.get_book_details(book_id)
+        changes, _ = self.state
+        if book_id in changes:
+            return changes[book_id]
+        row = self.snapshot.find(book_id)
+        return self.snapshot.record(row) if row is not None else None
+
+    def search_books(self, search_term):
+        if self.snapshot is None:
+            return self.book_dao.search_books(search_term)
+        return list(self._books(search_term))
+
+    def stream_search_books(self, search_term, on_batch, batch_size=200, timeout_ms=5000, on_connection=None):
+        """Same contract as BookDAO.stream_search_books; there is no query to time out or cancel."""
+        if self.snapshot is None:
+            return self.book_dao.stream_search_books(search_term, on_batch, batch_size, timeout_ms, on_connection)
+        books = self._books(search_term)
+        total = 0
+        while True:
+            batch = list(itertools.islice(books, batch_size))
+            if not batch:
+                return total
+            total += len(batch)
+            if on_batch(batch) is False:
+                return total
+
+    # --- Syncing (database) ---
+
+    def rebuild(self):
+        """Writes a fresh snapshot from the full catalog and switches to it."""
+        with self.sync_lock:
+            batches = []
+            _, watermark = self.book_dao.stream_catalog(batches.append)
+            write_snapshot(self.path, itertools.chain.from_iterable(batches), watermark)
+            self._open(watermark)
+            self.online = True
+            self.last_synced = time.monotonic()
+
+    def sync(self):
+        """Fetches changes since the last sync and overlays them. Returns the number of books changed.
+
+        Raises (and marks the catalog offline) when the database cannot be reached; reads keep
+        working from what is already here.
+        """
+        if self.snapshot is None:
+            self.rebuild()
+            return len(self)
+        with self.sync_lock:
+            try:
+                delta = self.book_dao.get_catalog_changes(self.watermark - DELTA_OVERLAP)
+            except Exception:
+                self.online = False
+                raise
+            self.online = True
+            self.last_synced = time.monotonic()
+            if delta is not None:
+                changes = dict(self.state[0])
+                for book in delta['books']:
+                    changes[book['book_id']] = book
+                for book_id in delta['deleted']:
+                    changes[book_id] = None
+                overlay = sorted((book for book in changes.values() if book is not None), key=catalog_key)
+                self.state = (changes, overlay)
+                self.watermark = delta['watermark']
+                if len(changes) > COMPACT_THRESHOLD:
+                    # Fold the overlay into a new file rather than merging it into every listing
+                    self._write_merged()
+                return len(delta['books']) + len(delta['deleted'])
+        # The snapshot predates the tombstone retention: deletions may have been missed
+        self.rebuild()
+        return len(self)
+
+    def compact(self):
+        """Rewrites the snapshot file with the changes fetched so far folded in."""
+        with self.sync_lock:
+            if self.state[0]:
+                self._write_merged()
+
+    def _write_merged(self):
+        books = [(b['book_id'], b['title'], b['isbn'], b['year'], b['total_copies'],
+                  b['available_copies'], b['authors']) for b in self._books()]
+        write_snapshot(self.path, books, self.watermark)
+        self._open(self.watermark)
+
+    def _open(self, watermark):
+        # The previous mapping is left for the garbage collector: another thread may still be reading it
+        self.snapshot = CatalogSnapshot(self.path)
+        self.watermark = watermark
+        self.state = ({}, [])
+
+    def start_background_sync(self, interval=SYNC_INTERVAL_SECONDS):
+        """Syncs every interval seconds on a daemon thread; failures just leave the catalog offline."""
+        def run():
+            while not self.stop_event.is_set():
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"Catalog sync failed (browsing offline): {e}")
+                self.stop_event.wait(interval)
+
+        threading.Thread(target=run, name="catalog-sync", daemon=True).start()
+
+    def stop_background_sync(self):
+        self.stop_event.set()
+
+
+# --- Shared instance (kiosks) ---
+
+_offline_catalog = None
+
+
+def enable_offline_catalog(path=DEFAULT_SNAPSHOT_PATH, sync_interval=SYNC_INTERVAL_SECONDS):
+    """Makes the member screens browse from the snapshot at path and keeps it synced in the background."""
+    global _offline_catalog
+    _offline_catalog = OfflineCatalog(path)
+    _offline_catalog.start_background_sync(sync_interval)
+    return _offline_catalog
+
+
+def get_offline_catalog():
+    """The kiosk's OfflineCatalog, or None when the member screens read the live database."""
+    return _offline_catalog
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build, sync or search the offline catalog snapshot.")
+    parser.add_argument('--path', default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument('--build', action='store_true', help="Write a full snapshot from the database.")
+    parser.add_argument('--sync', action='store_true', help="Fetch changes since the snapshot was written.")
+    parser.add_argument('--search', help="Search the snapshot without touching the database.")
+    args = parser.parse_args()
+
+    from db_connector import get_db_connector
+    catalog = OfflineCatalog(args.path)
+    try:
+        if args.build:
+            start = time.perf_counter()
+            catalog.rebuild()
+            print(f"Wrote {len(catalog):,} books to {args.path} "
+                  f"({os.path.getsize(args.path) / 2**20:.1f} MiB) in {time.perf_counter() - start:.1f} s")
+        if args.sync:
+            changed = catalog.sync()
+            catalog.compact()
+            print(f"{changed} change(s) since the snapshot; now current to {catalog.watermark}")
+        if args.search:
+            start = time.perf_counter()
+            books = catalog.search_books(args.search)
+            print(f"{len(books)} match(es) in {(time.perf_counter() - start) * 1e3:.1f} ms:")
+            for book in books[:20]:
+                print(f"  [{book['book_id']}] {book['title']} — {book['authors']} ({book['isbn']})")
+    finally:
+        if args.build or args.sync:
+            get_db_connector().close_connection()
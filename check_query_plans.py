@@ -0,0 +1,365 @@
+# check_query_plans.py
+# Runs the DAO workload against a scale dataset and EXPLAINs every statement the DAOs send.
+# Fails (exit status 1) if any plan reads a large table with a sequential scan, unless that
+# DAO method is a deliberate full listing (FULL_LISTINGS).
+# Usage: python check_query_plans.py [--seed] [--books 200000] [--members 50000] [--loans 500000]
+#                                    [--large-rows 10000]
+# WARNING: run it against a scratch database. --seed inserts the scale dataset, and the workload
+# itself checks books out, returns them and joins/leaves clubs.
+
+import argparse
+import json
+import os
+import sys
+import traceback
+
+import psycopg2
+import psycopg2.extensions
+
+from db_connector import get_db_connector
+from book_dao import BookDAO
+from bookclub_dao import BookClubDAO
+from copy_dao import CopyDAO
+from fine_dao import FineDAO
+from hold_dao import HoldDAO
+from loan_dao import LoanDAO
+from loan_policy_dao import LoanPolicyDAO
+from member_dao import MemberDAO
+from member_management_dao import MemberManagementDAO
+from popularity_dao import PopularityDAO
+from user_dao import UserDAO
+
+SEED_PREFIX = "plancheck_"
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+# DAO methods that list a whole table on purpose, and the tables they may scan to do it
+FULL_LISTINGS = {
+    'get_all_members': {'member', 'user', 'role'},
+    'get_active_loans': {'book', 'user'},
+    'get_overdue_loans': {'book', 'user'},
+    'stream_catalog_keys': {'book'},  # autocomplete index build
+    'get_catalog_stamp': {'book'},
+    'stream_catalog': {'book'},  # offline catalog snapshot build
+    'find_weeding_candidates': {'book', 'loan', 'loanarchive'},  # anti-join against recent loans
+}
+
+# Statements recorded while the workload runs: (caller, query, plan)
+recorded_plans = []
+
+
+def _dao_caller():
+    """Names the innermost DAO method on the stack, e.g. 'loan_dao.py:process_checkout'."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.endswith('_dao.py'):
+            return f"{os.path.basename(frame.filename)}:{frame.name}"
+    return "?"
+
+
+class ExplainingCursor(psycopg2.extensions.cursor):
+    """Cursor that EXPLAINs each statement (without running it twice) before executing it."""
+
+    def execute(self, query, vars=None):
+        if query.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            # Named (server-side) cursors cannot run EXPLAIN, so use a plain one on the same connection
+            with self.connection.cursor(cursor_factory=psycopg2.extensions.cursor) as explain:
+                explain.execute("EXPLAIN (FORMAT JSON) " + query, vars)
+                plan = explain.fetchone()[0][0]['Plan']
+            recorded_plans.append((_dao_caller(), query, plan))
+        return super().execute(query, vars)
+
+
+class ExplainingConnector:
+    """Wraps the shared DBConnector so every connection the DAOs use hands out ExplainingCursors."""
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.base_factory = None
+
+    def get_connection(self):
+        conn = self.connector.get_connection()
+        self.base_factory = conn.cursor_factory
+        conn.cursor_factory = ExplainingCursor
+        return conn
+
+    def putconn(self, conn):
+        conn.cursor_factory = self.base_factory
+        self.connector.putconn(conn)
+
+
+# --- Scale dataset ---
+
+def seed_dataset(connector, books, members, loans):
+    """Inserts a synthetic library of the given size (authors, copies, clubs and history included)."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO Author (first_name, last_name)
+                SELECT %s, 'Author ' || g FROM generate_series(1, %s) g;
+            """, (SEED_PREFIX, max(books // 5, 1)))
+            cursor.execute("""
+                INSERT INTO Book (title, isbn, publication_year, total_copies, available_copies)
+                SELECT initcap(md5(g::text)), %s || g, 1900 + g %% 125, 2, 2
+                FROM generate_series(1, %s) g;
+            """, (SEED_PREFIX, books))
+            cursor.execute("""
+                INSERT INTO BookAuthor (book_id, author_id)
+                SELECT b.book_id, a.author_id
+                FROM Book b
+                JOIN Author a ON a.first_name = %s AND a.last_name = 'Author ' || (1 + b.book_id %% %s)
+                WHERE b.isbn LIKE %s;
+            """, (SEED_PREFIX, max(books // 5, 1), SEED_PREFIX + '%'))
+            cursor.execute("""
+                INSERT INTO BookCopy (barcode, book_id)
+                SELECT %s || b.book_id || '-' || n, b.book_id
+                FROM Book b CROSS JOIN generate_series(1, 2) n
+                WHERE b.isbn LIKE %s;
+            """, (SEED_PREFIX, SEED_PREFIX + '%'))
+
+            cursor.execute("""
+                INSERT INTO "User" (username, password, first_name, last_name, role_id)
+                SELECT %s || g, 'password', 'Plan', 'Check ' || g,
+                    (SELECT role_id FROM Role WHERE role_name = 'Member')
+                FROM generate_series(1, %s) g;
+            """, (SEED_PREFIX, members))
+            cursor.execute("""
+                INSERT INTO Member (member_id, current_loans)
+                SELECT user_id, 0 FROM "User" WHERE username LIKE %s;
+            """, (SEED_PREFIX + '%',))
+
+            # Closed history spread over two years, plus a thin layer of open loans
+            cursor.execute("""
+                WITH b AS (SELECT array_agg(book_id) AS ids FROM Book WHERE isbn LIKE %(prefix)s),
+                     m AS (SELECT array_agg(member_id) AS ids FROM Member JOIN "User" ON user_id = member_id
+                           WHERE username LIKE %(prefix)s)
+                INSERT INTO Loan (book_id, member_id, loan_date, due_date, return_date, fine_amount)
+                SELECT b.ids[1 + (g * 7919) %% cardinality(b.ids)], m.ids[1 + (g * 104729) %% cardinality(m.ids)],
+                    CURRENT_DATE - (g %% 730), CURRENT_DATE - (g %% 730) + 7,
+                    CASE WHEN g %% 50 = 0 THEN NULL ELSE CURRENT_DATE - (g %% 730) + (g %% 10) END, 0
+                FROM b, m, generate_series(1, %(loans)s) g;
+            """, {'prefix': SEED_PREFIX + '%', 'loans': loans})
+
+            # Bring the maintained counters in line with the loans just inserted
+            cursor.execute("""
+                UPDATE Member m SET current_loans = o.n
+                FROM (SELECT member_id, COUNT(*) AS n FROM Loan WHERE return_date IS NULL GROUP BY member_id) o
+                WHERE m.member_id = o.member_id;
+            """)
+            cursor.execute("""
+                UPDATE Book b SET available_copies = GREATEST(b.total_copies - o.n, 0)
+                FROM (SELECT book_id, COUNT(*) AS n FROM Loan WHERE return_date IS NULL GROUP BY book_id) o
+                WHERE b.book_id = o.book_id;
+            """)
+
+            cursor.execute("""
+                INSERT INTO BookClub (club_name, description, max_members, current_members)
+                SELECT %s || g, 'Synthetic club', 1000, 0 FROM generate_series(1, 50) g;
+            """, (SEED_PREFIX,))
+            cursor.execute("""
+                INSERT INTO ClubMembership (club_id, member_id, join_date)
+                SELECT c.club_id, m.member_id, CURRENT_DATE
+                FROM BookClub c
+                JOIN Member m ON m.member_id %% 50 = c.club_id %% 50
+                JOIN "User" u ON u.user_id = m.member_id AND u.username LIKE %s
+                WHERE c.club_name LIKE %s AND m.member_id %% 20 = 0;
+            """, (SEED_PREFIX + '%', SEED_PREFIX + '%'))
+            cursor.execute("""
+                UPDATE BookClub c SET current_members = (SELECT COUNT(*) FROM ClubMembership WHERE club_id = c.club_id)
+                WHERE c.club_name LIKE %s;
+            """, (SEED_PREFIX + '%',))
+            conn.commit()
+
+        # Fresh statistics, or the planner judges these tables by their old sizes
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE;")
+    except Exception as e:
+        if not conn.autocommit:
+            conn.rollback()
+        raise e
+    finally:
+        conn.autocommit = False
+        connector.putconn(conn)
+
+
+def sample_fixtures(connector):
+    """Picks the IDs the workload uses: a member with no loans, an available book with a shelf copy, etc."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT m.member_id, u.username, u.password FROM Member m JOIN "User" u ON u.user_id = m.member_id
+                WHERE m.current_loans = 0 ORDER BY m.member_id DESC LIMIT 1;
+            """)
+            member_id, username, password = cursor.fetchone()
+            cursor.execute("""
+                SELECT c.book_id, c.barcode, b.title FROM BookCopy c JOIN Book b ON b.book_id = c.book_id
+                WHERE c.status = 'AVAILABLE' AND b.available_copies > 1 ORDER BY c.copy_id DESC LIMIT 1;
+            """)
+            book_id, barcode, title = cursor.fetchone()
+            cursor.execute("""
+                SELECT club_id FROM BookClub c
+                WHERE current_members < max_members
+                  AND NOT EXISTS (SELECT 1 FROM ClubMembership cm WHERE cm.club_id = c.club_id AND cm.member_id = %s)
+                LIMIT 1;
+            """, (member_id,))
+            record = cursor.fetchone()
+        conn.rollback()
+        return {
+            'member_id': member_id, 'username': username, 'password': password,
+            'book_id': book_id, 'barcode': barcode, 'term': title[:6],
+            'club_id': record[0] if record else None
+        }
+    finally:
+        connector.putconn(conn)
+
+
+# --- Workload ---
+
+def build_workload(daos, f):
+    """(label, callable) pairs covering the DAO read and write paths, in an order that leaves no loans open."""
+    book, member, user, club, hold, fine, loan, copy, management, popularity, policy = daos
+    state = {}
+
+    def checkout():
+        state['loan_id'] = loan.process_checkout(f['book_id'], f['member_id'])
+
+    workload = [
+        ("catalog", book.get_all_books),
+        ("catalog page", lambda: book.get_books_page(50, 1000)),
+        ("book details", lambda: book.get_book_details(f['book_id'])),
+        ("search", lambda: book.search_books(f['term'])),
+        ("streamed search", lambda: book.stream_search_books(f['term'], lambda rows: True)),
+        ("availability", lambda: book.get_book_availability(f['book_id'])),
+        ("catalog keys", lambda: book.stream_catalog_keys(lambda rows: True)),
+        ("catalog stamp", book.get_catalog_stamp),
+        ("catalog snapshot", lambda: state.update(watermark=book.stream_catalog(lambda rows: True)[1])),
+        ("catalog changes", lambda: book.get_catalog_changes(state['watermark'])),
+        ("weeding candidates", lambda: book.find_weeding_candidates(5, 1900)),
+        ("weed missing book", lambda: book.weed_books([-1])),
+        ("login", lambda: user.verify_login(f['username'], f['password'])),
+        ("member details", lambda: member.get_member_details(f['member_id'])),
+        ("member loan count", lambda: member.get_member_loan_count(f['member_id'])),
+        ("member home", lambda: member.get_member_home(f['member_id'])),
+        ("member list", management.get_all_members),
+        ("clubs", club.get_all_clubs),
+        ("member clubs", lambda: club.get_member_clubs(f['member_id'])),
+        ("holds", lambda: hold.get_member_holds(f['member_id'])),
+        ("ready hold", lambda: hold.has_ready_hold(f['book_id'], f['member_id'])),
+        ("balance", lambda: fine.get_member_balance(f['member_id'])),
+        ("ledger", lambda: fine.get_member_ledger(f['member_id'])),
+        ("loan policies", policy.get_policies),
+        ("loan terms", lambda: policy.get_policy_for_loan(f['book_id'], f['member_id'])),
+        ("copy lookup", lambda: copy.get_copy(f['barcode'])),
+        ("book copies", lambda: copy.get_book_copies(f['book_id'])),
+        ("checkout", checkout),
+        ("renew", lambda: loan.renew_loan(state['loan_id'])),
+        ("active loans", loan.get_active_loans),
+        ("overdue loans", loan.get_overdue_loans),
+        ("popular now", lambda: popularity.get_top_books('week', 5)),
+        ("roll popularity", popularity.roll_windows),
+        ("loan history", lambda: state.update(history=loan.get_member_loan_history(f['member_id']))),
+        ("loan history page 2", lambda: loan.get_member_loan_history(
+            f['member_id'], (state['history'][-1]['loan_date'], state['history'][-1]['loan_id'])
+            if state['history'] else None)),
+        ("return", lambda: loan.process_return(state['loan_id'])),
+        ("scan checkout", lambda: loan.process_copy_checkout(f['barcode'], f['member_id'])),
+        ("scan return", lambda: loan.process_copy_return(f['barcode'])),
+        ("hold expiry", lambda: hold.expire_holds(100)),
+    ]
+    if f['club_id'] is not None:
+        workload += [
+            ("join club", lambda: club.join_club(f['club_id'], f['member_id'])),
+            ("leave club", lambda: club.leave_club(f['club_id'], f['member_id'])),
+        ]
+    return workload
+
+
+def large_tables(connector, min_rows):
+    """Names (lower case) of tables and partitions estimated to hold at least min_rows rows."""
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT lower(c.relname) FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p') AND c.reltuples >= %s;
+            """, (min_rows,))
+            names = {record[0] for record in cursor.fetchall()}
+        conn.rollback()
+        return names
+    finally:
+        connector.putconn(conn)
+
+
+def seq_scans(plan):
+    """Yields the relation name of every Seq Scan node in a JSON plan tree."""
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name'].lower()
+    for child in plan.get('Plans', []):
+        yield from seq_scans(child)
+
+
+def check_plans(large):
+    """Returns (violations, allowed) as lists of (caller, table, query)."""
+    violations, allowed = [], []
+    seen = set()
+    for caller, query, plan in recorded_plans:
+        for table in seq_scans(plan):
+            if table not in large or (caller, table, query) in seen:
+                continue
+            seen.add((caller, table, query))
+            method = caller.split(':')[-1]
+            target = allowed if table in FULL_LISTINGS.get(method, ()) else violations
+            target.append((caller, table, query))
+    return violations, allowed
+
+
+def _one_line(query, width=110):
+    text = " ".join(query.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="EXPLAIN every DAO query and fail on sequential scans of large tables.")
+    parser.add_argument('--seed', action='store_true', help="Insert the scale dataset first.")
+    parser.add_argument('--books', type=int, default=200_000)
+    parser.add_argument('--members', type=int, default=50_000)
+    parser.add_argument('--loans', type=int, default=500_000)
+    parser.add_argument('--large-rows', type=int, default=10_000,
+                        help="Tables with at least this many rows count as large.")
+    args = parser.parse_args()
+
+    connector = get_db_connector()
+    failed = True
+    try:
+        if args.seed:
+            print(f"Seeding {args.books:,} books, {args.members:,} members, {args.loans:,} loans...")
+            seed_dataset(connector, args.books, args.members, args.loans)
+
+        explaining = ExplainingConnector(connector)
+        daos = (BookDAO(), MemberDAO(), UserDAO(), BookClubDAO(), HoldDAO(), FineDAO(), LoanDAO(),
+                CopyDAO(), MemberManagementDAO(), PopularityDAO(), LoanPolicyDAO())
+        for dao in daos + (daos[6].hold_dao,):
+            dao.db_connector = explaining
+
+        print("--- 📚 SmartLibrary Query Plan Check ---")
+        for label, run in build_workload(daos, sample_fixtures(connector)):
+            try:
+                run()
+                print(f"  ran  {label}")
+            except Exception as e:
+                # Business-rule refusals still had their statements explained
+                print(f"  ran  {label} (refused: {e})")
+
+        violations, allowed = check_plans(large_tables(connector, args.large_rows))
+        print(f"\nExplained {len(recorded_plans)} statements.")
+        for caller, table, query in allowed:
+            print(f"  ℹ️  {caller}: full listing scans {table} (allowed)")
+        for caller, table, query in violations:
+            print(f"  ❌ {caller}: Seq Scan on {table}\n       {_one_line(query)}")
+        failed = bool(violations)
+        print("FAILED" if failed else "OK: no sequential scans of large tables.")
+    finally:
+        connector.close_connection()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,145 @@
+# copy_dao.py
+
+import psycopg2
+from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
+
+
+class CopyDAO:
+    """Data Access Object for physical copies (BookCopy) and their barcodes."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    # --- Cursor-level helpers (run inside the caller's transaction) ---
+
+    @staticmethod
+    def lock_copy(cursor, barcode):
+        """Resolves a scanned barcode to (copy_id, book_id, status, title), locking the copy row. None if unknown."""
+        query = """
+            SELECT c.copy_id, c.book_id, c.status, b.title
+            FROM BookCopy c
+            JOIN Book b ON b.book_id = c.book_id
+            WHERE c.barcode = %s
+            FOR UPDATE OF c;
+        """
+        cursor.execute(query, (barcode,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def set_status(cursor, copy_id, status):
+        cursor.execute(
+            "UPDATE BookCopy SET status = %s, updated_at = NOW() WHERE copy_id = %s;",
+            (status, copy_id)
+        )
+
+    @staticmethod
+    def take_copy(cursor, book_id, status):
+        """Lends out one of the book's copies in status (AVAILABLE, or HOLD_SHELF for a hold pickup).
+
+        For checkouts by book rather than by barcode. Returns the copy_id, or None if no such copy
+        is tracked (books whose copies were never registered).
+        """
+        cursor.execute("""
+            UPDATE BookCopy SET status = 'ON_LOAN', updated_at = NOW()
+            WHERE copy_id = (
+                SELECT copy_id FROM BookCopy
+                WHERE book_id = %s AND status = %s
+                ORDER BY updated_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING copy_id;
+        """, (book_id, status))
+        record = cursor.fetchone()
+        return record[0] if record else None
+
+    @staticmethod
+    def shelve_reserved_copy(cursor, book_id):
+        """Moves one of the book's HOLD_SHELF copies back to AVAILABLE once no hold needs it."""
+        cursor.execute("""
+            UPDATE BookCopy SET status = 'AVAILABLE', updated_at = NOW()
+            WHERE copy_id = (
+                SELECT copy_id FROM BookCopy
+                WHERE book_id = %s AND status = 'HOLD_SHELF'
+                ORDER BY updated_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            );
+        """, (book_id,))
+
+    # --- Public API ---
+
+    def add_copies(self, book_id, barcodes, branch='Main'):
+        """Registers new physical copies of a book and adds them to its counts. Returns the copy_ids."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO BookCopy (barcode, book_id, branch)
+                    SELECT unnest(%s::text[]), %s, %s
+                    RETURNING copy_id;
+                """, (list(barcodes), book_id, branch))
+                copy_ids = [record[0] for record in cursor.fetchall()]
+
+                cursor.execute("""
+                    UPDATE Book SET total_copies = total_copies + %s, available_copies = available_copies + %s
+                    WHERE book_id = %s;
+                """, (len(copy_ids), len(copy_ids), book_id))
+                conn.commit()
+                return copy_ids
+        except psycopg2.IntegrityError as e:
+            conn.rollback()
+            if 'bookcopy_barcode_idx' in str(e):
+                raise BusinessRuleError("One of these barcodes is already assigned to another copy.")
+            raise NotFoundError(f"Book ID {book_id} not found.")
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_copy(self, barcode):
+        """Looks up a copy by barcode, with the title of its book."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT c.copy_id, c.barcode, c.book_id, b.title, c.status, c.branch
+                    FROM BookCopy c
+                    JOIN Book b ON b.book_id = c.book_id
+                    WHERE c.barcode = %s;
+                """
+                cursor.execute(query, (barcode,))
+                record = cursor.fetchone()
+                if record:
+                    return {
+                        'copy_id': record[0], 'barcode': record[1], 'book_id': record[2],
+                        'title': record[3], 'status': record[4], 'branch': record[5]
+                    }
+                return None
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_book_copies(self, book_id):
+        """Lists every copy of a book with its status and branch."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT copy_id, barcode, status, branch, updated_at
+                    FROM BookCopy WHERE book_id = %s ORDER BY barcode;
+                """
+                cursor.execute(query, (book_id,))
+                return [{
+                    'copy_id': record[0], 'barcode': record[1], 'status': record[2],
+                    'branch': record[3], 'updated_at': str(record[4])
+                } for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
@@ -0,0 +1,216 @@
+# counter_reconciler.py
+# Finds (and optionally repairs) drift in the denormalized counters the business rules read:
+#   Book.available_copies      = total_copies - open loans - READY holds
+#   Member.current_loans       = open loans
+#   BookClub.current_members   = club memberships
+# Usage: python counter_reconciler.py [--repair] [--incremental] [--counter available_copies ...]
+#                                     [--chunk-size 1000] [--show 20]
+# --incremental needs migration 0006_counter_tracking, which records the ids each write touches.
+
+import argparse
+import time
+
+from db_connector import get_db_connector
+
+# Each query yields (entity_id, stored, expected) for every row of the counter's table.
+# {only} / {only_outer} restrict it to a set of ids for incremental runs and repairs.
+# loan_trigger is the 0006 trigger on Loan that records the ids loan writes touch.
+COUNTERS = {
+    'available_copies': {
+        'table': 'Book', 'alias': 'b', 'key': 'book_id', 'loan_trigger': 'loan_touch_available',
+        'query': """
+            SELECT b.book_id, b.available_copies,
+                b.total_copies - COALESCE(l.open_loans, 0) - COALESCE(h.reserved, 0)
+            FROM Book b
+            LEFT JOIN (
+                SELECT book_id, COUNT(*) AS open_loans FROM Loan
+                WHERE return_date IS NULL {only} GROUP BY book_id
+            ) l ON l.book_id = b.book_id
+            LEFT JOIN (
+                SELECT book_id, COUNT(*) AS reserved FROM Hold
+                WHERE status = 'READY' {only} GROUP BY book_id
+            ) h ON h.book_id = b.book_id
+            WHERE TRUE {only_outer}
+        """,
+    },
+    'current_loans': {
+        'table': 'Member', 'alias': 'm', 'key': 'member_id', 'loan_trigger': 'loan_touch_loans',
+        'query': """
+            SELECT m.member_id, m.current_loans, COALESCE(l.open_loans, 0)
+            FROM Member m
+            LEFT JOIN (
+                SELECT member_id, COUNT(*) AS open_loans FROM Loan
+                WHERE return_date IS NULL {only} GROUP BY member_id
+            ) l ON l.member_id = m.member_id
+            WHERE TRUE {only_outer}
+        """,
+    },
+    'current_members': {
+        'table': 'BookClub', 'alias': 'c', 'key': 'club_id', 'loan_trigger': None,
+        'query': """
+            SELECT c.club_id, c.current_members, COALESCE(cm.members, 0)
+            FROM BookClub c
+            LEFT JOIN (
+                SELECT club_id, COUNT(*) AS members FROM ClubMembership
+                WHERE TRUE {only} GROUP BY club_id
+            ) cm ON cm.club_id = c.club_id
+            WHERE TRUE {only_outer}
+        """,
+    },
+}
+
+
+def _counter_query(counter, restricted):
+    spec = COUNTERS[counter]
+    if not restricted:
+        return spec['query'].format(only='', only_outer='')
+    # The filter is repeated inside each aggregate so only the requested ids are counted
+    return spec['query'].format(
+        only=f"AND {spec['key']} = ANY(%(ids)s)",
+        only_outer=f"AND {spec['alias']}.{spec['key']} = ANY(%(ids)s)"
+    )
+
+
+class CounterReconciler:
+    """Recomputes the denormalized counters in set-based queries and reports or repairs mismatches."""
+
+    def __init__(self, chunk_size=1000):
+        self.db_connector = get_db_connector()
+        self.chunk_size = chunk_size
+
+    def run(self, counters=None, repair=False, incremental=False):
+        """Checks each counter in one pass. Returns {counter: summary dict}."""
+        results = {}
+        for counter in counters or COUNTERS:
+            started = time.perf_counter()
+            checked, mismatches = self.check(counter, incremental)
+            repaired = self.repair(counter, [entity_id for entity_id, _, _ in mismatches]) if repair else []
+            results[counter] = {
+                'checked': checked,
+                'mismatches': mismatches,
+                'repaired': repaired,
+                'seconds': time.perf_counter() - started
+            }
+        return results
+
+    def check(self, counter, incremental=False):
+        """Returns (rows checked, [(entity_id, stored, expected), ...]) for one counter.
+
+        Touched ids are claimed from CounterTouch in the same transaction; mismatched ones are
+        put back so the next incremental run still sees them until they are repaired.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT to_regclass('countertouch') IS NOT NULL;")
+                tracking = cursor.fetchone()[0]
+                if incremental and not tracking:
+                    raise Exception("Incremental mode needs migration 0006 (python migrate.py up).")
+                loan_trigger = COUNTERS[counter]['loan_trigger']
+                if incremental and loan_trigger:
+                    # A trigger left on another relation (e.g. loan_legacy after an older partition
+                    # conversion) never sees new loans, and every incremental run would pass
+                    cursor.execute("""
+                        SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'loan'::regclass AND tgname = %s);
+                    """, (loan_trigger,))
+                    if not cursor.fetchone()[0]:
+                        raise Exception(f"Trigger {loan_trigger} is missing from Loan, so {counter} changes are "
+                                        f"not tracked. Re-apply migrations/0006_counter_tracking.up.sql (psql -f, it is "
+                                        f"idempotent), then run a full reconciliation.")
+
+                ids = None
+                if tracking:
+                    cursor.execute("DELETE FROM CounterTouch WHERE counter = %s RETURNING entity_id;", (counter,))
+                    ids = [record[0] for record in cursor.fetchall()]
+                if incremental and not ids:
+                    conn.commit()
+                    return 0, []
+
+                cursor.execute(f"""
+                    SELECT COUNT(*),
+                        COALESCE(json_agg(json_build_array(entity_id, stored, expected))
+                                 FILTER (WHERE stored IS DISTINCT FROM expected), '[]')
+                    FROM ({_counter_query(counter, incremental)}) e(entity_id, stored, expected);
+                """, {'ids': ids})
+                checked, mismatches = cursor.fetchone()
+                mismatches = [tuple(mismatch) for mismatch in mismatches]
+
+                if tracking and mismatches:
+                    cursor.execute("""
+                        INSERT INTO CounterTouch (counter, entity_id)
+                        SELECT %s, unnest(%s::int[])
+                        ON CONFLICT DO NOTHING;
+                    """, (counter, [entity_id for entity_id, _, _ in mismatches]))
+                conn.commit()
+                return checked, mismatches
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def repair(self, counter, entity_ids):
+        """Rewrites the counter for entity_ids, chunk_size rows per transaction. Returns the rows changed.
+
+        Each chunk locks its rows (in id order, like the DAOs) before recomputing, so a checkout or
+        join that commits in between is counted rather than overwritten.
+        """
+        spec = COUNTERS[counter]
+        entity_ids = sorted(entity_ids)
+        repaired = []
+        for start in range(0, len(entity_ids), self.chunk_size):
+            chunk = entity_ids[start:start + self.chunk_size]
+            conn = self.db_connector.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        SELECT 1 FROM {spec['table']} WHERE {spec['key']} = ANY(%(ids)s)
+                        ORDER BY {spec['key']} FOR UPDATE;
+                    """, {'ids': chunk})
+                    cursor.execute(f"""
+                        UPDATE {spec['table']} t SET {counter} = e.expected
+                        FROM ({_counter_query(counter, True)}) e(entity_id, stored, expected)
+                        WHERE t.{spec['key']} = e.entity_id AND e.stored IS DISTINCT FROM e.expected
+                        RETURNING e.entity_id, e.stored, e.expected;
+                    """, {'ids': chunk})
+                    repaired.extend(cursor.fetchall())
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                self.db_connector.putconn(conn)
+        return repaired
+
+
+def report(results, repair, show):
+    for counter, summary in results.items():
+        mismatches = summary['mismatches']
+        print(f"{counter:<17} checked {summary['checked']:>10,}  drifted {len(mismatches):>7,}  "
+              f"repaired {len(summary['repaired']):>7,}  {summary['seconds']:.2f} s")
+        rows = summary['repaired'] if repair else mismatches
+        for entity_id, stored, expected in rows[:show]:
+            print(f"    {COUNTERS[counter]['key']} {entity_id}: stored {stored}, expected {expected}")
+        if len(rows) > show:
+            print(f"    ... and {len(rows) - show:,} more")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reconcile denormalized circulation counters.")
+    parser.add_argument('--repair', action='store_true', help="Fix drifted counters (default: report only).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only check rows touched since the last run (needs migration 0006).")
+    parser.add_argument('--counter', action='append', choices=list(COUNTERS),
+                        help="Counter to check; repeat for several (default: all).")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Rows locked per repair transaction.")
+    parser.add_argument('--show', type=int, default=20, help="Drifted rows to list per counter.")
+    args = parser.parse_args()
+
+    try:
+        reconciler = CounterReconciler(chunk_size=args.chunk_size)
+        results = reconciler.run(args.counter, repair=args.repair, incremental=args.incremental)
+        mode = "incremental" if args.incremental else "full"
+        print(f"--- Counter reconciliation ({mode}, {'repair' if args.repair else 'report only'}) ---")
+        report(results, args.repair, args.show)
+    finally:
+        get_db_connector().close_connection()
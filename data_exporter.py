@@ -0,0 +1,210 @@
+# data_exporter.py
+# Streaming extracts of Book, Member and Loan for auditors and BI.
+# Usage: python data_exporter.py {books,members,loans} OUTPUT [--format csv|parquet]
+#                                [--compression none|gzip|zstd] [--progress]
+
+import argparse
+import gzip
+import sys
+
+from db_connector import get_db_connector
+
+# Optional dependencies: only needed for the matching output options
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Each export is one query plus its column types (used for the Parquet schema).
+# {loans} is Loan, or the LoanHistory view (Loan plus LoanArchive) once loan_partition_manager.py
+# has created it, so archived loans stay in the full extract.
+EXPORTS = {
+    'books': {
+        'query': """
+            SELECT book_id, title, isbn, publication_year,
+                total_copies, available_copies, authors_display AS authors
+            FROM Book
+            ORDER BY book_id
+        """,
+        'columns': [('book_id', 'int64'), ('title', 'string'), ('isbn', 'string'),
+                    ('publication_year', 'int32'), ('total_copies', 'int32'),
+                    ('available_copies', 'int32'), ('authors', 'string')]
+    },
+    'members': {
+        # Never export the password column
+        'query': """
+            SELECT u.user_id AS member_id, u.username, u.first_name, u.last_name, m.current_loans
+            FROM "User" u
+            JOIN Member m ON u.user_id = m.member_id
+            ORDER BY u.user_id
+        """,
+        'columns': [('member_id', 'int64'), ('username', 'string'), ('first_name', 'string'),
+                    ('last_name', 'string'), ('current_loans', 'int32')]
+    },
+    'loans': {
+        'query': """
+            SELECT loan_id, book_id, member_id, loan_date, due_date, return_date, fine_amount
+            FROM {loans}
+            ORDER BY loan_id
+        """,
+        'columns': [('loan_id', 'int64'), ('book_id', 'int64'), ('member_id', 'int64'),
+                    ('loan_date', 'date'), ('due_date', 'date'), ('return_date', 'date'),
+                    ('fine_amount', 'decimal')]
+    }
+}
+
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+
+class _CountingWriter:
+    """File wrapper that counts bytes/rows written through it and reports progress.
+
+    COPY TO STDOUT hands psycopg2 exactly one row per write() (libpq's PQgetCopyData returns one
+    data row at a time), so rows are counted per write: a quoted newline inside a title or name
+    does not start a new row.
+    """
+
+    def __init__(self, raw, progress=None):
+        self.raw = raw
+        self.progress = progress
+        self.bytes_written = 0
+        self.rows_written = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.raw.write(data)
+        self.bytes_written += len(data)
+        self.rows_written += 1
+        if self.progress:
+            self.progress(self.rows_written)
+        return len(data)
+
+
+class DataExporter:
+    """Exports whole tables with constant memory: COPY TO STDOUT for CSV, chunked row groups for Parquet."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    def export(self, table, path, file_format='csv', compression='none', progress=None, chunk_size=100000):
+        """Writes the named export to path. Returns the number of data rows written."""
+        if table not in EXPORTS:
+            raise Exception(f"Unknown export '{table}'. Choose one of: {', '.join(EXPORTS)}.")
+        if compression not in COMPRESSIONS:
+            raise Exception(f"Unknown compression '{compression}'. Choose one of: {', '.join(COMPRESSIONS)}.")
+
+        if file_format == 'csv':
+            return self.export_csv(table, path, compression, progress)
+        if file_format == 'parquet':
+            return self.export_parquet(table, path, compression, progress, chunk_size)
+        raise Exception(f"Unknown format '{file_format}'. Choose 'csv' or 'parquet'.")
+
+    def export_csv(self, table, path, compression='none', progress=None):
+        """Streams COPY (query) TO STDOUT straight into the (optionally compressed) file."""
+        conn = self.db_connector.get_connection()
+        try:
+            with self._open_output(path, compression) as raw, conn.cursor() as cursor:
+                writer = _CountingWriter(raw, progress)
+                copy_sql = f"COPY ({self._query(cursor, table)}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+                cursor.copy_expert(copy_sql, writer)
+            conn.rollback()  # read-only; ends the transaction
+            return max(writer.rows_written - 1, 0)  # minus the header line
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def export_parquet(self, table, path, compression='none', progress=None, chunk_size=100000):
+        """Fetches chunk_size rows at a time from a server-side cursor and writes each as a row group."""
+        if pa is None:
+            raise Exception("Parquet export requires pyarrow (pip install pyarrow).")
+
+        columns = EXPORTS[table]['columns']
+        schema = pa.schema([(name, self._arrow_type(type_name)) for name, type_name in columns])
+        parquet_compression = None if compression == 'none' else compression
+
+        rows_written = 0
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = self._query(cursor, table)
+            with conn.cursor(name=f'export_{table}_cursor') as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(query)
+
+                with pq.ParquetWriter(path, schema, compression=parquet_compression) as writer:
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        arrays = [pa.array(values, type=field.type)
+                                  for values, field in zip(zip(*rows), schema)]
+                        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                        rows_written += len(rows)
+                        if progress:
+                            progress(rows_written)
+            conn.rollback()  # read-only; closes the server-side cursor's transaction
+            return rows_written
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    @staticmethod
+    def _query(cursor, table):
+        """The export's query, reading archived loans too once the archive exists."""
+        cursor.execute("SELECT to_regclass('loanhistory') IS NOT NULL;")
+        loans = "LoanHistory" if cursor.fetchone()[0] else "Loan"
+        return EXPORTS[table]['query'].replace('{loans}', loans)
+
+    @staticmethod
+    def _open_output(path, compression):
+        """Opens the destination file as a binary stream, compressed if requested."""
+        if compression == 'gzip':
+            return gzip.open(path, 'wb')
+        if compression == 'zstd':
+            if zstandard is None:
+                raise Exception("zstd compression requires the zstandard package (pip install zstandard).")
+            return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+        return open(path, 'wb')
+
+    @staticmethod
+    def _arrow_type(type_name):
+        return {
+            'int32': pa.int32(), 'int64': pa.int64(), 'string': pa.string(),
+            'date': pa.date32(), 'decimal': pa.decimal128(10, 2)
+        }[type_name]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export SmartLibrary tables to CSV or Parquet.")
+    parser.add_argument('table', choices=sorted(EXPORTS))
+    parser.add_argument('output')
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='none')
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows per Parquet row group.")
+    parser.add_argument('--progress', action='store_true', help="Print a running row count to stderr.")
+    args = parser.parse_args()
+
+    def print_progress(rows):
+        sys.stderr.write(f"\r{rows:,} rows")
+
+    try:
+        count = DataExporter().export(args.table, args.output, args.format, args.compression,
+                                      print_progress if args.progress else None, args.chunk_size)
+        if args.progress:
+            sys.stderr.write("\n")
+        print(f"Exported {count:,} {args.table} rows to {args.output}")
+    finally:
+        get_db_connector().close_connection()
@@ -1,6 +1,9 @@
 # db_connector.py
 
+import re
+
 import psycopg2
+import psycopg2.extensions
 from psycopg2 import pool
 
 # Database connection details (CONFIRMED CONFIGURATION)
@@ -12,24 +15,69 @@ DB_CONFIG = {
     "port": "5432"
 }
 
+# Pool sizing. Services that share one pool across many clients (e.g. api_server.py)
+# override max_connections before the first get_db_connector() call.
+POOL_CONFIG = {
+    "min_connections": 1,
+    "max_connections": 10
+}
+
+# Transaction pooling (PgBouncer pool_mode = transaction). When enabled, connections go to the
+# pooler instead of Postgres. The pooler hands each *transaction* to whichever server connection
+# is free, so nothing may outlive a transaction: no session SET, PREPARE, LISTEN, session advisory
+# locks, WITH HOLD cursors or temp tables that survive COMMIT. psycopg2 interpolates parameters
+# client-side and never prepares statements, so the DAOs' queries are safe as they are.
+POOLER_CONFIG = {
+    "enabled": False,
+    "host": "localhost",
+    "port": "6432"
+}
+
+# Statements that leave state behind in the server session. SET LOCAL, SET TRANSACTION,
+# pg_advisory_xact_lock and ON COMMIT DROP temp tables are transaction-scoped and therefore allowed.
+SESSION_STATE_STATEMENT = re.compile(
+    r"^\s*(SET\s+(?!(LOCAL|TRANSACTION|CONSTRAINTS)\b)(SESSION\s+)?\w|RESET\b|PREPARE\b|DEALLOCATE\b|LISTEN\b|UNLISTEN\b|"
+    r"DISCARD\b|LOAD\b|CREATE\s+(TEMP|TEMPORARY)\s+TABLE\b(?!.*\bON\s+COMMIT\s+DROP\b))"
+    r"|\bpg_advisory_(try_)?lock(_shared)?\s*\(",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class TransactionPoolingCursor(psycopg2.extensions.cursor):
+    """Cursor used behind a transaction pooler: refuses statements that would create session state."""
+
+    def execute(self, query, vars=None):
+        if isinstance(query, str) and SESSION_STATE_STATEMENT.search(query):
+            raise Exception(f"Session-level statement not allowed under transaction pooling: {query.strip()[:80]}")
+        if self.withhold:
+            raise Exception("WITH HOLD cursors outlive their transaction and cannot be used under transaction pooling.")
+        return super().execute(query, vars)
+
+
 class DBConnector:
     """Manages the database connection pool."""
     _instance = None
 
     def __init__(self):
         if not hasattr(self, 'connection_pool'):
+            self.transaction_pooling = POOLER_CONFIG["enabled"]
             self.connection_pool = self._setup_pool()
 
     def _setup_pool(self):
         """Creates and configures the connection pool."""
+        server = POOLER_CONFIG if self.transaction_pooling else DB_CONFIG
+        options = {}
+        if self.transaction_pooling:
+            options["cursor_factory"] = TransactionPoolingCursor
         try:
             return pool.ThreadedConnectionPool(
-                1, 10,
-                host=DB_CONFIG["host"],
+                POOL_CONFIG["min_connections"], POOL_CONFIG["max_connections"],
+                host=server["host"],
                 database=DB_CONFIG["database"],
                 user=DB_CONFIG["user"],
                 password=DB_CONFIG["password"],
-                port=DB_CONFIG["port"]
+                port=server["port"],
+                **options
             )
         except psycopg2.OperationalError as e:
             print(f"Error connecting to the database pool: {e}")
@@ -46,8 +94,19 @@ class DBConnector:
     def putconn(self, conn):
         """Returns a connection to the pool. FIXES 'putconn' ERROR."""
         if conn:
+            if self.transaction_pooling and not conn.closed:
+                # An open transaction pins a server connection in the pooler; never park one
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.autocommit = False
             self.connection_pool.putconn(conn)
 
+    def close_connection(self):
+        """Closes every connection in the pool (used by the test and job scripts on exit)."""
+        if self.connection_pool:
+            self.connection_pool.closeall()
+        DBConnector._instance = None
+
 def get_db_connector():
     """Singleton accessor function."""
     if DBConnector._instance is None:
@@ -0,0 +1,91 @@
+# export_data_dialog.py
+
+from PySide6.QtWidgets import (
+    QDialog, QFormLayout, QLineEdit, QComboBox, QFileDialog,
+    QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox
+)
+
+from data_exporter import EXPORTS, COMPRESSIONS
+
+
+class ExportDataDialog(QDialog):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("📤 Export Data")
+        self.setFixedSize(450, 250)
+
+        self.result_data = None
+
+        main_layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        # Export Fields
+        self.table_input = QComboBox()
+        self.table_input.addItems(sorted(EXPORTS))
+
+        self.format_input = QComboBox()
+        self.format_input.addItems(["csv", "parquet"])
+
+        self.compression_input = QComboBox()
+        self.compression_input.addItems(list(COMPRESSIONS))
+
+        path_layout = QHBoxLayout()
+        self.path_input = QLineEdit()
+        self.path_input.setPlaceholderText("e.g., books.csv.gz")
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.choose_path)
+        path_layout.addWidget(self.path_input)
+        path_layout.addWidget(browse_button)
+
+        form_layout.addRow("Table:", self.table_input)
+        form_layout.addRow("Format:", self.format_input)
+        form_layout.addRow("Compression:", self.compression_input)
+        form_layout.addRow("Save To:", path_layout)
+
+        main_layout.addLayout(form_layout)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.ok_button = QPushButton("Export")
+        self.cancel_button = QPushButton("Cancel")
+
+        self.ok_button.clicked.connect(self.accept_data)
+        self.cancel_button.clicked.connect(self.reject)
+
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(self.cancel_button)
+
+        main_layout.addLayout(button_layout)
+
+    def choose_path(self):
+        """Opens a save dialog with a file name suggested from the current choices."""
+        suggested = f"{self.table_input.currentText()}.{self.format_input.currentText()}"
+        if self.format_input.currentText() == "csv" and self.compression_input.currentText() == "gzip":
+            suggested += ".gz"
+        elif self.format_input.currentText() == "csv" and self.compression_input.currentText() == "zstd":
+            suggested += ".zst"
+
+        path, _ = QFileDialog.getSaveFileName(self, "Export To", suggested)
+        if path:
+            self.path_input.setText(path)
+
+    def accept_data(self):
+        """Validate and collect the data."""
+        path = self.path_input.text().strip()
+
+        if not path:
+            QMessageBox.warning(self, "Input Error", "Please choose where to save the export.")
+            return
+
+        self.result_data = {
+            'table': self.table_input.currentText(),
+            'format': self.format_input.currentText(),
+            'compression': self.compression_input.currentText(),
+            'path': path,
+        }
+
+        self.accept()
+
+    def get_data(self):
+        return self.result_data
@@ -0,0 +1,84 @@
+# fine_dao.py
+
+from decimal import Decimal
+
+import psycopg2
+from db_connector import get_db_connector
+
+
+class FineDAO:
+    """Data Access Object for the FineLedger and maintained MemberBalance tables."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    # --- Cursor-level helpers (run inside the caller's transaction) ---
+
+    @staticmethod
+    def post_fine(cursor, member_id, loan_id, amount, entry_type):
+        """Appends a ledger entry and applies it to the member's running balance."""
+        cursor.execute("""
+            INSERT INTO FineLedger (member_id, loan_id, amount, entry_type)
+            VALUES (%s, %s, %s, %s);
+        """, (member_id, loan_id, amount, entry_type))
+        cursor.execute("""
+            INSERT INTO MemberBalance (member_id, balance, updated_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (member_id) DO UPDATE
+            SET balance = MemberBalance.balance + EXCLUDED.balance, updated_at = NOW();
+        """, (member_id, amount))
+
+    @staticmethod
+    def settle_return(cursor, loan_id, member_id, final_fine):
+        """Closes a loan's accrual and posts whatever the nightly job has not already charged."""
+        cursor.execute("DELETE FROM LoanFineAccrual WHERE loan_id = %s RETURNING accrued_amount;", (loan_id,))
+        record = cursor.fetchone()
+        accrued = record[0] if record else Decimal('0')
+
+        difference = Decimal(str(final_fine)) - accrued
+        if difference != 0:
+            FineDAO.post_fine(cursor, member_id, loan_id, difference, 'RETURN')
+
+    # --- Public API ---
+
+    def get_member_balance(self, member_id):
+        """Returns the member's outstanding fine balance (maintained, not summed from history)."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT balance FROM MemberBalance WHERE member_id = %s;", (member_id,))
+                record = cursor.fetchone()
+                return float(record[0]) if record else 0.0
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_member_ledger(self, member_id, limit=50):
+        """Fetches the member's most recent fine postings."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT entry_id, loan_id, amount, entry_type, run_date
+                    FROM FineLedger
+                    WHERE member_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT %s;
+                """
+                cursor.execute(query, (member_id, limit))
+                records = cursor.fetchall()
+
+                entries = []
+                for record in records:
+                    entries.append({
+                        'entry_id': record[0], 'loan_id': record[1], 'amount': float(record[2]),
+                        'entry_type': record[3], 'run_date': str(record[4])
+                    })
+                return entries
+        except psycopg2.Error as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
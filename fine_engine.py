@@ -0,0 +1,158 @@
+# fine_engine.py
+# Nightly fine accrual for outstanding overdue loans.
+# Usage: python fine_engine.py [--daily-rate 0.50] [--grace-days 0] [--cap 20.00] [--batch-size 100000]
+# Each loan is charged under its LoanPolicy (migration 0014); the rate flags override that for every loan.
+
+import argparse
+import io
+import time
+
+import numpy as np
+
+from db_connector import get_db_connector
+from fine_policy import FinePolicy
+
+
+class FineEngine:
+    """Streams overdue loans, computes fines in NumPy batches and posts the deltas to the ledger."""
+
+    def __init__(self, policy=None, batch_size=100000):
+        self.db_connector = get_db_connector()
+        self.policy = policy  # None: each loan's LoanPolicy terms
+        self.batch_size = batch_size
+
+    def compute_fines_cents(self, days_overdue, rate_cents, grace_days, cap_cents):
+        """Vectorised FinePolicy.fine_for over per-loan terms, in integer cents to avoid float drift.
+
+        cap_cents < 0 means uncapped.
+        """
+        fines = np.maximum(days_overdue - grace_days, 0) * rate_cents
+        return np.where(cap_cents >= 0, np.minimum(fines, cap_cents), fines)
+
+    def policy_terms_cents(self, rows):
+        """(rate_cents, grace_days, cap_cents) of the override policy, as columns for rows loans."""
+        cap = -1 if self.policy.max_fine is None else int(round(self.policy.max_fine * 100))
+        return (np.full(rows, int(round(self.policy.daily_rate * 100)), dtype=np.int64),
+                np.full(rows, self.policy.grace_days, dtype=np.int64),
+                np.full(rows, cap, dtype=np.int64))
+
+    def run(self):
+        """Runs one accrual pass in a single transaction. Returns a summary dict."""
+        started = time.perf_counter()
+        loans_scanned = 0
+        loans_charged = 0
+        total_cents = 0
+
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TEMP TABLE fine_accrual_stage (
+                        loan_id INT, member_id INT, delta_cents BIGINT, total_cents BIGINT
+                    ) ON COMMIT DROP;
+                """)
+
+            # Server-side cursor: rows arrive batch_size at a time instead of all at once
+            with conn.cursor(name='fine_accrual_cursor') as stream, conn.cursor() as cursor:
+                stream.itersize = self.batch_size
+                # Per-loan terms: the policy for the member's category and the book's type. Loans still
+                # within their grace period come back with a zero fine and no delta.
+                stream.execute("""
+                    SELECT l.loan_id, l.member_id, CURRENT_DATE - l.due_date,
+                        COALESCE((a.accrued_amount * 100)::BIGINT, 0),
+                        (p.daily_fine * 100)::BIGINT, p.grace_days, COALESCE((p.max_fine * 100)::BIGINT, -1)
+                    FROM Loan l
+                    JOIN Member m ON m.member_id = l.member_id
+                    JOIN Book b ON b.book_id = l.book_id
+                    CROSS JOIN LATERAL loan_policy_for(m.category, b.book_type) p
+                    LEFT JOIN LoanFineAccrual a ON a.loan_id = l.loan_id
+                    WHERE l.return_date IS NULL AND l.due_date < CURRENT_DATE;
+                """)
+
+                while True:
+                    rows = stream.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    loans_scanned += len(rows)
+
+                    batch = np.array(rows, dtype=np.int64)
+                    if self.policy is None:
+                        terms = batch[:, 4], batch[:, 5], batch[:, 6]
+                    else:
+                        terms = self.policy_terms_cents(len(batch))
+                    fines = self.compute_fines_cents(batch[:, 2], *terms)
+                    deltas = fines - batch[:, 3]
+
+                    # Only loans whose fine moved since the last run are written back
+                    changed = deltas != 0
+                    if not changed.any():
+                        continue
+                    staged = np.column_stack((batch[changed, 0], batch[changed, 1], deltas[changed], fines[changed]))
+                    loans_charged += len(staged)
+                    total_cents += int(deltas[changed].sum())
+
+                    buffer = io.StringIO()
+                    np.savetxt(buffer, staged, fmt='%d', delimiter='\t')
+                    buffer.seek(0)
+                    cursor.copy_expert("COPY fine_accrual_stage FROM STDIN", buffer)
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO FineLedger (member_id, loan_id, amount, entry_type)
+                    SELECT member_id, loan_id, delta_cents / 100.0, 'ACCRUAL' FROM fine_accrual_stage;
+                """)
+                cursor.execute("""
+                    INSERT INTO LoanFineAccrual (loan_id, member_id, accrued_amount, last_accrued)
+                    SELECT loan_id, member_id, total_cents / 100.0, CURRENT_DATE FROM fine_accrual_stage
+                    ON CONFLICT (loan_id) DO UPDATE
+                    SET accrued_amount = EXCLUDED.accrued_amount, last_accrued = EXCLUDED.last_accrued;
+                """)
+                cursor.execute("""
+                    INSERT INTO MemberBalance (member_id, balance, updated_at)
+                    SELECT member_id, SUM(delta_cents) / 100.0, NOW() FROM fine_accrual_stage
+                    GROUP BY member_id
+                    ON CONFLICT (member_id) DO UPDATE
+                    SET balance = MemberBalance.balance + EXCLUDED.balance, updated_at = NOW();
+                """)
+                members_charged = cursor.rowcount
+
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+        return {
+            'loans_scanned': loans_scanned,
+            'loans_charged': loans_charged,
+            'members_charged': members_charged,
+            'total_accrued': total_cents / 100.0,
+            'seconds': time.perf_counter() - started
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Accrue fines on outstanding overdue loans.")
+    parser.add_argument('--daily-rate', type=float,
+                        help="Charge every loan this rate instead of its LoanPolicy terms.")
+    parser.add_argument('--grace-days', type=int, default=0, help="With --daily-rate.")
+    parser.add_argument('--cap', type=float, help="With --daily-rate: maximum fine per loan (default: uncapped).")
+    parser.add_argument('--batch-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    policy = None
+    if args.daily_rate is not None:
+        policy = FinePolicy(daily_rate=args.daily_rate, grace_days=args.grace_days, max_fine=args.cap)
+    engine = FineEngine(policy, batch_size=args.batch_size)
+    try:
+        summary = engine.run()
+        terms = policy if policy is not None else "each loan's LoanPolicy"
+        print(f"--- Fine accrual complete under {terms} ---")
+        print(f"Overdue loans scanned: {summary['loans_scanned']}")
+        print(f"Loans charged:         {summary['loans_charged']}")
+        print(f"Members charged:       {summary['members_charged']}")
+        print(f"Total accrued:         ${summary['total_accrued']:.2f}")
+        print(f"Elapsed:               {summary['seconds']:.2f} s")
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,25 @@
+# fine_policy.py
+
+
+class FinePolicy:
+    """Overdue fine rules: a daily rate charged after a grace period, capped per loan.
+
+    The library's own rules live in LoanPolicy (migration 0014); this is the flat override
+    fine_engine.py takes from its command line.
+    """
+
+    def __init__(self, daily_rate=0.50, grace_days=0, max_fine=None):
+        self.daily_rate = daily_rate
+        self.grace_days = grace_days
+        self.max_fine = max_fine  # None means uncapped
+
+    def fine_for(self, days_overdue):
+        """Returns the fine for a single loan that is days_overdue past its due date."""
+        fine = max(days_overdue - self.grace_days, 0) * self.daily_rate
+        if self.max_fine is not None:
+            fine = min(fine, self.max_fine)
+        return round(fine, 2)
+
+    def __repr__(self):
+        return (f"FinePolicy(daily_rate={self.daily_rate}, grace_days={self.grace_days}, "
+                f"max_fine={self.max_fine})")
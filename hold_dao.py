@@ -0,0 +1,236 @@
+# hold_dao.py
+
+import psycopg2
+from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
+from copy_dao import CopyDAO
+
+# Days a READY hold stays reserved for the member before it expires.
+HOLD_PICKUP_DAYS = 3
+
+
+class HoldDAO:
+    """Data Access Object for the per-book Hold (reservation) queue."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    # --- Cursor-level helpers (run inside the caller's transaction) ---
+
+    @staticmethod
+    def allocate_next_hold(cursor, book_id):
+        """Assigns a returned copy to the head of the book's queue. Returns (hold_id, member_id) or None."""
+        # The sub-select reads the first entry of hold_queue_idx for this book,
+        # so the cost does not depend on how many members are queued.
+        # Plain FOR UPDATE: a head locked by a cancellation or pickup is waited for, never skipped.
+        query = """
+            UPDATE Hold
+            SET status = 'READY', ready_at = NOW(),
+                expires_at = NOW() + make_interval(days => %s)
+            WHERE hold_id = (
+                SELECT hold_id FROM Hold
+                WHERE book_id = %s AND status = 'WAITING'
+                ORDER BY hold_id
+                LIMIT 1
+                FOR UPDATE
+            )
+            RETURNING hold_id, member_id;
+        """
+        while True:
+            cursor.execute(query, (HOLD_PICKUP_DAYS, book_id))
+            allocated = cursor.fetchone()
+            if allocated is not None:
+                return allocated
+            # A head that left the queue while we waited drops out of LIMIT 1 without its
+            # successor being read; look again unless the queue is really empty.
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM Hold WHERE book_id = %s AND status = 'WAITING');",
+                (book_id,)
+            )
+            if not cursor.fetchone()[0]:
+                return None
+
+    @staticmethod
+    def release_reserved_copy(cursor, book_id, copy_id=None, from_hold_shelf=False):
+        """Passes a copy to the next holder, or puts it back on the shelf. Returns the allocated (hold_id, member_id) or None.
+
+        copy_id is the physical copy being returned, when known; from_hold_shelf means the copy was
+        reserved for a hold that has just been cancelled or expired.
+        """
+        # Serialises with place_hold (FOR SHARE): a hold placed before this lock is allocated
+        # below, one placed after it sees the copy back on the shelf and is refused.
+        cursor.execute("SELECT 1 FROM Book WHERE book_id = %s FOR NO KEY UPDATE;", (book_id,))
+        allocated = HoldDAO.allocate_next_hold(cursor, book_id)
+        if allocated is None:
+            cursor.execute(
+                "UPDATE Book SET available_copies = available_copies + 1 WHERE book_id = %s;",
+                (book_id,)
+            )
+        if copy_id is not None:
+            CopyDAO.set_status(cursor, copy_id, 'AVAILABLE' if allocated is None else 'HOLD_SHELF')
+        elif from_hold_shelf and allocated is None:
+            CopyDAO.shelve_reserved_copy(cursor, book_id)
+        return allocated
+
+    @staticmethod
+    def fulfill_ready_hold(cursor, book_id, member_id):
+        """Marks the member's READY hold on a book as collected. Returns True if one existed."""
+        query = """
+            UPDATE Hold SET status = 'FULFILLED', closed_at = NOW()
+            WHERE book_id = %s AND member_id = %s AND status = 'READY'
+            RETURNING hold_id;
+        """
+        cursor.execute(query, (book_id, member_id))
+        return cursor.fetchone() is not None
+
+    # --- Public API ---
+
+    def place_hold(self, book_id, member_id):
+        """Queues a member for a book with no available copies. Returns the new hold_id."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # FOR SHARE holds off returns until the hold is committed (see release_reserved_copy),
+                # so no copy can reach the shelf between this check and the insert
+                cursor.execute("SELECT available_copies FROM Book WHERE book_id = %s FOR SHARE;", (book_id,))
+                record = cursor.fetchone()
+                if record is None:
+                    raise NotFoundError(f"Book ID {book_id} not found.")
+                if record[0] > 0:
+                    raise BusinessRuleError(f"Book ID {book_id} has available copies. Please check it out instead.")
+
+                query = """
+                    INSERT INTO Hold (book_id, member_id)
+                    VALUES (%s, %s) RETURNING hold_id;
+                """
+                cursor.execute(query, (book_id, member_id))
+                hold_id = cursor.fetchone()[0]
+                conn.commit()
+                return hold_id
+        except psycopg2.IntegrityError as e:
+            conn.rollback()
+            if 'hold_active_unique_idx' in str(e):
+                raise BusinessRuleError(f"You already have an active hold on Book ID {book_id}.")
+            raise Exception(f"Database Integrity Error: {e}")
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def cancel_hold(self, hold_id, member_id):
+        """Cancels a member's WAITING or READY hold; a reserved copy moves to the next holder."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT book_id, status FROM Hold
+                    WHERE hold_id = %s AND member_id = %s AND status IN ('WAITING', 'READY')
+                    FOR UPDATE;
+                """
+                cursor.execute(query, (hold_id, member_id))
+                record = cursor.fetchone()
+                if record is None:
+                    raise NotFoundError(f"No active hold with ID {hold_id} for Member ID {member_id}.")
+                book_id, status = record
+
+                cursor.execute(
+                    "UPDATE Hold SET status = 'CANCELLED', closed_at = NOW() WHERE hold_id = %s;",
+                    (hold_id,)
+                )
+                if status == 'READY':
+                    self.release_reserved_copy(cursor, book_id, from_hold_shelf=True)
+
+                conn.commit()
+                return True
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def has_ready_hold(self, book_id, member_id):
+        """Checks whether a copy of the book is reserved for the member."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT 1 FROM Hold
+                    WHERE book_id = %s AND member_id = %s AND status = 'READY';
+                """
+                cursor.execute(query, (book_id, member_id))
+                return cursor.fetchone() is not None
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_member_holds(self, member_id):
+        """Fetches a member's active holds with their position in each book's queue."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT h.hold_id, h.book_id, b.title, h.status, h.placed_at, h.expires_at,
+                        CASE WHEN h.status = 'WAITING' THEN (
+                            SELECT COUNT(*) FROM Hold q
+                            WHERE q.book_id = h.book_id AND q.status = 'WAITING' AND q.hold_id <= h.hold_id
+                        ) END AS position
+                    FROM Hold h
+                    JOIN Book b ON h.book_id = b.book_id
+                    WHERE h.member_id = %s AND h.status IN ('WAITING', 'READY')
+                    ORDER BY h.placed_at;
+                """
+                cursor.execute(query, (member_id,))
+                records = cursor.fetchall()
+
+                holds = []
+                for record in records:
+                    holds.append({
+                        'hold_id': record[0], 'book_id': record[1], 'title': record[2],
+                        'status': record[3], 'placed_at': str(record[4]),
+                        'expires_at': str(record[5]) if record[5] else '', 'position': record[6]
+                    })
+                return holds
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def expire_holds(self, batch_size=500):
+        """Expires READY holds past their pickup window, in batches. Returns the number expired."""
+        total_expired = 0
+        while True:
+            conn = self.db_connector.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    query = """
+                        UPDATE Hold SET status = 'EXPIRED', closed_at = NOW()
+                        WHERE hold_id IN (
+                            SELECT hold_id FROM Hold
+                            WHERE status = 'READY' AND expires_at < NOW()
+                            ORDER BY expires_at
+                            LIMIT %s
+                            FOR UPDATE
+                        )
+                        RETURNING book_id;
+                    """
+                    cursor.execute(query, (batch_size,))
+                    expired_books = [record[0] for record in cursor.fetchall()]
+
+                    # Each expired hold frees one reserved copy of its book.
+                    for book_id in expired_books:
+                        self.release_reserved_copy(cursor, book_id, from_hold_shelf=True)
+
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                self.db_connector.putconn(conn)
+
+            total_expired += len(expired_books)
+            if len(expired_books) < batch_size:
+                return total_expired
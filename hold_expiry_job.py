@@ -0,0 +1,34 @@
+# hold_expiry_job.py
+# Periodic batch that expires unclaimed READY holds and passes the copy on.
+# Usage: python hold_expiry_job.py [--interval SECONDS] [--batch-size N]
+
+import argparse
+import time
+
+from hold_dao import HoldDAO
+from db_connector import get_db_connector
+
+
+def run_expiry(batch_size):
+    """Runs one expiry pass and prints how many holds were expired."""
+    expired = HoldDAO().expire_holds(batch_size=batch_size)
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Expired {expired} unclaimed hold(s).")
+    return expired
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Expire unclaimed book holds.")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Repeat every N seconds (default: run once and exit).")
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    try:
+        run_expiry(args.batch_size)
+        while args.interval > 0:
+            time.sleep(args.interval)
+            run_expiry(args.batch_size)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,48 @@
+# kiosk_session.py
+# Idle logout for shared member kiosks: any key, mouse, wheel or touch input anywhere in the
+# application restarts the countdown; when it runs out the current member is logged out.
+
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtWidgets import QApplication
+
+KIOSK_IDLE_TIMEOUT_MS = 120_000
+# A dialog left open at timeout is dismissed first; the logout follows after this grace period
+MODAL_GRACE_MS = 1000
+
+ACTIVITY_EVENTS = {
+    QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.Wheel, QEvent.TouchBegin,
+}
+
+
+class IdleLogout(QObject):
+    """Calls on_timeout after timeout_ms without user input, while armed (start() .. stop())."""
+
+    def __init__(self, on_timeout, timeout_ms=KIOSK_IDLE_TIMEOUT_MS, parent=None):
+        super().__init__(parent)
+        self.on_timeout = on_timeout
+        self.timeout_ms = timeout_ms
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._expired)
+        QApplication.instance().installEventFilter(self)
+
+    def start(self):
+        self.timer.start(self.timeout_ms)
+
+    def stop(self):
+        self.timer.stop()
+
+    def eventFilter(self, watched, event):
+        # Only restart while armed; never consume the event
+        if self.timer.isActive() and event.type() in ACTIVITY_EVENTS:
+            self.timer.start(self.timeout_ms)
+        return False
+
+    def _expired(self):
+        modal = QApplication.activeModalWidget()
+        if modal is not None:
+            # Let the code waiting on the dialog finish before the session goes away
+            modal.reject()
+            self.timer.start(MODAL_GRACE_MS)
+            return
+        self.on_timeout()
@@ -3,19 +3,59 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QTableWidget, QTabWidget,
-    QTableWidgetItem, QHeaderView, QMessageBox, QDialog
+    QTableWidgetItem, QHeaderView, QMessageBox, QDialog,
+    QProgressDialog, QApplication
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Qt
 from PySide6.QtGui import QFont
+import time
 
 # Import DAOs
 from book_dao import BookDAO
+from search_controller import SearchController, SuggestionCompleter
+from autocomplete_index import get_autocomplete_index
+from data_exporter import DataExporter
 
 # Import Widgets/Dialogs
 from add_book_dialog import AddBookDialog
+from export_data_dialog import ExportDataDialog
+from weed_books_dialog import WeedBooksDialog
 from bookclub_management_widget import BookClubManagementWidget
 from member_management_widget import MemberManagementWidget  # <--- NEW IMPORT
 
+# Seconds between progress updates from an export; per-row signals would flood the GUI thread
+EXPORT_PROGRESS_SECONDS = 0.2
+
+
+class _ExportSignals(QObject):
+    progress = Signal(int)
+    finished = Signal(int)
+    failed = Signal(str)
+
+
+class _ExportTask(QRunnable):
+    """Runs one DataExporter export on the thread pool; results come back through signals."""
+
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+        self.signals = _ExportSignals()
+        self.reported_at = 0.0
+
+    def run(self):
+        def on_progress(rows):
+            now = time.monotonic()
+            if now - self.reported_at >= EXPORT_PROGRESS_SECONDS:
+                self.reported_at = now
+                self.signals.progress.emit(rows)
+
+        try:
+            count = DataExporter().export(self.data['table'], self.data['path'], self.data['format'],
+                                          self.data['compression'], on_progress)
+            self.signals.finished.emit(count)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
 
 class LibrarianMainWidget(QWidget):
 
@@ -30,6 +70,13 @@ class LibrarianMainWidget(QWidget):
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(self.tabs)
 
+        logout_layout = QHBoxLayout()
+        logout_layout.addStretch(1)
+        self.logout_button = QPushButton("🚪 Log Out")
+        self.logout_button.clicked.connect(self.parent.logout)
+        logout_layout.addWidget(self.logout_button)
+        main_layout.addLayout(logout_layout)
+
         # Connect tab change to refresh club data
         self.tabs.currentChanged.connect(self.handle_tab_change)
 
@@ -72,6 +119,19 @@ class LibrarianMainWidget(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by Title, Author, or ISBN...")
         self.search_input.returnPressed.connect(self.search_books)
+
+        # Live search: debounced, cancellable, results streamed into the table
+        self.search_controller = SearchController(self, self.book_dao)
+        self.search_input.textEdited.connect(self.search_controller.text_edited)
+        self.search_controller.search_started.connect(lambda term: self.book_table.setRowCount(0))
+        self.search_controller.results_batch.connect(self.append_book_rows)
+        self.search_controller.search_finished.connect(self.handle_search_finished)
+        self.search_controller.search_failed.connect(
+            lambda message: QMessageBox.critical(self, "Search Error", f"An error occurred during search: {message}"))
+        self.search_controller.search_cleared.connect(self.load_book_data)
+        # Title/author/ISBN suggestions from the in-memory index
+        self.suggestions = SuggestionCompleter(self.search_input, self.search_controller)
+
         search_button = QPushButton("🔍 Search")
         search_button.clicked.connect(self.search_books)
         search_layout.addWidget(self.search_input)
@@ -88,7 +148,7 @@ class LibrarianMainWidget(QWidget):
         self.book_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.book_table.verticalHeader().setVisible(False)
         self.book_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.book_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.book_table.setSelectionMode(QTableWidget.ExtendedSelection)
         main_layout.addWidget(self.book_table)
 
         # CRUD and Workflow Buttons
@@ -97,15 +157,21 @@ class LibrarianMainWidget(QWidget):
         self.add_button.clicked.connect(self.add_book)
         self.edit_button = QPushButton("✏️ Edit Selected Book")
         self.edit_button.clicked.connect(self.edit_book)
-        self.delete_button = QPushButton("🗑️ Delete Selected Book")
+        self.delete_button = QPushButton("🗑️ Delete Selected Book(s)")
         self.delete_button.clicked.connect(self.delete_book)
+        self.weed_button = QPushButton("🧹 Weed Collection")
+        self.weed_button.clicked.connect(self.weed_collection)
+        self.export_button = QPushButton("📤 Export Data")
+        self.export_button.clicked.connect(self.export_data)
         self.loan_button = QPushButton("➡️ Process Loan/Return")
         self.loan_button.clicked.connect(self.parent.show_loan_manager)
 
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
         button_layout.addWidget(self.delete_button)
+        button_layout.addWidget(self.weed_button)
         button_layout.addStretch(1)
+        button_layout.addWidget(self.export_button)
         button_layout.addWidget(self.loan_button)
         main_layout.addLayout(button_layout)
 
@@ -126,33 +192,30 @@ class LibrarianMainWidget(QWidget):
                 self.book_table.setRowCount(0)
                 return
 
-        self.book_table.setRowCount(len(books))
+        self.book_table.setRowCount(0)
+        self.append_book_rows(books)
+
+    def append_book_rows(self, books):
+        """Appends books to the end of the table (used for full loads and streamed search batches)."""
+        start_row = self.book_table.rowCount()
+        self.book_table.setRowCount(start_row + len(books))
 
         for row_index, book in enumerate(books):
-            self.book_table.setItem(row_index, 0, QTableWidgetItem(str(book.get('book_id', ''))))
-            self.book_table.setItem(row_index, 1, QTableWidgetItem(book.get('title', '')))
-            self.book_table.setItem(row_index, 2, QTableWidgetItem(book.get('authors', '')))
-            self.book_table.setItem(row_index, 3, QTableWidgetItem(book.get('isbn', '')))
-            self.book_table.setItem(row_index, 4, QTableWidgetItem(str(book.get('total_copies', 0))))
-            self.book_table.setItem(row_index, 5, QTableWidgetItem(str(book.get('available_copies', 0))))
+            self.book_table.setItem(start_row + row_index, 0, QTableWidgetItem(str(book.get('book_id', ''))))
+            self.book_table.setItem(start_row + row_index, 1, QTableWidgetItem(book.get('title', '')))
+            self.book_table.setItem(start_row + row_index, 2, QTableWidgetItem(book.get('authors', '')))
+            self.book_table.setItem(start_row + row_index, 3, QTableWidgetItem(book.get('isbn', '')))
+            self.book_table.setItem(start_row + row_index, 4, QTableWidgetItem(str(book.get('total_copies', 0))))
+            self.book_table.setItem(start_row + row_index, 5, QTableWidgetItem(str(book.get('available_copies', 0))))
 
     def search_books(self):
-        """Calls the DAO search method and updates the table."""
-        search_term = self.search_input.text().strip()
+        """Runs the search immediately (Enter or the Search button)."""
+        self.search_controller.search_now(self.search_input.text())
 
-        if not search_term:
-            self.load_book_data()
-            return
-
-        try:
-            results = self.book_dao.search_books(search_term)
-            if results:
-                self.load_book_data(results)
-            else:
-                QMessageBox.information(self, "Search Result", f"No books found matching '{search_term}'.")
-                self.book_table.setRowCount(0)
-        except Exception as e:
-            QMessageBox.critical(self, "Search Error", f"An error occurred during search: {e}")
+    def handle_search_finished(self, search_term, total, explicit):
+        """Only explicit searches report an empty result; live typing just shows an empty table."""
+        if explicit and total == 0:
+            QMessageBox.information(self, "Search Result", f"No books found matching '{search_term}'.")
 
     # --- CRUD Implementation Methods ---
 
@@ -166,6 +229,14 @@ class LibrarianMainWidget(QWidget):
         item = self.book_table.item(row, 0)
         return int(item.text())
 
+    def get_selected_book_ids(self):
+        """Returns the IDs of every selected row (warns and returns [] when nothing is selected)."""
+        rows = sorted({item.row() for item in self.book_table.selectedItems()})
+        if not rows:
+            QMessageBox.warning(self, "Selection Error", "Please select a book from the table first.")
+            return []
+        return [int(self.book_table.item(row, 0).text()) for row in rows]
+
     def add_book(self):
         """Opens dialog, calls DAO to add book/author, and refreshes the table."""
         dialog = AddBookDialog(self)
@@ -183,8 +254,12 @@ class LibrarianMainWidget(QWidget):
             try:
                 author_id = self.book_dao.add_author(author_first, author_last)
                 if author_id:
-                    self.book_dao.add_book(title, isbn, year, copies, [author_id])
+                    book = self.book_dao.add_book(title, isbn, year, copies, [author_id])
                     QMessageBox.information(self, "Success", f"Book '{title}' added successfully.")
+                    self.search_controller.invalidate_cache()
+                    index = get_autocomplete_index(wait=False)
+                    if index is not None:
+                        index.add_book(book.book_id, book.title, book.authors, book.isbn)
                     self.load_book_data()
             except Exception as e:
                 QMessageBox.critical(self, "Database Error", f"Failed to add book. Error: {e}")
@@ -197,18 +272,120 @@ class LibrarianMainWidget(QWidget):
                                 f"Editing book ID {book_id} functionality will be implemented next.")
 
     def delete_book(self):
-        """Deletes the selected book using the DAO method."""
-        book_id = self.get_selected_book_id()
-        if book_id is None: return
+        """Deletes the selected book(s) in one bulk weeding pass."""
+        book_ids = self.get_selected_book_ids()
+        if not book_ids: return
 
+        target = f"Book ID {book_ids[0]}" if len(book_ids) == 1 else f"{len(book_ids)} selected books"
         reply = QMessageBox.question(self, 'Confirm Delete',
-                                     f"Are you sure you want to permanently delete Book ID {book_id}? (Must not have active loans)",
+                                     f"Are you sure you want to permanently delete {target}? (Must not have active loans)",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                self.book_dao.delete_book_by_id(book_id)
-                QMessageBox.information(self, "Success", f"Book ID {book_id} deleted successfully.")
-                self.load_book_data()
-            except Exception as e:
-                QMessageBox.critical(self, "Deletion Error", str(e))
\ No newline at end of file
+            self.run_weeding(book_ids)
+
+    def weed_collection(self):
+        """Finds the books matching the weeding criteria and deletes them after one confirmation."""
+        dialog = WeedBooksDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        data = dialog.get_data()
+        if not data: return
+
+        try:
+            candidates = self.book_dao.find_weeding_candidates(data['not_borrowed_years'], data['published_before'])
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to find weeding candidates: {e}")
+            return
+        if not candidates:
+            QMessageBox.information(self, "Weed Collection", "No books match these criteria.")
+            return
+
+        preview = "\n".join(f"{book['book_id']}: {book['title']}" for book in candidates[:10])
+        if len(candidates) > 10:
+            preview += f"\n... and {len(candidates) - 10:,} more"
+        reply = QMessageBox.question(self, 'Confirm Weeding',
+                                     f"{len(candidates):,} book(s) match. Permanently delete them? "
+                                     f"Books with active loans are skipped.\n\n{preview}",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.run_weeding([book['book_id'] for book in candidates])
+
+    def run_weeding(self, book_ids):
+        """Deletes the books in batches with a progress dialog, then reports per book."""
+        progress_dialog = QProgressDialog(f"Deleting {len(book_ids):,} book(s)...", None, 0, len(book_ids), self)
+        progress_dialog.setWindowTitle("Weeding In Progress")
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.show()
+
+        def report_progress(done, total):
+            progress_dialog.setValue(done)
+            progress_dialog.setLabelText(f"Deleting books... {done:,} of {total:,}")
+            QApplication.processEvents()
+
+        try:
+            result = self.book_dao.weed_books(book_ids, on_progress=report_progress)
+        except Exception as e:
+            progress_dialog.close()
+            QMessageBox.critical(self, "Deletion Error", str(e))
+            # Earlier batches may have committed
+            self.search_controller.invalidate_cache()
+            self.load_book_data()
+            return
+        progress_dialog.close()
+
+        self.search_controller.invalidate_cache()
+        index = get_autocomplete_index(wait=False)
+        if index is not None:
+            for book in result['report']:
+                if book.status == 'WEEDED':
+                    index.remove_book(book.book_id)
+        self.load_book_data()
+
+        message = QMessageBox(self)
+        message.setWindowTitle("Deletion Complete")
+        message.setText(f"Deleted {result['weeded']:,} book(s) and {result['authors_removed']:,} author(s) "
+                        f"left without books.\nSkipped {result['blocked']:,} with active loans; "
+                        f"{result['not_found']:,} no longer existed.")
+        skipped = [f"{book.book_id}: {book.title} — {book.active_loans} active loan(s)"
+                   if book.status == 'ACTIVE_LOANS' else f"{book.book_id}: not found"
+                   for book in result['report'] if book.status != 'WEEDED']
+        if skipped:
+            message.setDetailedText("\n".join(skipped))
+        message.exec()
+
+    def export_data(self):
+        """Opens the export dialog and streams the chosen table to disk on a worker thread."""
+        dialog = ExportDataDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        data = dialog.get_data()
+        if not data: return
+
+        self.export_progress = QProgressDialog(f"Exporting {data['table']}...", None, 0, 0, self)
+        self.export_progress.setWindowTitle("Export In Progress")
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.show()
+        self.export_button.setEnabled(False)
+
+        # Connected to this widget's methods, so the pool thread's signals are queued to the GUI thread
+        self.export_task = _ExportTask(data)
+        self.export_task.signals.progress.connect(self._on_export_progress)
+        self.export_task.signals.finished.connect(self._on_export_finished)
+        self.export_task.signals.failed.connect(self._on_export_failed)
+        QThreadPool.globalInstance().start(self.export_task)
+
+    def _on_export_progress(self, rows):
+        self.export_progress.setLabelText(f"Exporting {self.export_task.data['table']}... {rows:,} rows")
+
+    def _on_export_finished(self, count):
+        self.export_progress.close()
+        self.export_button.setEnabled(True)
+        data = self.export_task.data
+        QMessageBox.information(self, "Export Complete",
+                                f"Exported {count:,} {data['table']} rows to:\n{data['path']}")
+
+    def _on_export_failed(self, message):
+        self.export_progress.close()
+        self.export_button.setEnabled(True)
+        QMessageBox.critical(self, "Export Failed", message)
@@ -0,0 +1,12 @@
+# library_errors.py
+# Exceptions the DAOs raise when the library's rules refuse a request. Both derive from Exception,
+# so the widgets' `except Exception` handlers show their messages as before; api_server.py returns
+# them to the client and hides everything else behind a 500.
+
+
+class BusinessRuleError(Exception):
+    """A request the library's rules refuse: loan limit reached, copy reserved, club full..."""
+
+
+class NotFoundError(BusinessRuleError):
+    """The book, member, loan, copy, club or hold a request names does not exist."""
@@ -2,14 +2,395 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
 from datetime import datetime, timedelta  # <-- CRITICAL FIX: Add datetime import
+from hold_dao import HoldDAO
+from fine_dao import FineDAO
+from copy_dao import CopyDAO
+from records import ActiveLoanRecord, OverdueLoanRecord, LoanHistoryRecord
+
+# Loan limits, periods, fines and renewals come from LoanPolicy (migration 0014, loan_policy_dao.py)
+
+# Loans per history page; older pages load on demand
+HISTORY_PAGE_SIZE = 25
 
 
 class LoanDAO:
     """Data Access Object for managing book loans."""
 
-    def __init__(self):
+    def __init__(self, book_dao=None, member_dao=None):
         self.db_connector = get_db_connector()
+        self.book_dao = book_dao
+        self.member_dao = member_dao
+        self.hold_dao = HoldDAO()
+
+    # --- Cursor-level steps shared by the by-book and by-barcode paths ---
+
+    @staticmethod
+    def _lock_member(cursor, member_id):
+        """Locks the member row so concurrent checkouts cannot exceed the loan limit. Returns the username."""
+        cursor.execute("""
+            SELECT u.username
+            FROM Member m JOIN "User" u ON u.user_id = m.member_id
+            WHERE m.member_id = %s
+            FOR UPDATE OF m;
+        """, (member_id,))
+        record = cursor.fetchone()
+        if record is None:
+            raise NotFoundError(f"Member ID {member_id} not found.")
+        return record[0]
+
+    @staticmethod
+    def _lock_book(cursor, book_id):
+        """Pins the book for the rest of the checkout, hold pickups included.
+
+        FOR KEY SHARE does not block other checkouts, but weed_books (FOR UPDATE) waits for this
+        loan to commit and then sees it, or has already deleted the book and it is reported missing.
+        Taken before the hold is fulfilled: weeding locks Book before its cascade reaches Hold.
+        """
+        cursor.execute("SELECT 1 FROM Book WHERE book_id = %s FOR KEY SHARE;", (book_id,))
+        if cursor.fetchone() is None:
+            raise NotFoundError(f"Book ID {book_id} not found.")
+
+    @staticmethod
+    def _take_available_copy(cursor, book_id):
+        cursor.execute("""
+            UPDATE Book SET available_copies = available_copies - 1
+            WHERE book_id = %s AND available_copies > 0
+            RETURNING book_id;
+        """, (book_id,))
+        if cursor.fetchone() is None:
+            raise BusinessRuleError(f"Book ID {book_id} not found or has no available copies.")
+
+    @staticmethod
+    def _insert_loan(cursor, book_id, member_id, copy_id=None):
+        """Checks the member's loan limit, creates the Loan row and counts it against the member.
+
+        One statement: the policy for the member's category and the book's type is resolved,
+        checked and applied (due date) where the loan is inserted. The caller holds the member
+        lock, so current_loans cannot move underneath it, and the _lock_book lock, so the book
+        cannot be weeded before the loan commits. Returns (loan_id, loan_date, due_date).
+        """
+        cursor.execute("""
+            WITH policy AS (
+                SELECT m.member_id, m.current_loans, p.max_loans, p.loan_period_days
+                FROM Member m
+                JOIN Book b ON b.book_id = %(book_id)s
+                CROSS JOIN LATERAL loan_policy_for(m.category, b.book_type) p
+                WHERE m.member_id = %(member_id)s
+            ), inserted AS (
+                INSERT INTO Loan (book_id, member_id, copy_id, loan_date, due_date)
+                SELECT %(book_id)s, member_id, %(copy_id)s, CURRENT_DATE, CURRENT_DATE + loan_period_days
+                FROM policy
+                WHERE current_loans < max_loans
+                RETURNING loan_id, loan_date, due_date
+            ), counted AS (
+                UPDATE Member SET current_loans = current_loans + 1
+                WHERE member_id = %(member_id)s AND EXISTS (SELECT 1 FROM inserted)
+            )
+            SELECT policy.max_loans, inserted.loan_id, inserted.loan_date, inserted.due_date
+            FROM policy LEFT JOIN inserted ON TRUE;
+        """, {'book_id': book_id, 'member_id': member_id, 'copy_id': copy_id})
+        record = cursor.fetchone()
+        if record is None:
+            raise NotFoundError(f"Book ID {book_id} or Member ID {member_id} not found.")
+        max_loans, loan_id, loan_date, due_date = record
+        if max_loans is None:
+            # loan_policy_for() found no row, not even the '*' / '*' default (migration 0014)
+            raise BusinessRuleError(f"No loan policy applies to Member ID {member_id} and Book ID {book_id}: "
+                                    f"LoanPolicy needs a '*' / '*' row.")
+        if loan_id is None:
+            raise BusinessRuleError(f"Max {max_loans} loans reached for Member ID {member_id}.")
+        return loan_id, loan_date, due_date
+
+    def _return_loan(self, cursor, loan_id, member_id=None):
+        """Closes an open loan, settles its fine and passes the copy on. Returns (fine, allocated hold or None).
+
+        With member_id, only that member's loan is returned (self-service returns).
+        """
+        # Fine terms of the member's category and the book's type; LEAST ignores a NULL (uncapped) max_fine
+        return_query = """
+            UPDATE Loan l
+            SET return_date = CURRENT_DATE,
+                fine_amount = LEAST(GREATEST(CURRENT_DATE - l.due_date - p.grace_days, 0) * p.daily_fine, p.max_fine)
+            FROM Member m, Book b, LATERAL loan_policy_for(m.category, b.book_type) p
+            WHERE l.loan_id = %s AND l.return_date IS NULL
+              AND m.member_id = l.member_id AND b.book_id = l.book_id
+              AND l.member_id = COALESCE(%s, l.member_id)
+            RETURNING l.book_id, l.member_id, l.fine_amount, l.copy_id;
+        """
+        cursor.execute(return_query, (loan_id, member_id))
+        record = cursor.fetchone()
+        if record is None:
+            raise BusinessRuleError(f"Loan ID {loan_id} not found or already returned.")
+        book_id, member_id, fine, copy_id = record
+
+        cursor.execute(
+            "UPDATE Member SET current_loans = current_loans - 1 WHERE member_id = %s;",
+            (member_id,)
+        )
+
+        # Charge what the nightly accrual has not already posted to the balance
+        FineDAO.settle_return(cursor, loan_id, member_id, fine)
+
+        # Allocate to the next queued member atomically, otherwise restock
+        allocated = self.hold_dao.release_reserved_copy(cursor, book_id, copy_id)
+        return float(fine), allocated
+
+    # --- Checkout & Return ---
+
+    def process_checkout(self, book_id, member_id):
+        """Checks out a book to a member in a single transaction. Returns the new loan_id."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                self._lock_member(cursor, member_id)
+                self._lock_book(cursor, book_id)
+
+                # A READY hold already has a copy reserved for this member
+                if self.hold_dao.fulfill_ready_hold(cursor, book_id, member_id):
+                    copy_status = 'HOLD_SHELF'
+                else:
+                    self._take_available_copy(cursor, book_id)
+                    copy_status = 'AVAILABLE'
+                # Lend a physical copy too, so BookCopy statuses keep matching Book.available_copies
+                copy_id = CopyDAO.take_copy(cursor, book_id, copy_status)
+
+                loan_id = self._insert_loan(cursor, book_id, member_id, copy_id)[0]
+                conn.commit()
+                return loan_id
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def process_return(self, loan_id, member_id=None):
+        """Returns a loan, computes its fine and hands the copy to the next holder. Returns the fine.
+
+        member_id restricts the return to that member's own loan.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                fine, _ = self._return_loan(cursor, loan_id, member_id)
+                conn.commit()
+                return fine
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def process_copy_checkout(self, barcode, member_id):
+        """Checks out the scanned copy to a member. Returns the new loan as an ActiveLoanRecord."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                copy = CopyDAO.lock_copy(cursor, barcode)
+                if copy is None:
+                    raise NotFoundError(f"No copy with barcode {barcode}.")
+                copy_id, book_id, status, title = copy
+                username = self._lock_member(cursor, member_id)
+                self._lock_book(cursor, book_id)
+
+                if status == 'AVAILABLE':
+                    if self.hold_dao.fulfill_ready_hold(cursor, book_id, member_id):
+                        # They took a shelf copy instead of the one set aside for them
+                        CopyDAO.shelve_reserved_copy(cursor, book_id)
+                    else:
+                        self._take_available_copy(cursor, book_id)
+                elif status == 'HOLD_SHELF':
+                    if not self.hold_dao.fulfill_ready_hold(cursor, book_id, member_id):
+                        raise BusinessRuleError(f"Copy {barcode} is reserved for another member's hold.")
+                else:
+                    raise BusinessRuleError(f"Copy {barcode} cannot be checked out (status {status}).")
+
+                loan_id, loan_date, due_date = self._insert_loan(cursor, book_id, member_id, copy_id)
+                CopyDAO.set_status(cursor, copy_id, 'ON_LOAN')
+                conn.commit()
+                return ActiveLoanRecord(loan_id, title, username, str(loan_date), str(due_date))
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def process_copy_return(self, barcode):
+        """Returns the scanned copy's open loan.
+
+        Returns {'loan_id', 'title', 'fine', 'hold_member_id'}; hold_member_id is set when the copy
+        should go to the hold shelf for that member instead of back into circulation.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT l.loan_id, b.title
+                    FROM BookCopy c
+                    JOIN Loan l ON l.copy_id = c.copy_id AND l.return_date IS NULL
+                    JOIN Book b ON b.book_id = c.book_id
+                    WHERE c.barcode = %s
+                    FOR UPDATE OF c;
+                """
+                # Copy first, then member and book: the same lock order as process_copy_checkout
+                cursor.execute(query, (barcode,))
+                record = cursor.fetchone()
+                if record is None:
+                    raise BusinessRuleError(f"Copy {barcode} is not on loan.")
+                loan_id, title = record
+
+                fine, allocated = self._return_loan(cursor, loan_id)
+                conn.commit()
+                return {
+                    'loan_id': loan_id, 'title': title, 'fine': fine,
+                    'hold_member_id': allocated[1] if allocated else None
+                }
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def renew_loan(self, loan_id):
+        """Extends an open loan by its policy's loan period. Returns the new due date.
+
+        Allowed while the loan is not overdue, has renewals left under its policy and nobody
+        is queued for the book.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # Policy resolved and applied in the one UPDATE, as at checkout
+                cursor.execute("""
+                    UPDATE Loan l
+                    SET due_date = l.due_date + p.loan_period_days, renewals = l.renewals + 1
+                    FROM Member m, Book b, LATERAL loan_policy_for(m.category, b.book_type) p
+                    WHERE l.loan_id = %s AND l.return_date IS NULL
+                      AND m.member_id = l.member_id AND b.book_id = l.book_id
+                      AND l.due_date >= CURRENT_DATE
+                      AND l.renewals < p.max_renewals
+                      AND NOT EXISTS (
+                          SELECT 1 FROM Hold h WHERE h.book_id = l.book_id AND h.status = 'WAITING')
+                    RETURNING l.due_date;
+                """, (loan_id,))
+                record = cursor.fetchone()
+                if record is None:
+                    raise BusinessRuleError(f"Loan ID {loan_id} cannot be renewed (not open, overdue, "
+                                            f"out of renewals, or another member is waiting for the book).")
+                conn.commit()
+                return str(record[0])
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def create_loan(self, book_id, member_id):
+        """Wrapper around process_checkout. Returns (success, loan_id or error message)."""
+        try:
+            return True, self.process_checkout(book_id, member_id)
+        except Exception as e:
+            return False, str(e)
+
+    def return_loan(self, loan_id):
+        """Wrapper around process_return. Returns (success, fine or error message)."""
+        try:
+            return True, self.process_return(loan_id)
+        except Exception as e:
+            return False, str(e)
+
+    def get_active_loans(self):
+        """Fetches all unreturned loans with book title and member username."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT l.loan_id, b.title, u.username, l.loan_date, l.due_date
+                    FROM Loan l
+                    JOIN Book b ON l.book_id = b.book_id
+                    JOIN "User" u ON l.member_id = u.user_id
+                    WHERE l.return_date IS NULL
+                    ORDER BY l.due_date;
+                """
+                cursor.execute(query)
+                records = cursor.fetchall()
+
+                return [ActiveLoanRecord(record[0], record[1], record[2], str(record[3]), str(record[4]))
+                        for record in records]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_overdue_loans(self):
+        """Fetches unreturned loans whose due date has passed."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                query = """
+                    SELECT l.loan_id, b.title, u.first_name, u.last_name, l.member_id, l.due_date,
+                        CURRENT_DATE - l.due_date AS days_overdue
+                    FROM Loan l
+                    JOIN Book b ON l.book_id = b.book_id
+                    JOIN "User" u ON l.member_id = u.user_id
+                    WHERE l.return_date IS NULL AND l.due_date < CURRENT_DATE
+                    ORDER BY l.due_date;
+                """
+                cursor.execute(query)
+                records = cursor.fetchall()
+
+                return [OverdueLoanRecord(record[0], record[1], record[2], record[3], record[4],
+                                          str(record[5]), record[6])
+                        for record in records]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_member_loan_history(self, member_id, before=None, limit=HISTORY_PAGE_SIZE):
+        """Fetches one page of a member's loans, newest first.
+
+        before is the (loan_date, loan_id) of the last loan on the previous page (None for the
+        first page); pass history[-1]['loan_date'], history[-1]['loan_id'] to get the next one.
+        Loans moved to LoanArchive by loan_partition_manager.py are included.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT to_regclass('loanarchive') IS NOT NULL;")
+                sources = ["Loan", "LoanArchive"] if cursor.fetchone()[0] else ["Loan"]
+                # Keyset, not OFFSET: every page is one range of loan_member_history_idx (migration 0011),
+                # and of loanarchive_member_history_idx in the archive; the two short runs are merged
+                after_cursor = "AND (loan_date, loan_id) < (%(before_date)s, %(before_id)s)" if before else ""
+                pages = " UNION ALL ".join(f"""(
+                        SELECT loan_id, book_id, loan_date, due_date, return_date, fine_amount
+                        FROM {source}
+                        WHERE member_id = %(member_id)s {after_cursor}
+                        ORDER BY loan_date DESC, loan_id DESC
+                        LIMIT %(limit)s)""" for source in sources)
+                query = f"""
+                    SELECT l.loan_id, l.book_id, COALESCE(b.title, w.title),
+                        l.loan_date, l.due_date, l.return_date, l.fine_amount
+                    FROM ({pages}) l
+                    LEFT JOIN Book b ON b.book_id = l.book_id
+                    -- Loans of weeded books keep their title (migration 0013)
+                    LEFT JOIN WeededBook w ON w.book_id = l.book_id
+                    ORDER BY l.loan_date DESC, l.loan_id DESC
+                    LIMIT %(limit)s;
+                """
+                params = {'member_id': member_id, 'limit': limit}
+                if before:
+                    params['before_date'], params['before_id'] = before
+                cursor.execute(query, params)
 
-    # NOTE: All methods (create_loan, get_active_loans, etc.) must be implemented below
-    # and use the try/finally/putconn structure.
\ No newline at end of file
+                return [LoanHistoryRecord(record[0], record[1], record[2], str(record[3]), str(record[4]),
+                                          str(record[5]) if record[5] else None, float(record[6]))
+                        for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
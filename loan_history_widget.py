@@ -0,0 +1,98 @@
+# loan_history_widget.py
+# One member's loan history, newest first, a page at a time. Used as the "My History" tab of
+# MemberMainWidget and as the per-member panel of MemberManagementWidget.
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QMessageBox
+)
+
+from loan_dao import LoanDAO, HISTORY_PAGE_SIZE
+
+
+class LoanHistoryWidget(QWidget):
+    """Shows the loans of one member. Nothing is fetched until the widget is actually visible,
+    so a hidden tab or an unselected member costs no query."""
+
+    def __init__(self, parent, empty_text="No member selected."):
+        super().__init__(parent)
+        self.loan_dao = LoanDAO()
+        self.member_id = None
+        self.empty_text = empty_text
+        self.before = None  # keyset cursor: (loan_date, loan_id) of the last row shown
+        self.loaded = False
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.summary_label = QLabel(self.empty_text)
+        layout.addWidget(self.summary_label)
+
+        self.history_table = QTableWidget()
+        self.history_table.setColumnCount(6)
+        self.history_table.setHorizontalHeaderLabels([
+            "Loan ID", "Title", "Loaned", "Due", "Returned", "Fine"
+        ])
+        self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.history_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.history_table.verticalHeader().setVisible(False)
+        self.history_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.history_table)
+
+        button_layout = QHBoxLayout()
+        self.older_button = QPushButton("⬇️ Older Loans")
+        self.older_button.clicked.connect(self.load_next_page)
+        self.older_button.setEnabled(False)
+        button_layout.addStretch(1)
+        button_layout.addWidget(self.older_button)
+        layout.addLayout(button_layout)
+
+    def set_member(self, member_id):
+        """Switches to another member (or None); the first page loads now if visible, else when shown."""
+        self.member_id = member_id
+        self.before = None
+        self.loaded = False
+        self.history_table.setRowCount(0)
+        self.older_button.setEnabled(False)
+        self.summary_label.setText(self.empty_text if member_id is None else "Loading loan history...")
+        if member_id is not None and self.isVisible():
+            self.load_next_page()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.member_id is not None and not self.loaded:
+            self.load_next_page()
+
+    def load_next_page(self):
+        """Appends the next (older) page of loans."""
+        try:
+            loans = self.loan_dao.get_member_loan_history(self.member_id, self.before, HISTORY_PAGE_SIZE)
+        except Exception as e:
+            self.summary_label.setText("Loan history unavailable.")
+            QMessageBox.critical(self, "Database Error", f"Failed to load loan history: {e}")
+            return
+        self.loaded = True
+
+        start_row = self.history_table.rowCount()
+        self.history_table.setRowCount(start_row + len(loans))
+        for row_index, loan in enumerate(loans, start_row):
+            self.history_table.setItem(row_index, 0, QTableWidgetItem(str(loan['loan_id'])))
+            self.history_table.setItem(row_index, 1, QTableWidgetItem(loan['title']))
+            self.history_table.setItem(row_index, 2, QTableWidgetItem(loan['loan_date']))
+            self.history_table.setItem(row_index, 3, QTableWidgetItem(loan['due_date']))
+            self.history_table.setItem(row_index, 4, QTableWidgetItem(loan['return_date'] or "On loan"))
+            fine = f"${loan['fine_amount']:.2f}" if loan['fine_amount'] else ""
+            self.history_table.setItem(row_index, 5, QTableWidgetItem(fine))
+
+        if loans:
+            self.before = (loans[-1]['loan_date'], loans[-1]['loan_id'])
+        shown = self.history_table.rowCount()
+        more = len(loans) >= HISTORY_PAGE_SIZE
+        self.older_button.setEnabled(more)
+        if shown == 0:
+            self.summary_label.setText("No loans yet.")
+        else:
+            self.summary_label.setText(f"{shown} most recent loan(s)" + (" shown." if more else " — full history."))
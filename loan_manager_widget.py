@@ -1,16 +1,22 @@
 # loan_manager_widget.py
 
+from datetime import datetime
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QWidget
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QWidget,
+    QComboBox, QPlainTextEdit
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QCoreApplication
 from PySide6.QtGui import QFont
 
 # Import DAOs
 from loan_dao import LoanDAO
 from book_dao import BookDAO
 from member_dao import MemberDAO
+from scan_processor import ScanProcessor, CHECKOUT, RETURN
+
+SCAN_LOG_LINES = 500  # Oldest log lines are dropped beyond this
 
 
 class LoanManagerWidget(QWidget):
@@ -24,6 +30,16 @@ class LoanManagerWidget(QWidget):
         self.member_dao = MemberDAO()
         self.loan_dao = LoanDAO(self.book_dao, self.member_dao)
 
+        # Scanning mode: barcodes are queued and processed in order off the GUI thread
+        self.scan_processor = ScanProcessor(self.loan_dao, self)
+        self.scan_processor.scan_queued.connect(self.handle_scan_queued)
+        self.scan_processor.checkout_done.connect(self.handle_scan_checkout)
+        self.scan_processor.return_done.connect(self.handle_scan_return)
+        self.scan_processor.scan_failed.connect(self.handle_scan_failed)
+        # Scans already queued are applied before the application exits
+        QCoreApplication.instance().aboutToQuit.connect(self.scan_processor.stop)
+        self.loan_rows = {}  # loan_id -> loan ID cell, to find a loan's row without rescanning the table
+
         self.setup_ui()
         # Initial load is called when the widget is created, but main.py will call it again on navigation
 
@@ -40,6 +56,11 @@ class LoanManagerWidget(QWidget):
         self.back_button.clicked.connect(self.parent.show_librarian_dashboard)
         header_layout.addWidget(self.back_button)
 
+        self.scan_mode_button = QPushButton("📷 Scanning Mode")
+        self.scan_mode_button.setCheckable(True)
+        self.scan_mode_button.toggled.connect(self.toggle_scan_mode)
+        header_layout.addWidget(self.scan_mode_button)
+
         main_layout.addLayout(header_layout)
 
         # --- Top Section: Checkout Form ---
@@ -61,6 +82,34 @@ class LoanManagerWidget(QWidget):
 
         main_layout.addWidget(checkout_group)
 
+        # --- Scanning Panel (hidden until Scanning Mode is on) ---
+        self.scan_group = QWidget()
+        scan_layout = QVBoxLayout(self.scan_group)
+        scan_input_layout = QHBoxLayout()
+
+        self.scan_mode_combo = QComboBox()
+        self.scan_mode_combo.addItem("Checkout to Member", CHECKOUT)
+        self.scan_mode_combo.addItem("Return", RETURN)
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan copy barcode (checkouts go to the Member ID above)")
+        self.scan_input.returnPressed.connect(self.handle_scan)
+        self.scan_status_label = QLabel("Queued: 0")
+
+        scan_input_layout.addWidget(QLabel("Scan:"))
+        scan_input_layout.addWidget(self.scan_mode_combo)
+        scan_input_layout.addWidget(self.scan_input, 1)
+        scan_input_layout.addWidget(self.scan_status_label)
+        scan_layout.addLayout(scan_input_layout)
+
+        self.scan_log = QPlainTextEdit()
+        self.scan_log.setReadOnly(True)
+        self.scan_log.setMaximumBlockCount(SCAN_LOG_LINES)
+        self.scan_log.setMaximumHeight(150)
+        scan_layout.addWidget(self.scan_log)
+
+        self.scan_group.setVisible(False)
+        main_layout.addWidget(self.scan_group)
+
         # --- Middle Section: Active Loans Table ---
         main_layout.addWidget(QLabel("Active Loans (Books out):"))
 
@@ -80,8 +129,11 @@ class LoanManagerWidget(QWidget):
         return_layout = QHBoxLayout()
         self.return_button = QPushButton("⬅️ Process Selected Return")
         self.return_button.clicked.connect(self.handle_return)
+        self.renew_button = QPushButton("🔁 Renew Selected Loan")
+        self.renew_button.clicked.connect(self.handle_renew)
 
         return_layout.addStretch(1)
+        return_layout.addWidget(self.renew_button)
         return_layout.addWidget(self.return_button)
 
         main_layout.addLayout(return_layout)
@@ -93,28 +145,45 @@ class LoanManagerWidget(QWidget):
         try:
             loans = self.loan_dao.get_active_loans()
             self.loan_table.setRowCount(len(loans))
+            self.loan_rows = {}
 
             for row_index, loan in enumerate(loans):
-                # Highlight overdue loans (Due date column is index 4)
-
-                # We assume current date check is done in the DAO, here we just check for visualization
-                due_date_str = loan.get('due_date', '')
-                due_date_item = QTableWidgetItem(due_date_str)
-
-                # Simple check: If due date is in the past, color it red
-                if due_date_str < datetime.now().strftime("%Y-%m-%d"):
-                    due_date_item.setForeground(Qt.red)
-
-                self.loan_table.setItem(row_index, 0, QTableWidgetItem(str(loan.get('loan_id', ''))))
-                self.loan_table.setItem(row_index, 1, QTableWidgetItem(loan.get('book_title', '')))
-                self.loan_table.setItem(row_index, 2, QTableWidgetItem(loan.get('member_username', '')))
-                self.loan_table.setItem(row_index, 3, QTableWidgetItem(loan.get('loan_date', '')))
-                self.loan_table.setItem(row_index, 4, due_date_item)
+                self.set_loan_row(row_index, loan)
 
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load active loans: {e}")
             self.loan_table.setRowCount(0)
 
+    def set_loan_row(self, row_index, loan):
+        """Fills one row of the active loans table."""
+        # We assume current date check is done in the DAO, here we just check for visualization
+        due_date_str = loan.get('due_date', '')
+        due_date_item = QTableWidgetItem(due_date_str)
+
+        # Simple check: If due date is in the past, color it red
+        if due_date_str < datetime.now().strftime("%Y-%m-%d"):
+            due_date_item.setForeground(Qt.red)
+
+        id_item = QTableWidgetItem(str(loan.get('loan_id', '')))
+        self.loan_rows[loan.get('loan_id')] = id_item
+        self.loan_table.setItem(row_index, 0, id_item)
+        self.loan_table.setItem(row_index, 1, QTableWidgetItem(loan.get('book_title', '')))
+        self.loan_table.setItem(row_index, 2, QTableWidgetItem(loan.get('member_username', '')))
+        self.loan_table.setItem(row_index, 3, QTableWidgetItem(loan.get('loan_date', '')))
+        self.loan_table.setItem(row_index, 4, due_date_item)
+
+    def due_date_row(self, due_date):
+        """Row at which a loan due on due_date keeps the table in due-date order (after equal dates)."""
+        # ISO dates compare correctly as strings; binary search over the due date column
+        low, high = 0, self.loan_table.rowCount()
+        while low < high:
+            middle = (low + high) // 2
+            if self.loan_table.item(middle, 4).text() <= due_date:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
     def handle_checkout(self):
         """Processes a new book checkout."""
         try:
@@ -167,4 +236,81 @@ class LoanManagerWidget(QWidget):
 
                 self.load_active_loans()
             except Exception as e:
-                QMessageBox.critical(self, "Return Failed", str(e))
\ No newline at end of file
+                QMessageBox.critical(self, "Return Failed", str(e))
+
+    def handle_renew(self):
+        """Extends the selected loan by its loan policy's period, if the policy allows."""
+        selected_rows = self.loan_table.selectedItems()
+        if not selected_rows:
+            QMessageBox.warning(self, "Selection Error", "Please select an active loan from the table first.")
+            return
+
+        loan_id = int(self.loan_table.item(selected_rows[0].row(), 0).text())
+        try:
+            due_date = self.loan_dao.renew_loan(loan_id)
+            QMessageBox.information(self, "Renewal Success", f"Loan ID {loan_id} renewed. New due date: {due_date}")
+            self.load_active_loans()
+        except Exception as e:
+            QMessageBox.critical(self, "Renewal Failed", str(e))
+
+    # --- Scanning Mode ---
+
+    def toggle_scan_mode(self, enabled):
+        """Shows the scan panel and keeps the cursor in the scan box so the scanner's keystrokes land there.
+
+        Scans still queued when the panel is hidden keep being applied.
+        """
+        self.scan_group.setVisible(enabled)
+        if enabled:
+            self.scan_input.setFocus()
+
+    def handle_scan(self):
+        """Queues the scanned barcode and clears the box at once, ready for the next scan."""
+        barcode = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not barcode:
+            return
+
+        mode = self.scan_mode_combo.currentData()
+        member_id = None
+        if mode == CHECKOUT:
+            member_id_str = self.member_id_input.text().strip()
+            if not member_id_str.isdigit():
+                self.log_scan(f"⚠️ {barcode}: enter the borrower's Member ID before scanning checkouts.")
+                return
+            member_id = int(member_id_str)
+
+        self.scan_processor.submit(barcode, mode, member_id)
+
+    def handle_scan_queued(self, seq, barcode):
+        self.scan_status_label.setText(f"Queued: {self.scan_processor.pending()}")
+
+    def handle_scan_checkout(self, seq, barcode, loan, elapsed_ms):
+        # Loan periods vary by member category and book type (LoanPolicy), so the new loan can
+        # fall anywhere in the due-date ordering
+        row_index = self.due_date_row(loan['due_date'])
+        self.loan_table.insertRow(row_index)
+        self.set_loan_row(row_index, loan)
+        self.log_scan(f"✅ #{seq} {barcode}: '{loan['book_title']}' to {loan['member_username']}, "
+                      f"due {loan['due_date']} ({elapsed_ms:.0f} ms)")
+        self.scan_status_label.setText(f"Queued: {self.scan_processor.pending()}")
+
+    def handle_scan_return(self, seq, barcode, result, elapsed_ms):
+        id_item = self.loan_rows.pop(result['loan_id'], None)
+        if id_item is not None:
+            self.loan_table.removeRow(id_item.row())
+
+        message = f"↩️ #{seq} {barcode}: '{result['title']}' returned"
+        if result['fine'] > 0:
+            message += f", fine ${result['fine']:.2f}"
+        if result['hold_member_id'] is not None:
+            message += f" — PUT ON HOLD SHELF for Member ID {result['hold_member_id']}"
+        self.log_scan(f"{message} ({elapsed_ms:.0f} ms)")
+        self.scan_status_label.setText(f"Queued: {self.scan_processor.pending()}")
+
+    def handle_scan_failed(self, seq, barcode, message):
+        self.log_scan(f"❌ #{seq} {barcode}: {message}")
+        self.scan_status_label.setText(f"Queued: {self.scan_processor.pending()}")
+
+    def log_scan(self, line):
+        self.scan_log.appendPlainText(f"{datetime.now().strftime('%H:%M:%S')} {line}")
@@ -0,0 +1,320 @@
+# loan_partition_manager.py
+# Range partitioning of Loan by loan_date, with archival of old closed loans.
+# Usage:
+#   python loan_partition_manager.py migrate                     (one-off, online conversion)
+#   python loan_partition_manager.py create-partitions [--months-ahead 3]
+#   python loan_partition_manager.py archive [--older-than-months 12] [--batch-size 5000]
+#
+# Limitations:
+# - LoanArchive is only compressed when the columnar access method (citus) is installed. Without
+#   it, the archive is an ordinary heap table packed at fillfactor 100: smaller than Loan's pages,
+#   but not compressed. migrate() says which one it created.
+# - Queries on open loans (return_date IS NULL: active loans, counters, overdue scans) carry no
+#   loan_date bound, so they are not pruned and probe every partition. Each probe is one lookup in
+#   that partition's small partial index (the open_* entries below), and `archive` drops emptied
+#   partitions, so the partition count stays around --older-than-months plus --months-ahead.
+# - PostgreSQL cannot enforce a key on loan_id alone across partitions keyed by loan_date. Every
+#   partition gets the unique (loan_id, loan_date) index and the member foreign key; loan_id values
+#   stay unique through the shared sequence. There are no book or copy foreign keys (migration 0013).
+
+import argparse
+from datetime import date
+
+from db_connector import get_db_connector
+
+LEGACY_PARTITION = "loan_legacy"
+ARCHIVE_TABLE = "LoanArchive"
+
+# Indexes every Loan partition carries: (suffix, UNIQUE or '', definition)
+PARTITION_INDEXES = [
+    ("pk", "UNIQUE", "(loan_id, loan_date)"),
+    ("open_book", "", "(book_id) WHERE return_date IS NULL"),
+    ("open_due", "", "(due_date) WHERE return_date IS NULL"),
+    # Return-by-scan: the open loan of a copy (migration 0007)
+    ("open_copy", "", "(copy_id) WHERE return_date IS NULL"),
+    # Member loan history pages (migration 0011); also serves plain member_id lookups
+    ("member_history", "", "(member_id, loan_date DESC, loan_id DESC) "
+                           "INCLUDE (book_id, due_date, return_date, fine_amount)"),
+]
+
+
+def month_start(day, offset=0):
+    """First day of the month offset months after day's month."""
+    month_index = day.year * 12 + (day.month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(start):
+    return f"loan_p{start.year}_{start.month:02d}"
+
+
+class LoanPartitionManager:
+    """Converts Loan to a monthly range-partitioned table and keeps its partitions and archive in shape."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    # --- Online migration ---
+
+    def migrate(self, months_ahead=3):
+        """Converts the plain Loan table in place, without rewriting or long-locking existing rows.
+
+        The existing table becomes a single partition holding everything before the cutover
+        month. Its CHECK constraint and indexes are built first with non-blocking commands,
+        so the final swap only needs a brief exclusive lock. Loan's triggers (counter tracking,
+        popularity) move to the new parent, so they keep firing for every partition.
+        """
+        cutover = month_start(date.today(), 1)
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'loan'::regclass;")
+                if cursor.fetchone()[0] == 'p':
+                    conn.rollback()
+                    print("Loan is already partitioned; nothing to migrate.")
+                    return False
+
+            # Phase 1 (non-blocking): constraint and indexes the legacy partition will need
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    ALTER TABLE Loan DROP CONSTRAINT IF EXISTS loan_legacy_range;
+                    ALTER TABLE Loan ADD CONSTRAINT loan_legacy_range
+                        CHECK (loan_date IS NOT NULL AND loan_date < DATE '{cutover}') NOT VALID;
+                """)
+                # VALIDATE only takes SHARE UPDATE EXCLUSIVE: reads and writes continue
+                cursor.execute("ALTER TABLE Loan VALIDATE CONSTRAINT loan_legacy_range;")
+                for suffix, unique, definition in PARTITION_INDEXES:
+                    cursor.execute(
+                        f"CREATE {unique} INDEX CONCURRENTLY IF NOT EXISTS "
+                        f"{LEGACY_PARTITION}_{suffix}_idx ON Loan {definition};"
+                    )
+                # Superseded by the loan_legacy_* copies above; their names go to the parent's indexes
+                for suffix, _, _ in PARTITION_INDEXES:
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS loan_{suffix}_idx;")
+            conn.autocommit = False
+
+            # Phase 2 (brief exclusive lock): swap in the partitioned parent
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = '5s';")
+                # LIKE copies no triggers. Their definitions name "loan", which is the new parent
+                # by the time they are replayed.
+                cursor.execute("""
+                    SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+                    WHERE tgrelid = 'loan'::regclass AND NOT tgisinternal;
+                """)
+                triggers = cursor.fetchall()
+                cursor.execute(f"ALTER TABLE Loan RENAME TO {LEGACY_PARTITION};")
+                cursor.execute(f"""
+                    CREATE TABLE Loan (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                    PARTITION BY RANGE (loan_date);
+                """)
+                cursor.execute("ALTER TABLE Loan DROP CONSTRAINT IF EXISTS loan_legacy_range;")
+                # The loan_id sequence must outlive the legacy partition
+                cursor.execute("""
+                    SELECT pg_get_serial_sequence(%s, 'loan_id');
+                """, (LEGACY_PARTITION,))
+                sequence = cursor.fetchone()[0]
+                if sequence:
+                    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY Loan.loan_id;")
+
+                # Validated CHECK constraint lets ATTACH skip its full-table scan
+                cursor.execute(f"""
+                    ALTER TABLE Loan ATTACH PARTITION {LEGACY_PARTITION}
+                    FOR VALUES FROM (MINVALUE) TO ('{cutover}');
+                """)
+                for suffix, unique, definition in PARTITION_INDEXES:
+                    cursor.execute(f"CREATE {unique} INDEX loan_{suffix}_idx ON ONLY Loan {definition};")
+                    cursor.execute(f"ALTER INDEX loan_{suffix}_idx ATTACH PARTITION {LEGACY_PARTITION}_{suffix}_idx;")
+                # Row triggers on the parent are cloned to every partition, current and future;
+                # statement triggers on it see inserts routed to any partition
+                for name, definition in triggers:
+                    cursor.execute(f'DROP TRIGGER "{name}" ON {LEGACY_PARTITION};')
+                    cursor.execute(definition)
+
+                self._create_archive_objects(cursor)
+                self._create_partitions(cursor, cutover, months_ahead)
+            conn.commit()
+            print(f"Loan converted. History before {cutover} lives in partition {LEGACY_PARTITION}.")
+            return True
+        except Exception as e:
+            if not conn.autocommit:
+                conn.rollback()
+            conn.autocommit = False
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def _create_archive_objects(self, cursor):
+        """Creates the archive table (columnar/compressed when the extension exists) and the history view."""
+        cursor.execute("SELECT 1 FROM pg_am WHERE amname = 'columnar';")
+        if cursor.fetchone():
+            access_method = "USING columnar"
+        else:
+            access_method = "WITH (fillfactor = 100)"
+            print(f"No columnar access method: {ARCHIVE_TABLE} is a plain heap table (not compressed).")
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (LIKE Loan INCLUDING DEFAULTS) {access_method};
+        """)
+        # Member loan history pages (LoanDAO.get_member_loan_history), same order as the Loan index
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS loanarchive_member_history_idx
+                ON {ARCHIVE_TABLE} (member_id, loan_date DESC, loan_id DESC);
+        """)
+        cursor.execute(f"""
+            CREATE OR REPLACE VIEW LoanHistory AS
+                SELECT * FROM Loan
+                UNION ALL
+                SELECT * FROM {ARCHIVE_TABLE};
+        """)
+
+    # --- Partition maintenance ---
+
+    def create_future_partitions(self, months_ahead=3):
+        """Makes sure monthly partitions exist from the current month to months_ahead months out."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                created = self._create_partitions(cursor, month_start(date.today()), months_ahead)
+            conn.commit()
+            return created
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def _create_partitions(self, cursor, first_month, months_ahead):
+        created = []
+        existing = self._partition_bounds(cursor)
+        last_month = month_start(date.today(), months_ahead)
+        start = first_month
+        while start <= last_month:
+            name = partition_name(start)
+            if name not in existing and not self._covered(existing, start):
+                cursor.execute(f"""
+                    CREATE TABLE {name} PARTITION OF Loan
+                    FOR VALUES FROM ('{start}') TO ('{month_start(start, 1)}');
+                """)
+                # Foreign keys per partition: cheap to validate while the partition is empty.
+                # No book FK: loans outlive weeded books (migration 0013).
+                cursor.execute(f"""
+                    ALTER TABLE {name}
+                        ADD CONSTRAINT {name}_member_fk FOREIGN KEY (member_id) REFERENCES Member(member_id);
+                """)
+                created.append(name)
+            start = month_start(start, 1)
+        return created
+
+    @staticmethod
+    def _partition_bounds(cursor):
+        """Returns {partition_name: upper bound date or None} for every attached Loan partition."""
+        cursor.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'loan'::regclass;
+        """)
+        bounds = {}
+        for name, expression in cursor.fetchall():
+            # e.g. FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')
+            upper = expression.rsplit("TO ('", 1)
+            bounds[name] = date.fromisoformat(upper[1][:10]) if len(upper) == 2 else None
+        return bounds
+
+    @staticmethod
+    def _covered(bounds, start):
+        # The legacy partition covers every month before its upper bound
+        legacy_upper = bounds.get(LEGACY_PARTITION)
+        return legacy_upper is not None and start < legacy_upper
+
+    # --- Archival ---
+
+    def archive_closed_loans(self, older_than_months=12, batch_size=5000):
+        """Moves returned loans older than the cutoff into the archive, then drops emptied partitions."""
+        cutoff = month_start(date.today(), -older_than_months)
+        total_moved = 0
+        while True:
+            conn = self.db_connector.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    # loan_date < cutoff prunes the scan to the old partitions only
+                    cursor.execute(f"""
+                        WITH moved AS (
+                            DELETE FROM Loan
+                            WHERE (loan_id, loan_date) IN (
+                                SELECT loan_id, loan_date FROM Loan
+                                WHERE loan_date < %s AND return_date IS NOT NULL
+                                LIMIT %s
+                                FOR UPDATE SKIP LOCKED
+                            )
+                            RETURNING *
+                        )
+                        INSERT INTO {ARCHIVE_TABLE} SELECT * FROM moved;
+                    """, (cutoff, batch_size))
+                    moved = cursor.rowcount
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                self.db_connector.putconn(conn)
+
+            total_moved += moved
+            if moved < batch_size:
+                break
+
+        dropped = self._drop_empty_partitions(cutoff)
+        return {'moved': total_moved, 'cutoff': str(cutoff), 'dropped_partitions': dropped}
+
+    def _drop_empty_partitions(self, cutoff):
+        """Detaches and drops monthly partitions that lie wholly before cutoff and hold no loans."""
+        dropped = []
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                for name, upper in self._partition_bounds(cursor).items():
+                    if name == LEGACY_PARTITION or upper is None or upper > cutoff:
+                        continue
+                    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {name});")
+                    if not cursor.fetchone()[0]:
+                        cursor.execute(f"ALTER TABLE Loan DETACH PARTITION {name};")
+                        cursor.execute(f"DROP TABLE {name};")
+                        dropped.append(name)
+            conn.commit()
+            return dropped
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Manage Loan partitions and archival.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = commands.add_parser('migrate', help="Convert Loan to a partitioned table (online).")
+    migrate_parser.add_argument('--months-ahead', type=int, default=3)
+
+    create_parser = commands.add_parser('create-partitions', help="Create upcoming monthly partitions.")
+    create_parser.add_argument('--months-ahead', type=int, default=3)
+
+    archive_parser = commands.add_parser('archive', help="Archive closed loans older than N months.")
+    archive_parser.add_argument('--older-than-months', type=int, default=12)
+    archive_parser.add_argument('--batch-size', type=int, default=5000)
+
+    args = parser.parse_args()
+    manager = LoanPartitionManager()
+    try:
+        if args.command == 'migrate':
+            manager.migrate(args.months_ahead)
+        elif args.command == 'create-partitions':
+            created = manager.create_future_partitions(args.months_ahead)
+            print(f"Created partitions: {', '.join(created) if created else 'none needed'}")
+        elif args.command == 'archive':
+            result = manager.archive_closed_loans(args.older_than_months, args.batch_size)
+            print(f"Archived {result['moved']} closed loan(s) from before {result['cutoff']}.")
+            print(f"Dropped partitions: {', '.join(result['dropped_partitions']) or 'none'}")
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,187 @@
+# loan_policy_dao.py
+
+import threading
+import time
+
+from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
+from records import LoanPolicyRecord
+
+# Wildcard category / book type in LoanPolicy (migration 0014)
+ANY = '*'
+
+# Categories the librarian can assign; any other value falls back to the '*' policies
+MEMBER_CATEGORIES = ('ADULT', 'STUDENT', 'STAFF', 'CHILD')
+
+# How long a process trusts its cached policies before checking LoanPolicy for edits
+POLICY_CHECK_SECONDS = 60
+
+
+class LoanPolicyDAO:
+    """Data Access Object for the loan rules per member category and book type."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    def get_policies(self):
+        """Fetches every policy row. Returns (stamp, [LoanPolicyRecord])."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT member_category, book_type, max_loans, loan_period_days,
+                        daily_fine, grace_days, max_fine, max_renewals
+                    FROM LoanPolicy;
+                """)
+                policies = [self._policy_from_record(record) for record in cursor.fetchall()]
+                stamp = self._stamp(cursor)
+                conn.rollback()
+                return stamp, policies
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_policy_stamp(self):
+        """Cheap change marker for LoanPolicy: (last edit, row count). Deleted rows change the count."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                stamp = self._stamp(cursor)
+                conn.rollback()
+                return stamp
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_policy_for_loan(self, book_id, member_id):
+        """The policy a checkout of this book by this member would run under, or None if either is unknown."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT p.member_category, p.book_type, p.max_loans, p.loan_period_days,
+                        p.daily_fine, p.grace_days, p.max_fine, p.max_renewals
+                    FROM Member m, Book b, LATERAL loan_policy_for(m.category, b.book_type) p
+                    WHERE m.member_id = %s AND b.book_id = %s;
+                """, (member_id, book_id))
+                record = cursor.fetchone()
+                conn.rollback()
+                return self._policy_from_record(record) if record else None
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    @staticmethod
+    def _policy_from_record(record):
+        return LoanPolicyRecord(record[0], record[1], record[2], record[3], float(record[4]), record[5],
+                                float(record[6]) if record[6] is not None else None, record[7])
+
+    @staticmethod
+    def _stamp(cursor):
+        cursor.execute("SELECT MAX(updated_at), COUNT(*) FROM LoanPolicy;")
+        return tuple(cursor.fetchone())
+
+    def set_policy(self, member_category, book_type, max_loans, loan_period_days,
+                   daily_fine=0.50, grace_days=0, max_fine=None, max_renewals=0):
+        """Creates or replaces the policy for a member category and book type ('*' for any)."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO LoanPolicy (member_category, book_type, max_loans, loan_period_days,
+                        daily_fine, grace_days, max_fine, max_renewals, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                    ON CONFLICT (member_category, book_type) DO UPDATE
+                    SET max_loans = EXCLUDED.max_loans, loan_period_days = EXCLUDED.loan_period_days,
+                        daily_fine = EXCLUDED.daily_fine, grace_days = EXCLUDED.grace_days,
+                        max_fine = EXCLUDED.max_fine, max_renewals = EXCLUDED.max_renewals,
+                        updated_at = NOW();
+                """, (member_category, book_type, max_loans, loan_period_days,
+                      daily_fine, grace_days, max_fine, max_renewals))
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+        # Other processes see the edit within POLICY_CHECK_SECONDS
+        get_loan_policies().invalidate()
+
+    def delete_policy(self, member_category, book_type):
+        """Removes a policy; its members and books fall back to the next matching one."""
+        if (member_category, book_type) == (ANY, ANY):
+            raise BusinessRuleError("The default loan policy cannot be deleted.")
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM LoanPolicy WHERE member_category = %s AND book_type = %s;",
+                               (member_category, book_type))
+                if cursor.rowcount == 0:
+                    raise NotFoundError(f"No loan policy for '{member_category}' / '{book_type}'.")
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+        get_loan_policies().invalidate()
+
+
+class LoanPolicyCache:
+    """In-process copy of LoanPolicy for what the widgets show (limits, loan periods).
+
+    Enforcement does not use it: checkout, return and renewal resolve the policy in the same
+    statement that applies it (loan_policy_for in migration 0014), so a stale cache can only
+    mislabel, never let a loan through.
+    """
+
+    def __init__(self, dao=None):
+        self.dao = dao or LoanPolicyDAO()
+        self.lock = threading.Lock()
+        self.policies = None  # {(member_category, book_type): LoanPolicyRecord}
+        self.stamp = None
+        self.checked_at = 0.0
+
+    def invalidate(self):
+        """Forces a reload on the next lookup (after this process edited LoanPolicy)."""
+        with self.lock:
+            self.policies = None
+
+    def _current(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.policies is not None and now - self.checked_at < POLICY_CHECK_SECONDS:
+                return self.policies
+            # Another process may have edited the table: compare the stamp before reloading everything
+            if self.policies is None or self.dao.get_policy_stamp() != self.stamp:
+                self.stamp, rows = self.dao.get_policies()
+                self.policies = {(row.member_category, row.book_type): row for row in rows}
+            self.checked_at = now
+            return self.policies
+
+    def policy_for(self, member_category=ANY, book_type=ANY):
+        """The policy loan_policy_for() would pick for this category and book type."""
+        policies = self._current()
+        for key in ((member_category, book_type), (ANY, book_type), (member_category, ANY), (ANY, ANY)):
+            if key in policies:
+                return policies[key]
+        raise Exception("No default loan policy: LoanPolicy needs a '*' / '*' row.")
+
+
+_policy_cache = None
+_policy_cache_lock = threading.Lock()
+
+
+def get_loan_policies():
+    """Returns the process-wide LoanPolicyCache."""
+    global _policy_cache
+    with _policy_cache_lock:
+        if _policy_cache is None:
+            _policy_cache = LoanPolicyCache()
+        return _policy_cache
@@ -0,0 +1,84 @@
+# local_pgbouncer.py
+# Starts a throwaway PgBouncer (pool_mode = transaction) in front of the database in
+# db_connector.DB_CONFIG, listening on POOLER_CONFIG's port. Used by test_pgbouncer_mode.py
+# and bench_pgbouncer.py; needs the pgbouncer binary on PATH.
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+from db_connector import DB_CONFIG, POOLER_CONFIG
+
+PGBOUNCER_INI = """
+[databases]
+{database} = host={host} port={port} dbname={database} user={user} password={password}
+
+[pgbouncer]
+listen_addr = {listen_host}
+listen_port = {listen_port}
+pool_mode = transaction
+default_pool_size = {server_connections}
+max_client_conn = {max_clients}
+auth_type = trust
+auth_file = {auth_file}
+admin_users = {user}
+; A client sitting in an open transaction holds a server connection hostage
+idle_transaction_timeout = 30
+server_reset_query =
+logfile = {logfile}
+pidfile = {pidfile}
+"""
+
+
+class LocalPgBouncer:
+    """Context manager: runs pgbouncer with server_connections Postgres connections for max_clients clients."""
+
+    def __init__(self, server_connections=10, max_clients=1000):
+        self.server_connections = server_connections
+        self.max_clients = max_clients
+        self.process = None
+        self.workdir = None
+
+    def __enter__(self):
+        binary = shutil.which('pgbouncer')
+        if binary is None:
+            raise Exception("pgbouncer is not installed (apt install pgbouncer / brew install pgbouncer).")
+
+        self.workdir = tempfile.mkdtemp(prefix="pgbouncer_")
+        auth_file = os.path.join(self.workdir, 'userlist.txt')
+        with open(auth_file, 'w') as f:
+            f.write(f'"{DB_CONFIG["user"]}" ""\n')
+        ini = os.path.join(self.workdir, 'pgbouncer.ini')
+        with open(ini, 'w') as f:
+            f.write(PGBOUNCER_INI.format(
+                listen_host=POOLER_CONFIG["host"], listen_port=POOLER_CONFIG["port"],
+                server_connections=self.server_connections, max_clients=self.max_clients,
+                auth_file=auth_file, logfile=os.path.join(self.workdir, 'pgbouncer.log'),
+                pidfile=os.path.join(self.workdir, 'pgbouncer.pid'), **DB_CONFIG
+            ))
+
+        self.process = subprocess.Popen([binary, ini], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise Exception(f"pgbouncer exited: {self.process.stderr.read().decode(errors='replace')}")
+            try:
+                socket.create_connection((POOLER_CONFIG["host"], int(POOLER_CONFIG["port"])), timeout=0.5).close()
+                return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise Exception("pgbouncer did not start listening within 10 s.")
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+            self.process = None
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+        return False
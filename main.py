@@ -1,6 +1,10 @@
 # main.py
+# Usage: python main.py [--stall-report] [--stall-threshold-ms 250] [--stall-log stall_report.log]
+#                       [--offline-catalog [catalog.snapshot]]
 
+import argparse
 import sys
+import threading
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QVBoxLayout, QGridLayout,
@@ -19,6 +23,10 @@ from librarian_main_widget import LibrarianMainWidget
 from member_main_widget import MemberMainWidget
 from loan_manager_widget import LoanManagerWidget
 from member_loan_widget import MemberLoanWidget
+from stall_detector import StallDetector, DEFAULT_THRESHOLD_MS
+from kiosk_session import IdleLogout
+from autocomplete_index import warm_autocomplete_index
+from catalog_snapshot import enable_offline_catalog, DEFAULT_SNAPSHOT_PATH
 
 
 # --------------------------------------------------------------------------
@@ -61,6 +69,9 @@ class SmartLibraryApp(QMainWindow):
         self.loan_manager_widget = None
         self.member_loan_widget = None
 
+        # Shared kiosks: log a member out after a period without input
+        self.idle_logout = IdleLogout(self.handle_idle_timeout, parent=self)
+
     def get_dope_stylesheet(self):
         """Returns the Minimalist Dark Theme stylesheet with Neon Blue accents."""
         return """
@@ -152,9 +163,32 @@ class SmartLibraryApp(QMainWindow):
                 # Pass member_id to the member widget for personalized actions
                 self.member_main_widget = MemberMainWidget(self, user_data['user_id'])
                 self.stack.addWidget(self.member_main_widget)
+            else:
+                # Next member on the same kiosk: rebind in place instead of rebuilding the screen
+                self.member_main_widget.bind_member(user_data['user_id'])
 
             self.stack.setCurrentWidget(self.member_main_widget)
             self.setWindowTitle("SmartLibrary - Member Dashboard")
+            self.idle_logout.start()
+
+    # --- Session Lifecycle ---
+
+    def logout(self):
+        """Ends the session and returns to the login screen. Screens are kept and reset, not destroyed."""
+        self.idle_logout.stop()
+        if self.member_main_widget:
+            self.member_main_widget.clear_member()
+        if self.member_loan_widget:
+            self.member_loan_widget.clear_loan()
+
+        self.current_user = None
+        self.login_widget.reset()
+        self.stack.setCurrentWidget(self.login_widget)
+        self.setWindowTitle("SmartLibrary Management System")
+
+    def handle_idle_timeout(self):
+        if self.current_user is not None:
+            self.logout()
 
     # --- Librarian Navigation Methods ---
 
@@ -192,9 +226,9 @@ class SmartLibraryApp(QMainWindow):
 
     def show_member_dashboard(self):
         """Switches back to the Member Dashboard."""
-        if self.member_main_widget:
-            self.member_main_widget.load_book_data()
-            self.member_main_widget.update_loan_info()
+        # The session may have timed out while a dialog was open
+        if self.member_main_widget and self.current_user is not None:
+            self.member_main_widget.load_home()
             self.stack.setCurrentWidget(self.member_main_widget)
             self.setWindowTitle("SmartLibrary - Member Dashboard")
 
@@ -297,13 +331,38 @@ class LoginWidget(QWidget):
     def clear_fields(self):
         self.password_input.clear()
 
+    def reset(self):
+        """Blank form for the next user (after logout)."""
+        self.username_input.clear()
+        self.password_input.clear()
+        self.username_input.setFocus()
+
 
 # --------------------------------------------------------------------------
 ## III. Execution Block
 # --------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="SmartLibrary desktop client.")
+    parser.add_argument('--stall-report', action='store_true',
+                        help="Watch for GUI freezes and log a sampled stack of each one.")
+    parser.add_argument('--stall-threshold-ms', type=int, default=DEFAULT_THRESHOLD_MS)
+    parser.add_argument('--stall-log', default='stall_report.log')
+    parser.add_argument('--offline-catalog', nargs='?', const=DEFAULT_SNAPSHOT_PATH, metavar='SNAPSHOT',
+                        help="Kiosk mode: members browse a memory-mapped catalog snapshot, kept in sync "
+                             "in the background, so browsing starts instantly and survives outages.")
+    # Anything else (e.g. -platform, -style) is left for Qt
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.stall_report:
+        stall_detector = StallDetector(args.stall_threshold_ms, args.stall_log)
+        stall_detector.start()
+        app.aboutToQuit.connect(stall_detector.stop)
+    if args.offline_catalog:
+        enable_offline_catalog(args.offline_catalog)
+    # Search suggestions appear once the index is loaded or built; the GUI never waits for it
+    threading.Thread(target=warm_autocomplete_index, name="autocomplete-index", daemon=True).start()
     window = SmartLibraryApp()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
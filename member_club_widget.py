@@ -79,6 +79,13 @@ class MemberClubWidget(QWidget):
         """Reloads data when tabs are switched."""
         self.load_club_data()
 
+    def bind_member(self, member_id):
+        """Shows another member's clubs in place (kiosk user switching)."""
+        self.member_id = member_id
+        self.my_clubs_table.clearSelection()
+        self.browse_clubs_table.clearSelection()
+        self.load_club_data()
+
     # --- Data Loading ---
 
     def load_club_data(self):
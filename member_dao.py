@@ -2,6 +2,11 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from records import MemberRecord, BookRecord, intern_text
+from loan_policy_dao import get_loan_policies
+
+# Catalog rows included in the member home snapshot; further pages load on demand
+HOME_CATALOG_PAGE_SIZE = 100
 
 
 class MemberDAO:
@@ -16,7 +21,7 @@ class MemberDAO:
         try:
             with conn.cursor() as cursor:
                 query = """
-                    SELECT u.first_name, u.last_name, m.current_loans
+                    SELECT u.user_id, u.first_name, u.last_name, u.username, m.current_loans, m.category
                     FROM "User" u
                     JOIN Member m ON u.user_id = m.member_id
                     WHERE u.user_id = %s;
@@ -24,19 +29,79 @@ class MemberDAO:
                 cursor.execute(query, (member_id,))
                 record = cursor.fetchone()
 
-                if record:
-                    return {
-                        'first_name': record[0],
-                        'last_name': record[1],
-                        'current_loans': record[2]
-                    }
-                return None
+                return MemberRecord(*record) if record else None
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def get_member_home(self, member_id, page_size=HOME_CATALOG_PAGE_SIZE):
+        """Fetches everything the member dashboard shows in one query. Returns None for an unknown member.
+
+        Keys: member (MemberRecord), loan_limit, balance, active_loans, books (first catalog page
+        as BookRecords) and clubs.
+        """
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # One JSON document instead of five queries (and five pool checkouts)
+                query = """
+                    SELECT json_build_object(
+                        'member', json_build_object(
+                            'id', m.member_id, 'first_name', u.first_name, 'last_name', u.last_name,
+                            'username', u.username, 'current_loans', m.current_loans,
+                            'category', m.category),
+                        'balance', COALESCE((
+                            SELECT balance FROM MemberBalance WHERE member_id = m.member_id), 0),
+                        'active_loans', COALESCE((
+                            SELECT json_agg(json_build_object(
+                                'loan_id', l.loan_id, 'title', b.title,
+                                'loan_date', l.loan_date, 'due_date', l.due_date) ORDER BY l.due_date)
+                            FROM Loan l JOIN Book b ON b.book_id = l.book_id
+                            WHERE l.member_id = m.member_id AND l.return_date IS NULL), '[]'),
+                        'books', COALESCE((
+                            SELECT json_agg(json_build_object(
+                                'book_id', p.book_id, 'title', p.title, 'isbn', p.isbn,
+                                'year', p.publication_year, 'total_copies', p.total_copies,
+                                'available_copies', p.available_copies, 'authors', p.authors_display)
+                                ORDER BY p.title, p.book_id)
+                            FROM (
+                                SELECT * FROM Book ORDER BY title, book_id LIMIT %(page_size)s
+                            ) p), '[]'),
+                        'clubs', COALESCE((
+                            SELECT json_agg(json_build_object(
+                                'club_id', c.club_id, 'name', c.club_name, 'join_date', cm.join_date)
+                                ORDER BY c.club_name)
+                            FROM ClubMembership cm JOIN BookClub c ON c.club_id = cm.club_id
+                            WHERE cm.member_id = m.member_id), '[]')
+                    )
+                    FROM Member m
+                    JOIN "User" u ON u.user_id = m.member_id
+                    WHERE m.member_id = %(member_id)s;
+                """
+                cursor.execute(query, {'member_id': member_id, 'page_size': page_size})
+                record = cursor.fetchone()
+                if record is None:
+                    return None
+
+                home = record[0]
+                home['member'] = MemberRecord(**home['member'])
+                home['books'] = [BookRecord(**book) for book in home['books']]
+                for book in home['books']:
+                    book['authors'] = intern_text(book['authors']) if book['authors'] else "N/A"
+                home['balance'] = float(home['balance'])
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             self.db_connector.putconn(conn)
 
+        # From the in-process policy cache (its refresh needs a connection of its own, so only after
+        # ours is back in the pool); checkout itself enforces the limit in the database
+        home['loan_limit'] = get_loan_policies().policy_for(home['member']['category']).max_loans
+        return home
+
     def get_member_loan_count(self, member_id):  # <-- FIX FOR 'get_member_loan_count' ERROR
         """Fetches the current loan count for a member."""
         conn = self.db_connector.get_connection()
@@ -9,6 +9,7 @@ from PySide6.QtGui import QFont
 
 from book_dao import BookDAO
 from loan_dao import LoanDAO
+from loan_policy_dao import LoanPolicyDAO
 from member_dao import MemberDAO
 
 
@@ -21,6 +22,7 @@ class MemberLoanWidget(QWidget):
         self.member_dao = MemberDAO()
         # LoanDAO needs access to both book and member DAOs
         self.loan_dao = LoanDAO(self.book_dao, self.member_dao)
+        self.loan_policy_dao = LoanPolicyDAO()
 
         self.target_book_id = None
         self.target_member_id = None
@@ -70,13 +72,15 @@ class MemberLoanWidget(QWidget):
         try:
             # Fetch book details to display confirmation text
             book = self.book_dao.get_book_details(book_id)
-            if book:
+            # The loan period depends on the member's category and the book's type
+            policy = self.loan_policy_dao.get_policy_for_loan(book_id, member_id)
+            if book and policy:
                 loan_text = (
                     f"You are attempting to loan:\n\n"
                     f"Title: **{book['title']}**\n"
                     f"Author(s): {book['authors']}\n"
                     f"Available Copies: {book['available_copies']}\n\n"
-                    f"A standard loan period is 7 days. Click CONFIRM to proceed."
+                    f"The loan period is {policy.loan_period_days} days. Click CONFIRM to proceed."
                 )
                 self.book_details_label.setText(loan_text)
                 self.confirm_button.setEnabled(True)
@@ -89,6 +93,13 @@ class MemberLoanWidget(QWidget):
             self.book_details_label.setText("Error loading details.")
             self.confirm_button.setEnabled(False)
 
+    def clear_loan(self):
+        """Forgets the pending checkout (on logout) so the next member starts from a blank screen."""
+        self.target_book_id = None
+        self.target_member_id = None
+        self.book_details_label.setText("Please select a book to view details.")
+        self.confirm_button.setEnabled(False)
+
     def confirm_checkout(self):
         """Final call to the DAO to execute the loan transaction."""
         if self.target_book_id is None or self.target_member_id is None:
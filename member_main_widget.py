@@ -1,15 +1,29 @@
 # member_main_widget.py (Member Book Catalog View)
 
+import html
+import time
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QHeaderView, QMessageBox
+    QTableWidgetItem, QHeaderView, QMessageBox, QTabWidget
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 
 from book_dao import BookDAO
-from member_dao import MemberDAO
+from search_controller import SearchController, SuggestionCompleter
+from member_dao import MemberDAO, HOME_CATALOG_PAGE_SIZE
+from hold_dao import HoldDAO
+from catalog_snapshot import get_offline_catalog
+from loan_history_widget import LoanHistoryWidget
+from popularity_dao import PopularityDAO
+
+# How long the rendered catalog is reused when the next kiosk member logs in
+CATALOG_CACHE_SECONDS = 60
+# "Popular now": the most borrowed books of this window, refreshed at most once per CATALOG_CACHE_SECONDS
+POPULAR_WINDOW = 'week'
+POPULAR_PANEL_SIZE = 5
 
 
 class MemberMainWidget(QWidget):
@@ -20,10 +34,17 @@ class MemberMainWidget(QWidget):
         self.member_id = member_id
         self.book_dao = BookDAO()
         self.member_dao = MemberDAO()
+        self.hold_dao = HoldDAO()
+        self.popularity_dao = PopularityDAO()
+        self.popular_loaded_at = None
+        # Kiosks browse and search the offline snapshot (catalog_snapshot.py); otherwise the live database
+        self.offline_catalog = get_offline_catalog()
+        self.catalog = self.offline_catalog if self.offline_catalog is not None else self.book_dao
+        # When the table last showed a fresh first catalog page (None: search results or nothing)
+        self.catalog_loaded_at = None
 
         self.setup_ui()
-        self.load_book_data()
-        self.update_loan_info()
+        self.load_home()
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -34,24 +55,65 @@ class MemberMainWidget(QWidget):
         title_label.setFont(QFont("Arial", 16, QFont.Bold))
         header_layout.addWidget(title_label)
 
-        self.loan_limit_label = QLabel("Loans: 0/3")  # Display member's loan count
+        self.loan_limit_label = QLabel("Loans: -")  # Display member's loan count
         self.loan_limit_label.setFont(QFont("Arial", 10, QFont.Bold))
         header_layout.addWidget(self.loan_limit_label)
 
+        self.balance_label = QLabel("Fines: $0.00")  # Outstanding fine balance
+        self.balance_label.setFont(QFont("Arial", 10, QFont.Bold))
+        header_layout.addWidget(self.balance_label)
+
+        self.logout_button = QPushButton("🚪 Log Out")
+        self.logout_button.clicked.connect(self.parent.logout)
+        header_layout.addWidget(self.logout_button)
+
         main_layout.addLayout(header_layout)
 
+        # --- Member Summary: loans due and clubs, from the home snapshot ---
+        self.loans_summary_label = QLabel("No books on loan.")
+        self.loans_summary_label.setWordWrap(True)
+        main_layout.addWidget(self.loans_summary_label)
+        self.clubs_summary_label = QLabel("")
+        self.clubs_summary_label.setWordWrap(True)
+        main_layout.addWidget(self.clubs_summary_label)
+
+        # --- Tabs: the catalog, and the member's loan history (fetched when first opened) ---
+        self.tabs = QTabWidget()
+        catalog_tab = QWidget()
+        catalog_layout = QVBoxLayout(catalog_tab)
+
+        # --- Popular Now: one small query against the popularity counters ---
+        self.popular_label = QLabel("")
+        self.popular_label.setWordWrap(True)
+        self.popular_label.setTextFormat(Qt.RichText)
+        self.popular_label.linkActivated.connect(self.search_popular_book)
+        self.popular_label.setVisible(False)
+        catalog_layout.addWidget(self.popular_label)
+
         # --- Search Section ---
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by Title, Author, or ISBN...")
         self.search_input.returnPressed.connect(self.search_books)
 
+        # Live search: debounced, cancellable, results streamed into the table
+        self.search_controller = SearchController(self, self.catalog)
+        self.search_input.textEdited.connect(self.search_controller.text_edited)
+        self.search_controller.search_started.connect(self.handle_search_started)
+        self.search_controller.results_batch.connect(self.append_book_rows)
+        self.search_controller.search_finished.connect(self.handle_search_finished)
+        self.search_controller.search_failed.connect(
+            lambda message: QMessageBox.critical(self, "Search Error", f"An error occurred during search: {message}"))
+        self.search_controller.search_cleared.connect(self.load_book_data)
+        # Title/author/ISBN suggestions from the in-memory index
+        self.suggestions = SuggestionCompleter(self.search_input, self.search_controller)
+
         search_button = QPushButton("🔍 Search")
         search_button.clicked.connect(self.search_books)
 
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_button)
-        main_layout.addLayout(search_layout)
+        catalog_layout.addLayout(search_layout)
 
         # --- Middle Section: Data Table ---
         self.book_table = QTableWidget()
@@ -66,27 +128,114 @@ class MemberMainWidget(QWidget):
         self.book_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.book_table.setSelectionMode(QTableWidget.SingleSelection)
 
-        main_layout.addWidget(self.book_table)
+        catalog_layout.addWidget(self.book_table)
 
         # --- Bottom Section: Loan Button ---
         button_layout = QHBoxLayout()
 
+        self.more_button = QPushButton("⬇️ More Books")
+        self.more_button.clicked.connect(self.load_more_books)
+        button_layout.addWidget(self.more_button)
+
         self.loan_button = QPushButton("📚 Loan Selected Book")
         self.loan_button.clicked.connect(self.initiate_loan)
 
         button_layout.addStretch(1)
         button_layout.addWidget(self.loan_button)
 
-        main_layout.addLayout(button_layout)
+        catalog_layout.addLayout(button_layout)
+
+        self.tabs.addTab(catalog_tab, "Catalog")
+        self.history_widget = LoanHistoryWidget(self)
+        self.tabs.addTab(self.history_widget, "My History")
+        main_layout.addWidget(self.tabs)
+
+    # --- Kiosk Session ---
 
-    def update_loan_info(self):
-        """Fetches and displays the member's current loan count."""
+    def bind_member(self, member_id):
+        """Points the dashboard at another member without rebuilding it; a recent catalog is kept."""
+        self.member_id = member_id
+        cached = (self.catalog_loaded_at is not None
+                  and time.monotonic() - self.catalog_loaded_at < CATALOG_CACHE_SECONDS)
+        self.load_home(reuse_catalog=cached)
+
+    def clear_member(self):
+        """Drops everything belonging to the current member (on logout); the widget tree stays."""
+        self.member_id = None
+        self.loan_limit_label.setText("Loans: -")
+        self.balance_label.setText("Fines: $0.00")
+        self.loans_summary_label.setText("No books on loan.")
+        self.clubs_summary_label.setText("")
+        self.history_widget.set_member(None)
+        self.tabs.setCurrentIndex(0)
+        self.search_controller.cancel_in_flight()
+        if self.search_input.text():
+            # The table holds this member's search results, not the catalog
+            self.search_input.clear()
+            self.catalog_loaded_at = None
+        self.book_table.clearSelection()
+        self.book_table.scrollToTop()
+
+    def load_home(self, reuse_catalog=False):
+        """Renders the whole dashboard from one get_member_home snapshot (a single database round trip)."""
+        # History is re-fetched lazily: only if (or once) its tab is showing
+        self.history_widget.set_member(self.member_id)
+        # With an offline catalog the first page comes from the snapshot, not the database
+        page_size = 0 if reuse_catalog or self.offline_catalog is not None else HOME_CATALOG_PAGE_SIZE
         try:
-            current_loans = self.member_dao.get_member_loan_count(self.member_id)
-            self.loan_limit_label.setText(f"Loans: {current_loans}/3")
+            home = self.member_dao.get_member_home(self.member_id, page_size)
         except Exception as e:
             self.loan_limit_label.setText("Loans: Error")
-            QMessageBox.critical(self, "Error", f"Could not load member loan info: {e}")
+            if self.offline_catalog is not None:
+                # Database unreachable: the catalog can still be browsed from the snapshot
+                self.loans_summary_label.setText("⚠️ Offline: browsing the catalog only; loans are unavailable.")
+                if not reuse_catalog:
+                    self.load_book_data()
+                return
+            QMessageBox.critical(self, "Error", f"Could not load your dashboard: {e}")
+            return
+        if home is None:
+            QMessageBox.critical(self, "Error", f"Member ID {self.member_id} not found.")
+            return
+
+        self.loan_limit_label.setText(f"Loans: {home['member']['current_loans']}/{home['loan_limit']}")
+        self.balance_label.setText(f"Fines: ${home['balance']:.2f}")
+
+        loans = home['active_loans']
+        if loans:
+            self.loans_summary_label.setText("On loan: " + "; ".join(
+                f"{loan['title']} (due {loan['due_date']})" for loan in loans))
+        else:
+            self.loans_summary_label.setText("No books on loan.")
+        clubs = home['clubs']
+        self.clubs_summary_label.setText(
+            ("Your clubs: " + ", ".join(club['name'] for club in clubs)) if clubs else "")
+
+        if not reuse_catalog:
+            self.load_book_data(None if self.offline_catalog is not None else home['books'])
+        self.load_popular()
+
+    def load_popular(self):
+        """Refreshes the "Popular now" panel unless it was loaded recently; hides it if unavailable."""
+        if (self.popular_loaded_at is not None
+                and time.monotonic() - self.popular_loaded_at < CATALOG_CACHE_SECONDS):
+            return
+        try:
+            books = self.popularity_dao.get_top_books(POPULAR_WINDOW, POPULAR_PANEL_SIZE)
+        except Exception:
+            self.popular_label.setVisible(False)
+            return
+        self.popular_loaded_at = time.monotonic()
+        links = " · ".join(f'<a href="{html.escape(book["title"])}">{html.escape(book["title"])}</a>'
+                           for book in books)
+        self.popular_label.setText(f"🔥 Popular this {POPULAR_WINDOW}: {links}")
+        self.popular_label.setVisible(bool(books))
+
+    def search_popular_book(self, title):
+        """Clicking a popular title searches the catalog for it."""
+        self.tabs.setCurrentIndex(0)
+        self.search_input.setText(title)
+        self.search_controller.search_now(title)
 
     def get_selected_book_data(self):
         """Helper to get ID and availability of the selected book."""
@@ -108,40 +257,55 @@ class MemberMainWidget(QWidget):
 
         if books is None:
             try:
-                # Use a specific DAO method that returns the right columns for members
-                books = self.book_dao.get_all_books()
+                # First page only; "More Books" pages through the rest
+                books = self.catalog.get_books_page(HOME_CATALOG_PAGE_SIZE)
             except Exception as e:
                 QMessageBox.critical(self, "Database Error", f"Failed to load book data: {e}")
                 self.book_table.setRowCount(0)
                 return
 
-        self.book_table.setRowCount(len(books))
+        self.book_table.setRowCount(0)
+        self.append_book_rows(books)
+        self.more_button.setEnabled(len(books) >= HOME_CATALOG_PAGE_SIZE)
+        self.catalog_loaded_at = time.monotonic()
+
+    def load_more_books(self):
+        """Appends the next catalog page to the table."""
+        try:
+            books = self.catalog.get_books_page(HOME_CATALOG_PAGE_SIZE, self.book_table.rowCount())
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to load book data: {e}")
+            return
+        self.append_book_rows(books)
+        self.more_button.setEnabled(len(books) >= HOME_CATALOG_PAGE_SIZE)
+
+    def append_book_rows(self, books):
+        """Appends books to the end of the table (used for full loads and streamed search batches)."""
+        start_row = self.book_table.rowCount()
+        self.book_table.setRowCount(start_row + len(books))
 
         for row_index, book in enumerate(books):
-            self.book_table.setItem(row_index, 0, QTableWidgetItem(str(book.get('book_id', ''))))
-            self.book_table.setItem(row_index, 1, QTableWidgetItem(book.get('title', '')))
-            self.book_table.setItem(row_index, 2, QTableWidgetItem(book.get('authors', '')))
-            self.book_table.setItem(row_index, 3, QTableWidgetItem(book.get('isbn', '')))
+            self.book_table.setItem(start_row + row_index, 0, QTableWidgetItem(str(book.get('book_id', ''))))
+            self.book_table.setItem(start_row + row_index, 1, QTableWidgetItem(book.get('title', '')))
+            self.book_table.setItem(start_row + row_index, 2, QTableWidgetItem(book.get('authors', '')))
+            self.book_table.setItem(start_row + row_index, 3, QTableWidgetItem(book.get('isbn', '')))
             # Only showing Available Copies for members
-            self.book_table.setItem(row_index, 4, QTableWidgetItem(str(book.get('available_copies', 0))))
+            self.book_table.setItem(start_row + row_index, 4, QTableWidgetItem(str(book.get('available_copies', 0))))
+
+    def handle_search_started(self, search_term):
+        self.book_table.setRowCount(0)
+        self.catalog_loaded_at = None
 
     def search_books(self):
-        """Calls the DAO search method and updates the table."""
-        search_term = self.search_input.text().strip()
+        """Runs the search immediately (Enter or the Search button)."""
+        self.search_controller.search_now(self.search_input.text())
 
-        if not search_term:
-            self.load_book_data()
-            return
-
-        try:
-            results = self.book_dao.search_books(search_term)
-            if results:
-                self.load_book_data(results)
-            else:
-                QMessageBox.information(self, "Search Result", f"No books found matching '{search_term}'.")
-                self.book_table.setRowCount(0)
-        except Exception as e:
-            QMessageBox.critical(self, "Search Error", f"An error occurred during search: {e}")
+    def handle_search_finished(self, search_term, total, explicit):
+        """Only explicit searches report an empty result; live typing just shows an empty table."""
+        # Search results arrive complete; paging only applies to the catalog
+        self.more_button.setEnabled(False)
+        if explicit and total == 0:
+            QMessageBox.information(self, "Search Result", f"No books found matching '{search_term}'.")
 
     # --- Loan Initiation ---
 
@@ -151,8 +315,30 @@ class MemberMainWidget(QWidget):
 
         if book_data:
             if book_data['available'] <= 0:
-                QMessageBox.warning(self, "Loan Failed", "This book has no available copies for loan.")
-                return
+                try:
+                    reserved = self.hold_dao.has_ready_hold(book_data['book_id'], self.member_id)
+                except Exception as e:
+                    QMessageBox.critical(self, "Error", f"Could not check your holds: {e}")
+                    return
+
+                # A copy waiting for this member on the hold shelf can be checked out
+                if not reserved:
+                    self.offer_hold(book_data['book_id'])
+                    return
 
             # Navigate to the loan confirmation screen
-            self.parent.show_member_loan_view(book_data['book_id'])
\ No newline at end of file
+            self.parent.show_member_loan_view(book_data['book_id'])
+
+    def offer_hold(self, book_id):
+        """Offers to queue the member for a book with no available copies."""
+        reply = QMessageBox.question(self, 'No Copies Available',
+                                     "This book has no available copies for loan.\n"
+                                     "Would you like to place a hold? You will be added to the end of the queue for this book.",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+
+        if reply == QMessageBox.Yes:
+            try:
+                self.hold_dao.place_hold(book_id, self.member_id)
+                QMessageBox.information(self, "Hold Placed", f"You have been added to the queue for Book ID {book_id}.")
+            except Exception as e:
+                QMessageBox.critical(self, "Hold Failed", str(e))
\ No newline at end of file
@@ -2,6 +2,10 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from library_errors import BusinessRuleError, NotFoundError
+from password_utility import generate_hash
+from loan_policy_dao import MEMBER_CATEGORIES
+from records import MemberRecord
 
 
 class MemberManagementDAO:
@@ -10,32 +14,35 @@ class MemberManagementDAO:
     def __init__(self):
         self.db_connector = get_db_connector()
 
-    def create_new_member(self, first_name, last_name, username, password):
+    def create_new_member(self, first_name, last_name, username, password, category='ADULT'):
         """Creates a new User record (Role must be 'Member') and the corresponding Member record."""
+        if category not in MEMBER_CATEGORIES:
+            raise BusinessRuleError(f"Unknown member category '{category}'.")
         conn = self.db_connector.get_connection()
         try:
             with conn.cursor() as cursor:
-                # 1. Create the new User record (Uses role, excludes email to satisfy NOT NULL constraint fix)
+                # 1. Create the new User record (role_id of 'Member', see migration 0001; email left NULL)
                 user_query = """
-                    INSERT INTO "User" (username, password, first_name, last_name, role)
-                    VALUES (%s, %s, %s, %s, 'Member') RETURNING user_id;
+                    INSERT INTO "User" (username, password, first_name, last_name, role_id)
+                    VALUES (%s, %s, %s, %s, (SELECT role_id FROM Role WHERE role_name = 'Member'))
+                    RETURNING user_id;
                 """
-                cursor.execute(user_query, (username, password, first_name, last_name))
+                cursor.execute(user_query, (username, generate_hash(password), first_name, last_name))
                 new_user_id = cursor.fetchone()[0]
 
-                # 2. Create the corresponding Member record
+                # 2. Create the corresponding Member record; the category picks its LoanPolicy
                 member_query = """
-                    INSERT INTO Member (member_id, current_loans)
-                    VALUES (%s, 0);
+                    INSERT INTO Member (member_id, current_loans, category)
+                    VALUES (%s, 0, %s);
                 """
-                cursor.execute(member_query, (new_user_id,))
+                cursor.execute(member_query, (new_user_id, category))
 
                 conn.commit()
                 return new_user_id
         except psycopg2.IntegrityError as e:
             conn.rollback()
             if 'duplicate key value violates unique constraint "user_username_key"' in str(e):
-                raise Exception("Username already exists. Please choose a different one.")
+                raise BusinessRuleError("Username already exists. Please choose a different one.")
             raise Exception(f"Database Integrity Error: {e}")
         except Exception as e:
             conn.rollback()
@@ -49,7 +56,7 @@ class MemberManagementDAO:
         try:
             with conn.cursor() as cursor:
                 query = """
-                    SELECT u.user_id, u.first_name, u.last_name, u.username, m.current_loans
+                    SELECT u.user_id, u.first_name, u.last_name, u.username, m.current_loans, m.category
                     FROM "User" u
                     JOIN Member m ON u.user_id = m.member_id
                     ORDER BY u.user_id;
@@ -57,12 +64,23 @@ class MemberManagementDAO:
                 cursor.execute(query)
                 records = cursor.fetchall()
 
-                members = []
-                for record in records:
-                    members.append({
-                        'id': record[0], 'first_name': record[1], 'last_name': record[2],
-                        'username': record[3], 'current_loans': record[4]
-                    })
-                return members
+                return [MemberRecord(*record) for record in records]
         finally:
-            self.db_connector.putconn(conn)
\ No newline at end of file
+            self.db_connector.putconn(conn)
+
+    def set_member_category(self, member_id, category):
+        """Moves a member to another category. Loans already out keep their due dates."""
+        if category not in MEMBER_CATEGORIES:
+            raise BusinessRuleError(f"Unknown member category '{category}'.")
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("UPDATE Member SET category = %s WHERE member_id = %s;", (category, member_id))
+                if cursor.rowcount == 0:
+                    raise NotFoundError(f"Member ID {member_id} not found.")
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
@@ -3,13 +3,15 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QMessageBox, QDialog, QTableWidget,
-    QTableWidgetItem, QHeaderView
+    QTableWidgetItem, QHeaderView, QSplitter, QInputDialog
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 
 from member_management_dao import MemberManagementDAO
 from add_member_dialog import AddMemberDialog
+from loan_policy_dao import MEMBER_CATEGORIES
+from loan_history_widget import LoanHistoryWidget
 
 
 class MemberManagementWidget(QWidget):
@@ -33,10 +35,13 @@ class MemberManagementWidget(QWidget):
         button_layout = QHBoxLayout()
         self.add_member_button = QPushButton("➕ Register New Member")
         self.add_member_button.clicked.connect(self.add_member)
+        self.category_button = QPushButton("🏷️ Change Category")
+        self.category_button.clicked.connect(self.change_category)
         self.refresh_button = QPushButton("🔄 Refresh List")
         self.refresh_button.clicked.connect(self.load_member_data)
 
         button_layout.addWidget(self.add_member_button)
+        button_layout.addWidget(self.category_button)
         button_layout.addWidget(self.refresh_button)
         button_layout.addStretch(1)
         main_layout.addLayout(button_layout)
@@ -45,16 +50,33 @@ class MemberManagementWidget(QWidget):
 
         # Member Table
         self.member_table = QTableWidget()
-        self.member_table.setColumnCount(5)
+        self.member_table.setColumnCount(6)
         self.member_table.setHorizontalHeaderLabels([
-            "ID", "First Name", "Last Name", "Username", "Active Loans"
+            "ID", "First Name", "Last Name", "Username", "Active Loans", "Category"
         ])
         self.member_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.member_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.member_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        self.member_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
         self.member_table.verticalHeader().setVisible(False)
         self.member_table.setSelectionBehavior(QTableWidget.SelectRows)
-        main_layout.addWidget(self.member_table)
+        self.member_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.member_table.itemSelectionChanged.connect(self.handle_member_selected)
+
+        # Loan history of the selected member, fetched on selection
+        history_panel = QWidget()
+        history_layout = QVBoxLayout(history_panel)
+        history_layout.setContentsMargins(0, 0, 0, 0)
+        history_title = QLabel("📜 Loan History")
+        history_title.setFont(QFont("Arial", 11, QFont.Bold))
+        history_layout.addWidget(history_title)
+        self.history_widget = LoanHistoryWidget(self, "Select a member to see their loan history.")
+        history_layout.addWidget(self.history_widget)
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.member_table)
+        splitter.addWidget(history_panel)
+        main_layout.addWidget(splitter)
 
     def load_member_data(self):
         """Fetches and displays all members."""
@@ -68,11 +90,20 @@ class MemberManagementWidget(QWidget):
                 self.member_table.setItem(row_index, 2, QTableWidgetItem(member['last_name']))
                 self.member_table.setItem(row_index, 3, QTableWidgetItem(member['username']))
                 self.member_table.setItem(row_index, 4, QTableWidgetItem(str(member['current_loans'])))
+                self.member_table.setItem(row_index, 5, QTableWidgetItem(member['category']))
 
         except Exception as e:
             QMessageBox.critical(self, "Database Error", f"Failed to load member list: {e}")
             self.member_table.setRowCount(0)
 
+    def handle_member_selected(self):
+        selected_rows = self.member_table.selectedItems()
+        if not selected_rows:
+            self.history_widget.set_member(None)
+            return
+        item = self.member_table.item(selected_rows[0].row(), 0)
+        self.history_widget.set_member(int(item.text()))
+
     def add_member(self):
         """Opens dialog and calls DAO to create a new member."""
         dialog = AddMemberDialog(self)
@@ -85,10 +116,34 @@ class MemberManagementWidget(QWidget):
                     data['first_name'],
                     data['last_name'],
                     data['username'],
-                    data['password']
+                    data['password'],
+                    data['category']
                 )
                 QMessageBox.information(self, "Success",
                                         f"New Member Account created!\nID: {new_id}\nUsername: {data['username']}")
                 self.load_member_data()  # Refresh the table
             except Exception as e:
-                QMessageBox.critical(self, "Registration Failed", str(e))
\ No newline at end of file
+                QMessageBox.critical(self, "Registration Failed", str(e))
+
+    def change_category(self):
+        """Moves the selected member to another category (and so another LoanPolicy)."""
+        selected_rows = self.member_table.selectedItems()
+        if not selected_rows:
+            QMessageBox.warning(self, "Selection Error", "Please select a member first.")
+            return
+        row = selected_rows[0].row()
+        member_id = int(self.member_table.item(row, 0).text())
+        current = self.member_table.item(row, 5).text()
+
+        category, ok = QInputDialog.getItem(
+            self, "Change Category", f"Category for Member ID {member_id}:", list(MEMBER_CATEGORIES),
+            MEMBER_CATEGORIES.index(current) if current in MEMBER_CATEGORIES else 0, False
+        )
+        if not ok or category == current:
+            return
+
+        try:
+            self.member_dao.set_member_category(member_id, category)
+            self.load_member_data()
+        except Exception as e:
+            QMessageBox.critical(self, "Update Failed", str(e))
@@ -0,0 +1,195 @@
+# migrate.py
+# Versioned schema migrations. Migrations live in migrations/ as NNNN_name.up.sql / NNNN_name.down.sql
+# pairs, or as NNNN_name.py modules defining up(cursor) and down(cursor). Each one runs in its own
+# transaction and is recorded in SchemaVersion.
+# Usage:
+#   python migrate.py status
+#   python migrate.py up [--to VERSION]       (default: latest)
+#   python migrate.py down [--to VERSION]     (default: one step back)
+
+import argparse
+import importlib.util
+import os
+import re
+
+from db_connector import get_db_connector
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+?)(\.up\.sql|\.down\.sql|\.py)$')
+# Serialises concurrent migrate.py runs (pg_advisory_xact_lock key)
+MIGRATION_LOCK_ID = 7301
+
+
+class Migration:
+    """One schema version: an up step and, if it can be reversed, a down step."""
+
+    def __init__(self, version, name):
+        self.version = version
+        self.name = name
+        self.up = None
+        self.down = None
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def _sql_step(path):
+    def run(cursor):
+        with open(path, encoding='utf-8') as f:
+            cursor.execute(f.read())
+    return run
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Reads the migrations directory into Migration objects, ordered by version."""
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version, name, kind = int(match.group(1)), match.group(2), match.group(3)
+        migration = migrations.setdefault(version, Migration(version, name))
+        if migration.name != name:
+            raise Exception(f"Migration version {version:04d} is used by both '{migration.name}' and '{name}'.")
+
+        path = os.path.join(directory, filename)
+        if kind == '.up.sql':
+            migration.up = _sql_step(path)
+        elif kind == '.down.sql':
+            migration.down = _sql_step(path)
+        else:
+            spec = importlib.util.spec_from_file_location(f"migration_{version:04d}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            migration.up = getattr(module, 'up', None)
+            migration.down = getattr(module, 'down', None)
+
+    for migration in migrations.values():
+        if migration.up is None:
+            raise Exception(f"Migration {migration} has no up step.")
+    return [migrations[version] for version in sorted(migrations)]
+
+
+class Migrator:
+    """Applies and reverts migrations against the database in db_connector.DB_CONFIG."""
+
+    def __init__(self, migrations=None):
+        self.db_connector = get_db_connector()
+        self.migrations = migrations if migrations is not None else load_migrations()
+
+    def _ensure_version_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS SchemaVersion (
+                version     INT PRIMARY KEY,
+                name        VARCHAR(100) NOT NULL,
+                applied_at  TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+        """)
+
+    def applied_versions(self):
+        """Returns {version: applied_at} for every applied migration."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                self._ensure_version_table(cursor)
+                cursor.execute("SELECT version, applied_at FROM SchemaVersion;")
+                applied = dict(cursor.fetchall())
+                conn.commit()
+                return applied
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def current_version(self):
+        return max(self.applied_versions(), default=0)
+
+    def _run_step(self, migration, direction):
+        """Runs one migration step and updates SchemaVersion in the same transaction."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_ID,))
+                self._ensure_version_table(cursor)
+                cursor.execute("SELECT 1 FROM SchemaVersion WHERE version = %s;", (migration.version,))
+                is_applied = cursor.fetchone() is not None
+                # Another run got here first
+                if is_applied == (direction == 'up'):
+                    conn.rollback()
+                    return False
+
+                if direction == 'up':
+                    migration.up(cursor)
+                    cursor.execute("INSERT INTO SchemaVersion (version, name) VALUES (%s, %s);",
+                                   (migration.version, migration.name))
+                else:
+                    migration.down(cursor)
+                    cursor.execute("DELETE FROM SchemaVersion WHERE version = %s;", (migration.version,))
+                conn.commit()
+                return True
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Migration {migration} ({direction}) failed: {e}")
+        finally:
+            self.db_connector.putconn(conn)
+
+    def up(self, target=None):
+        """Applies every pending migration up to target (default: latest). Returns those applied."""
+        applied = self.applied_versions()
+        done = []
+        for migration in self.migrations:
+            if target is not None and migration.version > target:
+                break
+            if migration.version not in applied and self._run_step(migration, 'up'):
+                print(f"  ⬆️  {migration}")
+                done.append(migration)
+        return done
+
+    def down(self, target=None):
+        """Reverts applied migrations above target (default: the latest one only). Returns those reverted."""
+        applied = self.applied_versions()
+        if target is None:
+            target = max(applied, default=0) - 1
+        pending = [m for m in reversed(self.migrations) if m.version in applied and m.version > target]
+        for migration in pending:
+            if migration.down is None:
+                raise Exception(f"Migration {migration} cannot be reverted (no down step).")
+
+        done = []
+        for migration in pending:
+            if self._run_step(migration, 'down'):
+                print(f"  ⬇️  {migration}")
+                done.append(migration)
+        return done
+
+    def status(self):
+        applied = self.applied_versions()
+        for migration in self.migrations:
+            when = applied.get(migration.version)
+            state = f"applied {when:%Y-%m-%d %H:%M}" if when else "pending"
+            print(f"  {str(migration):<32} {state}")
+        unknown = sorted(set(applied) - {m.version for m in self.migrations})
+        if unknown:
+            print(f"  ⚠️  Applied versions with no migration file: {unknown}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply or revert SmartLibrary schema migrations.")
+    parser.add_argument('command', choices=['status', 'up', 'down'])
+    parser.add_argument('--to', type=int, help="Target version.")
+    args = parser.parse_args()
+
+    try:
+        migrator = Migrator()
+        print(f"--- Schema migrations ({MIGRATIONS_DIR}) ---")
+        if args.command == 'status':
+            migrator.status()
+        elif args.command == 'up':
+            done = migrator.up(args.to)
+            print(f"Applied {len(done)} migration(s); now at version {migrator.current_version()}.")
+        else:
+            done = migrator.down(args.to)
+            print(f"Reverted {len(done)} migration(s); now at version {migrator.current_version()}.")
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,12 @@
+-- 0001_base_schema.down.sql
+-- Drops every core table. Destroys all library data.
+
+DROP TABLE IF EXISTS ClubMembership;
+DROP TABLE IF EXISTS BookClub;
+DROP TABLE IF EXISTS Loan;
+DROP TABLE IF EXISTS BookAuthor;
+DROP TABLE IF EXISTS Book;
+DROP TABLE IF EXISTS Author;
+DROP TABLE IF EXISTS Member;
+DROP TABLE IF EXISTS "User";
+DROP TABLE IF EXISTS Role;
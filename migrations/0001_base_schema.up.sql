@@ -0,0 +1,76 @@
+-- 0001_base_schema.up.sql
+-- Core SmartLibrary tables, as the DAOs use them. Every statement is IF NOT EXISTS, so this
+-- also runs cleanly against a database created before migrations existed.
+
+CREATE TABLE IF NOT EXISTS Role (
+    role_id    SERIAL PRIMARY KEY,
+    role_name  VARCHAR(20) NOT NULL UNIQUE
+);
+
+INSERT INTO Role (role_name) VALUES ('Librarian'), ('Member')
+ON CONFLICT (role_name) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS "User" (
+    user_id     SERIAL PRIMARY KEY,
+    username    VARCHAR(50) NOT NULL,
+    password    VARCHAR(255) NOT NULL,
+    first_name  VARCHAR(50) NOT NULL,
+    last_name   VARCHAR(50) NOT NULL,
+    email       VARCHAR(100),
+    role_id     INT NOT NULL REFERENCES Role(role_id),
+    -- Named explicitly: MemberManagementDAO matches this name to report a taken username
+    CONSTRAINT user_username_key UNIQUE (username)
+);
+
+-- One row per member account; current_loans is maintained by LoanDAO (see counter_reconciler.py).
+CREATE TABLE IF NOT EXISTS Member (
+    member_id        INT PRIMARY KEY REFERENCES "User"(user_id) ON DELETE CASCADE,
+    enrollment_date  DATE NOT NULL DEFAULT CURRENT_DATE,
+    current_loans    INT NOT NULL DEFAULT 0 CHECK (current_loans >= 0)
+);
+
+CREATE TABLE IF NOT EXISTS Author (
+    author_id   SERIAL PRIMARY KEY,
+    first_name  VARCHAR(50) NOT NULL,
+    last_name   VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Book (
+    book_id           SERIAL PRIMARY KEY,
+    title             VARCHAR(255) NOT NULL,
+    isbn              VARCHAR(20),
+    publication_year  INT,
+    total_copies      INT NOT NULL DEFAULT 1 CHECK (total_copies >= 0),
+    available_copies  INT NOT NULL DEFAULT 1 CHECK (available_copies >= 0)
+);
+
+CREATE TABLE IF NOT EXISTS BookAuthor (
+    book_id    INT NOT NULL REFERENCES Book(book_id) ON DELETE CASCADE,
+    author_id  INT NOT NULL REFERENCES Author(author_id) ON DELETE CASCADE,
+    PRIMARY KEY (book_id, author_id)
+);
+
+CREATE TABLE IF NOT EXISTS Loan (
+    loan_id      SERIAL PRIMARY KEY,
+    book_id      INT NOT NULL REFERENCES Book(book_id),
+    member_id    INT NOT NULL REFERENCES Member(member_id),
+    loan_date    DATE NOT NULL DEFAULT CURRENT_DATE,
+    due_date     DATE NOT NULL,
+    return_date  DATE,
+    fine_amount  NUMERIC(10, 2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS BookClub (
+    club_id          SERIAL PRIMARY KEY,
+    club_name        VARCHAR(100) NOT NULL,
+    description      TEXT,
+    max_members      INT NOT NULL CHECK (max_members > 0),
+    current_members  INT NOT NULL DEFAULT 0 CHECK (current_members >= 0)
+);
+
+CREATE TABLE IF NOT EXISTS ClubMembership (
+    club_id    INT NOT NULL REFERENCES BookClub(club_id) ON DELETE CASCADE,
+    member_id  INT NOT NULL REFERENCES Member(member_id) ON DELETE CASCADE,
+    join_date  DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (club_id, member_id)
+);
@@ -0,0 +1,7 @@
+-- 0002_dao_indexes.down.sql
+
+DROP INDEX IF EXISTS user_role_idx;
+DROP INDEX IF EXISTS clubmembership_member_idx;
+DROP INDEX IF EXISTS loan_member_idx;
+DROP INDEX IF EXISTS loan_open_book_idx;
+DROP INDEX IF EXISTS bookauthor_author_idx;
@@ -0,0 +1,22 @@
+-- 0002_dao_indexes.up.sql
+-- Indexes for the join and filter columns the DAOs hit. Primary keys already cover
+-- Member.member_id, BookAuthor(book_id, ...), ClubMembership(club_id, ...) and the
+-- user_username_key constraint covers "User".username (UserDAO.verify_login).
+
+-- Author -> books: the authors_display refresh on author renames, and deleting an
+-- author (the BookAuthor FK would otherwise scan the whole table).
+CREATE INDEX IF NOT EXISTS bookauthor_author_idx ON BookAuthor (author_id);
+
+-- Open loans of a book: counter reconciliation and the available-copies checks stay
+-- proportional to what is out, not to the whole loan history.
+CREATE INDEX IF NOT EXISTS loan_open_book_idx ON Loan (book_id) WHERE return_date IS NULL;
+
+-- A member's loans: get_member_home's active loans, counter reconciliation per member,
+-- and the FK from Loan to Member (deleting a member would otherwise scan all loans).
+CREATE INDEX IF NOT EXISTS loan_member_idx ON Loan (member_id);
+
+-- A member's clubs: BookClubDAO.get_member_clubs and get_member_home.
+CREATE INDEX IF NOT EXISTS clubmembership_member_idx ON ClubMembership (member_id);
+
+-- Members by role: the member management list joins "User" to Role.
+CREATE INDEX IF NOT EXISTS user_role_idx ON "User" (role_id);
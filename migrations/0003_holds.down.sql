@@ -0,0 +1,3 @@
+-- 0003_holds.down.sql
+
+DROP TABLE IF EXISTS Hold;
@@ -0,0 +1,29 @@
+-- 0003_holds.up.sql
+-- Hold/reservation queue.
+
+CREATE TABLE IF NOT EXISTS Hold (
+    hold_id      BIGSERIAL PRIMARY KEY,
+    book_id      INT NOT NULL REFERENCES Book(book_id) ON DELETE CASCADE,
+    member_id    INT NOT NULL REFERENCES Member(member_id) ON DELETE CASCADE,
+    status       VARCHAR(10) NOT NULL DEFAULT 'WAITING'
+                 CHECK (status IN ('WAITING', 'READY', 'FULFILLED', 'CANCELLED', 'EXPIRED')),
+    placed_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+    ready_at     TIMESTAMP,
+    expires_at   TIMESTAMP,
+    closed_at    TIMESTAMP
+);
+
+-- FIFO queue head per book: hold_id is monotonic, so the next holder is the
+-- first entry of this partial index for the book (no scan of the queue).
+CREATE INDEX IF NOT EXISTS hold_queue_idx
+    ON Hold (book_id, hold_id) WHERE status = 'WAITING';
+
+-- Unclaimed holds for the expiry batch.
+CREATE INDEX IF NOT EXISTS hold_ready_expiry_idx
+    ON Hold (expires_at) WHERE status = 'READY';
+
+-- A member can only be queued once per book.
+CREATE UNIQUE INDEX IF NOT EXISTS hold_active_unique_idx
+    ON Hold (book_id, member_id) WHERE status IN ('WAITING', 'READY');
+
+CREATE INDEX IF NOT EXISTS hold_member_idx ON Hold (member_id);
@@ -0,0 +1,6 @@
+-- 0004_fines.down.sql
+
+DROP INDEX IF EXISTS loan_open_due_idx;
+DROP TABLE IF EXISTS MemberBalance;
+DROP TABLE IF EXISTS LoanFineAccrual;
+DROP TABLE IF EXISTS FineLedger;
@@ -0,0 +1,33 @@
+-- 0004_fines.up.sql
+-- Fine ledger and maintained balances for the nightly accrual engine (fine_engine.py).
+
+-- Append-only history of every fine posting (ACCRUAL from the nightly job, RETURN at check-in).
+CREATE TABLE IF NOT EXISTS FineLedger (
+    entry_id     BIGSERIAL PRIMARY KEY,
+    member_id    INT NOT NULL REFERENCES Member(member_id) ON DELETE CASCADE,
+    loan_id      INT NOT NULL,
+    amount       NUMERIC(10, 2) NOT NULL,
+    entry_type   VARCHAR(10) NOT NULL CHECK (entry_type IN ('ACCRUAL', 'RETURN')),
+    run_date     DATE NOT NULL DEFAULT CURRENT_DATE,
+    created_at   TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS fineledger_member_idx ON FineLedger (member_id, created_at);
+
+-- Fine accrued so far on each still-open overdue loan, so each run only posts the delta.
+CREATE TABLE IF NOT EXISTS LoanFineAccrual (
+    loan_id         INT PRIMARY KEY,
+    member_id       INT NOT NULL,
+    accrued_amount  NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    last_accrued    DATE NOT NULL
+);
+
+-- Running balance per member; get_member_balance reads this instead of summing FineLedger.
+CREATE TABLE IF NOT EXISTS MemberBalance (
+    member_id   INT PRIMARY KEY REFERENCES Member(member_id) ON DELETE CASCADE,
+    balance     NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Open loans by due date: drives the overdue scan.
+CREATE INDEX IF NOT EXISTS loan_open_due_idx ON Loan (due_date) WHERE return_date IS NULL;
@@ -0,0 +1,14 @@
+-- 0005_catalog_authors.down.sql
+
+DROP INDEX IF EXISTS book_catalog_covering_idx;
+DROP TRIGGER IF EXISTS author_update_authors ON Author;
+DROP TRIGGER IF EXISTS bookauthor_update_authors ON BookAuthor;
+DROP TRIGGER IF EXISTS bookauthor_delete_authors ON BookAuthor;
+DROP TRIGGER IF EXISTS bookauthor_insert_authors ON BookAuthor;
+DROP FUNCTION IF EXISTS author_renamed();
+DROP FUNCTION IF EXISTS bookauthor_updated();
+DROP FUNCTION IF EXISTS bookauthor_deleted();
+DROP FUNCTION IF EXISTS bookauthor_inserted();
+DROP FUNCTION IF EXISTS refresh_book_authors(INT[]);
+ALTER TABLE Book RESET (autovacuum_vacuum_scale_factor, autovacuum_vacuum_insert_scale_factor);
+ALTER TABLE Book DROP COLUMN IF EXISTS authors_display;
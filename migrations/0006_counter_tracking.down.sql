@@ -0,0 +1,11 @@
+-- 0006_counter_tracking.down.sql
+
+DROP TRIGGER IF EXISTS clubmembership_touch_members ON ClubMembership;
+DROP TRIGGER IF EXISTS bookclub_touch_members ON BookClub;
+DROP TRIGGER IF EXISTS loan_touch_loans ON Loan;
+DROP TRIGGER IF EXISTS member_touch_loans ON Member;
+DROP TRIGGER IF EXISTS hold_touch_available ON Hold;
+DROP TRIGGER IF EXISTS loan_touch_available ON Loan;
+DROP TRIGGER IF EXISTS book_touch_available ON Book;
+DROP FUNCTION IF EXISTS touch_counter();
+DROP TABLE IF EXISTS CounterTouch;
@@ -0,0 +1,62 @@
+-- 0006_counter_tracking.up.sql
+-- Change tracking for counter_reconciler.py --incremental.
+-- Every write that can move Book.available_copies, Member.current_loans or BookClub.current_members
+-- (or the rows they are derived from) records the affected id here; an incremental run
+-- rechecks just those ids and clears them.
+-- The Loan triggers must live on the current Loan relation: loan_partition_manager.py migrate
+-- moves them to the partitioned parent, and counter_reconciler.py --incremental checks for them.
+
+CREATE TABLE IF NOT EXISTS CounterTouch (
+    counter    VARCHAR(20) NOT NULL CHECK (counter IN ('available_copies', 'current_loans', 'current_members')),
+    entity_id  INT NOT NULL,
+    PRIMARY KEY (counter, entity_id)
+);
+
+-- touch_counter(counter, id_column): records NEW/OLD.<id_column> under counter.
+-- Already-touched ids are skipped, so a busy book costs one row until the next run.
+CREATE OR REPLACE FUNCTION touch_counter() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO CounterTouch (counter, entity_id)
+        VALUES (TG_ARGV[0], (to_jsonb(NEW) ->> TG_ARGV[1])::INT)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO CounterTouch (counter, entity_id)
+        VALUES (TG_ARGV[0], (to_jsonb(OLD) ->> TG_ARGV[1])::INT)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Book.available_copies = total_copies - open loans - READY holds (copies reserved for pickup)
+DROP TRIGGER IF EXISTS book_touch_available ON Book;
+CREATE TRIGGER book_touch_available AFTER INSERT OR UPDATE OF total_copies, available_copies ON Book
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('available_copies', 'book_id');
+
+DROP TRIGGER IF EXISTS loan_touch_available ON Loan;
+CREATE TRIGGER loan_touch_available AFTER INSERT OR UPDATE OF book_id, return_date OR DELETE ON Loan
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('available_copies', 'book_id');
+
+DROP TRIGGER IF EXISTS hold_touch_available ON Hold;
+CREATE TRIGGER hold_touch_available AFTER INSERT OR UPDATE OF status OR DELETE ON Hold
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('available_copies', 'book_id');
+
+-- Member.current_loans = open loans
+DROP TRIGGER IF EXISTS member_touch_loans ON Member;
+CREATE TRIGGER member_touch_loans AFTER INSERT OR UPDATE OF current_loans ON Member
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('current_loans', 'member_id');
+
+DROP TRIGGER IF EXISTS loan_touch_loans ON Loan;
+CREATE TRIGGER loan_touch_loans AFTER INSERT OR UPDATE OF member_id, return_date OR DELETE ON Loan
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('current_loans', 'member_id');
+
+-- BookClub.current_members = memberships
+DROP TRIGGER IF EXISTS bookclub_touch_members ON BookClub;
+CREATE TRIGGER bookclub_touch_members AFTER INSERT OR UPDATE OF current_members ON BookClub
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('current_members', 'club_id');
+
+DROP TRIGGER IF EXISTS clubmembership_touch_members ON ClubMembership;
+CREATE TRIGGER clubmembership_touch_members AFTER INSERT OR DELETE ON ClubMembership
+    FOR EACH ROW EXECUTE FUNCTION touch_counter('current_members', 'club_id');
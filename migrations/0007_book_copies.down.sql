@@ -0,0 +1,6 @@
+-- 0007_book_copies.down.sql
+
+DROP INDEX IF EXISTS loan_open_copy_idx;
+ALTER TABLE IF EXISTS LoanArchive DROP COLUMN IF EXISTS copy_id;
+ALTER TABLE Loan DROP COLUMN IF EXISTS copy_id;
+DROP TABLE IF EXISTS BookCopy;
@@ -0,0 +1,60 @@
+-- 0007_book_copies.up.sql
+-- Copy-level inventory for barcode checkout/return. Book.total_copies/available_copies stay the counts the catalog reads;
+-- BookCopy tracks where each physical copy is.
+
+CREATE TABLE IF NOT EXISTS BookCopy (
+    copy_id     SERIAL PRIMARY KEY,
+    barcode     VARCHAR(32) NOT NULL,
+    book_id     INT NOT NULL REFERENCES Book(book_id) ON DELETE CASCADE,
+    -- HOLD_SHELF: returned and set aside for the member at the head of the hold queue
+    status      VARCHAR(12) NOT NULL DEFAULT 'AVAILABLE'
+                CHECK (status IN ('AVAILABLE', 'ON_LOAN', 'HOLD_SHELF', 'LOST', 'WITHDRAWN')),
+    branch      VARCHAR(50) NOT NULL DEFAULT 'Main',
+    updated_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Every scan starts here: barcode -> copy (and its book) in one index probe.
+CREATE UNIQUE INDEX IF NOT EXISTS bookcopy_barcode_idx ON BookCopy (barcode);
+
+-- Copies that are not on the shelf are few; shelf-status lookups ("a HOLD_SHELF copy of
+-- book X", "copies on loan at branch Y") stay small and fast.
+CREATE INDEX IF NOT EXISTS bookcopy_status_idx ON BookCopy (book_id, status)
+    WHERE status <> 'AVAILABLE';
+
+-- Which copy each loan is for; NULL on loans made before copies were tracked.
+-- The archive is a column-for-column copy of Loan (loan_partition_manager.py archive).
+ALTER TABLE Loan ADD COLUMN IF NOT EXISTS copy_id INT REFERENCES BookCopy(copy_id);
+ALTER TABLE IF EXISTS LoanArchive ADD COLUMN IF NOT EXISTS copy_id INT;
+
+-- Return-by-scan: the open loan of a copy.
+CREATE INDEX IF NOT EXISTS loan_open_copy_idx ON Loan (copy_id) WHERE return_date IS NULL;
+
+-- Backfill: one copy per Book.total_copies, barcoded <book_id>-<n>. Copies beyond the
+-- available count are marked ON_LOAN and linked to the book's open loans.
+INSERT INTO BookCopy (barcode, book_id, status)
+SELECT b.book_id || '-' || n, b.book_id,
+       CASE WHEN n <= b.available_copies THEN 'AVAILABLE' ELSE 'ON_LOAN' END
+FROM Book b
+CROSS JOIN LATERAL generate_series(1, b.total_copies) AS n
+WHERE NOT EXISTS (SELECT 1 FROM BookCopy c WHERE c.book_id = b.book_id);
+
+UPDATE Loan l
+SET copy_id = pairs.copy_id
+FROM (
+    SELECT ol.loan_id, oc.copy_id
+    FROM (
+        SELECT loan_id, book_id, row_number() OVER (PARTITION BY book_id ORDER BY loan_id) AS n
+        FROM Loan WHERE return_date IS NULL AND copy_id IS NULL
+    ) ol
+    JOIN (
+        SELECT copy_id, book_id, row_number() OVER (PARTITION BY book_id ORDER BY copy_id) AS n
+        FROM BookCopy WHERE status = 'ON_LOAN'
+          AND copy_id NOT IN (SELECT copy_id FROM Loan WHERE return_date IS NULL AND copy_id IS NOT NULL)
+    ) oc ON oc.book_id = ol.book_id AND oc.n = ol.n
+) pairs
+WHERE l.loan_id = pairs.loan_id;
+
+-- Copies counted as neither available nor lent out are the ones reserved by READY holds.
+UPDATE BookCopy c SET status = 'HOLD_SHELF'
+WHERE c.status = 'ON_LOAN'
+  AND NOT EXISTS (SELECT 1 FROM Loan l WHERE l.copy_id = c.copy_id AND l.return_date IS NULL);
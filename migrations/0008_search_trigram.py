@@ -0,0 +1,26 @@
+# 0008_search_trigram.py
+# Trigram indexes for BookDAO.search_books: its title / ISBN / author-list ILIKE '%term%'
+# predicates cannot use a b-tree, so without these every search reads the whole Book table.
+# pg_trgm ships with PostgreSQL's contrib package; where it is not installed this migration
+# records itself as applied without creating anything, and searches keep scanning.
+
+INDEXES = [
+    ("book_title_trgm_idx", "title"),
+    ("book_isbn_trgm_idx", "isbn"),
+    ("book_authors_trgm_idx", "authors_display"),
+]
+
+
+def up(cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm';")
+    if cursor.fetchone() is None:
+        print("    pg_trgm is not available on this server; skipping trigram indexes.")
+        return
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for name, column in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON Book USING gin ({column} gin_trgm_ops);")
+
+
+def down(cursor):
+    for name, _ in INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name};")
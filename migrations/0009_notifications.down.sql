@@ -0,0 +1,3 @@
+-- 0009_notifications.down.sql
+
+DROP TABLE IF EXISTS Notification;
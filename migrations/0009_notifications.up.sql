@@ -0,0 +1,27 @@
+-- 0009_notifications.up.sql
+-- Outbox for due-date reminders and overdue notices (notification_dispatcher.py). One row per
+-- member per nightly run; idempotency_key makes re-running a night a no-op.
+
+CREATE TABLE IF NOT EXISTS Notification (
+    notification_id  BIGSERIAL PRIMARY KEY,
+    -- 'loan-notice:<run date>:<member_id>'; also used as the Message-ID so a resend after a crash
+    -- between SMTP accept and the SENT update can be deduplicated downstream
+    idempotency_key  VARCHAR(100) NOT NULL,
+    member_id        INT NOT NULL REFERENCES Member(member_id) ON DELETE CASCADE,
+    recipient        VARCHAR(100) NOT NULL,
+    -- Everything the templates need: name, due-soon and overdue loans
+    payload          JSONB NOT NULL,
+    status           VARCHAR(10) NOT NULL DEFAULT 'PENDING'
+                     CHECK (status IN ('PENDING', 'SENT', 'FAILED')),
+    attempts         INT NOT NULL DEFAULT 0,
+    -- Lease taken by a dispatcher while the message is in flight; an expired lease is re-sent
+    claimed_until    TIMESTAMP,
+    last_error       TEXT,
+    created_at       TIMESTAMP NOT NULL DEFAULT NOW(),
+    sent_at          TIMESTAMP,
+    CONSTRAINT notification_idempotency_key UNIQUE (idempotency_key)
+);
+
+-- The dispatcher only ever scans the outstanding tail
+CREATE INDEX IF NOT EXISTS notification_pending_idx ON Notification (notification_id) WHERE status = 'PENDING';
+CREATE INDEX IF NOT EXISTS notification_member_idx ON Notification (member_id, created_at);
@@ -0,0 +1,9 @@
+-- 0010_catalog_changes.down.sql
+
+DROP TRIGGER IF EXISTS book_record_tombstone ON Book;
+DROP FUNCTION IF EXISTS book_deleted();
+DROP TABLE IF EXISTS BookTombstone;
+DROP TRIGGER IF EXISTS book_set_updated_at ON Book;
+DROP FUNCTION IF EXISTS book_touch_updated_at();
+DROP INDEX IF EXISTS book_updated_at_idx;
+ALTER TABLE Book DROP COLUMN IF EXISTS updated_at;
@@ -0,0 +1,46 @@
+-- 0010_catalog_changes.up.sql
+-- Change tracking for the offline catalog snapshot (catalog_snapshot.py): kiosks holding a
+-- snapshot fetch only the books changed or deleted since it was taken.
+
+ALTER TABLE Book ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION book_touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only real changes move the timestamp (checkouts do: available_copies is part of the snapshot).
+DROP TRIGGER IF EXISTS book_set_updated_at ON Book;
+CREATE TRIGGER book_set_updated_at BEFORE UPDATE ON Book
+    FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION book_touch_updated_at();
+
+-- Delta fetch: "books changed since T" is a short range scan. Book updates were already
+-- non-HOT (available_copies is in book_catalog_covering_idx), so this adds one index write each.
+CREATE INDEX IF NOT EXISTS book_updated_at_idx ON Book (updated_at);
+
+-- Deleted books leave a tombstone so a delta can remove them from a snapshot.
+-- Tombstones older than the retention window are pruned; a snapshot that old is rebuilt instead.
+CREATE TABLE IF NOT EXISTS BookTombstone (
+    book_id     INT PRIMARY KEY,
+    deleted_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS booktombstone_deleted_at_idx ON BookTombstone (deleted_at);
+
+CREATE OR REPLACE FUNCTION book_deleted() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO BookTombstone (book_id)
+    SELECT book_id FROM old_rows
+    ON CONFLICT (book_id) DO UPDATE SET deleted_at = NOW();
+    DELETE FROM BookTombstone WHERE deleted_at < NOW() - INTERVAL '30 days';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS book_record_tombstone ON Book;
+CREATE TRIGGER book_record_tombstone AFTER DELETE ON Book
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION book_deleted();
@@ -0,0 +1,5 @@
+-- 0011_loan_history.down.sql
+
+DROP INDEX IF EXISTS book_title_by_id_idx;
+CREATE INDEX IF NOT EXISTS loan_member_idx ON Loan (member_id);
+DROP INDEX IF EXISTS loan_member_history_idx;
@@ -0,0 +1,15 @@
+-- 0011_loan_history.up.sql
+-- Member loan history (LoanDAO.get_member_loan_history): keyset pages newest first.
+
+-- One index range per page: member_id = ? AND (loan_date, loan_id) < (?, ?), already in
+-- page order, with every Loan column the page shows INCLUDEd so the scan is index-only.
+CREATE INDEX IF NOT EXISTS loan_member_history_idx ON Loan (member_id, loan_date DESC, loan_id DESC)
+    INCLUDE (book_id, due_date, return_date, fine_amount);
+
+-- Its leading column serves every lookup loan_member_idx did (active loans, reconciliation,
+-- the Member FK), so that index is only write overhead now.
+DROP INDEX IF EXISTS loan_member_idx;
+
+-- The title side of the join: a page probes Book by id; with the title INCLUDEd those probes
+-- are index-only too instead of one heap fetch per loan.
+CREATE INDEX IF NOT EXISTS book_title_by_id_idx ON Book (book_id) INCLUDE (title);
@@ -0,0 +1,8 @@
+-- 0012_book_popularity.down.sql
+
+DROP TRIGGER IF EXISTS loan_count_popularity ON Loan;
+DROP FUNCTION IF EXISTS loan_count_popularity();
+DROP FUNCTION IF EXISTS roll_popularity();
+DROP TABLE IF EXISTS BookPopularity;
+DROP TABLE IF EXISTS BookCheckoutDaily;
+DROP TABLE IF EXISTS PopularityWindow;
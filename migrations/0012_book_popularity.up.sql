@@ -0,0 +1,103 @@
+-- 0012_book_popularity.up.sql
+-- Rolling checkout counts per book for "Popular now" (PopularityDAO.get_top_books).
+-- BookPopularity holds one small row per (window, book borrowed in that window) and is read
+-- top-N straight off an index; the checkout transaction keeps it current through the Loan
+-- trigger below, and roll_popularity() (popularity_roller.py, nightly) takes expired days out.
+
+-- Window lengths; expired_through is the last loan_date already subtracted from the window.
+CREATE TABLE IF NOT EXISTS PopularityWindow (
+    window_name      VARCHAR(10) PRIMARY KEY,
+    days             INT NOT NULL CHECK (days > 0),
+    expired_through  DATE NOT NULL
+);
+
+INSERT INTO PopularityWindow (window_name, days, expired_through) VALUES
+    ('day', 1, CURRENT_DATE - 1),
+    ('week', 7, CURRENT_DATE - 7),
+    ('month', 30, CURRENT_DATE - 30)
+ON CONFLICT (window_name) DO NOTHING;
+
+-- Checkouts per book per day: what a window gives back when a day expires from it.
+CREATE TABLE IF NOT EXISTS BookCheckoutDaily (
+    day        DATE NOT NULL,
+    book_id    INT NOT NULL REFERENCES Book(book_id) ON DELETE CASCADE,
+    checkouts  INT NOT NULL,
+    PRIMARY KEY (day, book_id)
+);
+
+CREATE TABLE IF NOT EXISTS BookPopularity (
+    window_name  VARCHAR(10) NOT NULL REFERENCES PopularityWindow(window_name),
+    book_id      INT NOT NULL REFERENCES Book(book_id) ON DELETE CASCADE,
+    checkouts    INT NOT NULL,
+    PRIMARY KEY (window_name, book_id)
+);
+
+-- Top-N: the first n entries of one window, already in order.
+CREATE INDEX IF NOT EXISTS bookpopularity_top_idx ON BookPopularity (window_name, checkouts DESC, book_id);
+
+-- Statement-level with a transition table: a bulk import of N loans costs two upserts, not 2N.
+CREATE OR REPLACE FUNCTION loan_count_popularity() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO BookCheckoutDaily (day, book_id, checkouts)
+    SELECT loan_date, book_id, COUNT(*) FROM new_rows GROUP BY loan_date, book_id
+    ON CONFLICT (day, book_id) DO UPDATE SET checkouts = BookCheckoutDaily.checkouts + EXCLUDED.checkouts;
+
+    INSERT INTO BookPopularity (window_name, book_id, checkouts)
+    SELECT w.window_name, n.book_id, COUNT(*)
+    FROM new_rows n
+    JOIN PopularityWindow w ON n.loan_date > w.expired_through
+    GROUP BY w.window_name, n.book_id
+    ON CONFLICT (window_name, book_id) DO UPDATE SET checkouts = BookPopularity.checkouts + EXCLUDED.checkouts;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS loan_count_popularity ON Loan;
+CREATE TRIGGER loan_count_popularity AFTER INSERT ON Loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION loan_count_popularity();
+
+-- Subtracts the days that have left each window since the last run; idempotent, so running it
+-- late or twice is harmless. Returns the number of windows rolled forward.
+CREATE OR REPLACE FUNCTION roll_popularity() RETURNS INT AS $$
+DECLARE
+    w RECORD;
+    rolled INT := 0;
+BEGIN
+    FOR w IN SELECT * FROM PopularityWindow ORDER BY window_name FOR UPDATE LOOP
+        CONTINUE WHEN w.expired_through >= CURRENT_DATE - w.days;
+
+        UPDATE BookPopularity p
+        SET checkouts = p.checkouts - d.checkouts
+        FROM (
+            SELECT book_id, SUM(checkouts) AS checkouts
+            FROM BookCheckoutDaily
+            WHERE day > w.expired_through AND day <= CURRENT_DATE - w.days
+            GROUP BY book_id
+        ) d
+        WHERE p.window_name = w.window_name AND p.book_id = d.book_id;
+
+        DELETE FROM BookPopularity WHERE window_name = w.window_name AND checkouts <= 0;
+        UPDATE PopularityWindow SET expired_through = CURRENT_DATE - w.days
+        WHERE window_name = w.window_name;
+        rolled := rolled + 1;
+    END LOOP;
+
+    -- Days every window has given back are no longer needed
+    DELETE FROM BookCheckoutDaily WHERE day <= (SELECT MIN(expired_through) FROM PopularityWindow);
+    RETURN rolled;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the loans still inside the longest window.
+INSERT INTO BookCheckoutDaily (day, book_id, checkouts)
+SELECT loan_date, book_id, COUNT(*) FROM Loan WHERE loan_date > CURRENT_DATE - 30
+GROUP BY loan_date, book_id
+ON CONFLICT (day, book_id) DO NOTHING;
+
+INSERT INTO BookPopularity (window_name, book_id, checkouts)
+SELECT w.window_name, d.book_id, SUM(d.checkouts)
+FROM BookCheckoutDaily d
+JOIN PopularityWindow w ON d.day > w.expired_through
+GROUP BY w.window_name, d.book_id
+ON CONFLICT (window_name, book_id) DO NOTHING;
@@ -0,0 +1,24 @@
+-- 0013_book_weeding.down.sql
+-- The foreign keys come back NOT VALID: loans of already weeded books are kept, new rows are checked.
+
+DO $$
+DECLARE
+    part RECORD;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'loan'::regclass) = 'p' THEN
+        FOR part IN
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'loan'::regclass
+        LOOP
+            EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (book_id) REFERENCES Book(book_id) NOT VALID',
+                           part.relname, part.relname || '_book_fk');
+        END LOOP;
+    ELSE
+        ALTER TABLE Loan ADD CONSTRAINT loan_book_id_fkey
+            FOREIGN KEY (book_id) REFERENCES Book(book_id) NOT VALID;
+        ALTER TABLE Loan ADD CONSTRAINT loan_copy_id_fkey
+            FOREIGN KEY (copy_id) REFERENCES BookCopy(copy_id) NOT VALID;
+    END IF;
+END $$;
+
+DROP TABLE IF EXISTS WeededBook;
@@ -0,0 +1,37 @@
+-- 0013_book_weeding.up.sql
+-- Bulk weeding (BookDAO.weed_books): withdrawn books are deleted in batches and archived here,
+-- while their closed loans stay in the members' history.
+
+-- What a weeded book was, for loan history titles and the weeding report.
+CREATE TABLE IF NOT EXISTS WeededBook (
+    book_id           INT PRIMARY KEY,
+    title             VARCHAR(255) NOT NULL,
+    isbn              VARCHAR(20),
+    publication_year  INT,
+    authors_display   TEXT,
+    weeded_at         TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS weededbook_weeded_at_idx ON WeededBook (weeded_at);
+
+-- Loans outlive the books and copies they name, as archived loans (LoanArchive) already do,
+-- so Loan no longer references Book or BookCopy. New loans still cannot name a missing book:
+-- every checkout, hold pickups included, takes FOR KEY SHARE on the Book row before inserting
+-- the loan (LoanDAO._lock_book), so BookDAO.weed_books' FOR UPDATE either waits for the loan
+-- and then keeps the book, or deletes it first and the checkout finds it gone.
+DO $$
+DECLARE
+    fk RECORD;
+BEGIN
+    FOR fk IN
+        SELECT c.conname, c.conrelid::regclass AS relation
+        FROM pg_constraint c
+        WHERE c.contype = 'f'
+          AND c.conparentid = 0
+          AND c.confrelid IN ('book'::regclass, 'bookcopy'::regclass)
+          AND (c.conrelid = 'loan'::regclass
+               OR c.conrelid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'loan'::regclass))
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.relation, fk.conname);
+    END LOOP;
+END $$;
@@ -0,0 +1,8 @@
+-- 0014_loan_policy.down.sql
+
+ALTER TABLE IF EXISTS LoanArchive DROP COLUMN IF EXISTS renewals;
+ALTER TABLE Loan DROP COLUMN IF EXISTS renewals;
+DROP FUNCTION IF EXISTS loan_policy_for(VARCHAR, VARCHAR);
+DROP TABLE IF EXISTS LoanPolicy;
+ALTER TABLE Book DROP COLUMN IF EXISTS book_type;
+ALTER TABLE Member DROP COLUMN IF EXISTS category;
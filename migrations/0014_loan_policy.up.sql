@@ -0,0 +1,41 @@
+-- 0014_loan_policy.up.sql
+-- Loan rules as data: limits, loan periods, fines and renewals per member category and book type.
+-- Checkout, return, renewal and the nightly fine accrual all resolve them with loan_policy_for().
+
+ALTER TABLE Member ADD COLUMN IF NOT EXISTS category VARCHAR(20) NOT NULL DEFAULT 'ADULT';
+ALTER TABLE Book ADD COLUMN IF NOT EXISTS book_type VARCHAR(20) NOT NULL DEFAULT 'STANDARD';
+
+-- '*' matches any category / book type. A matching row replaces the whole policy, it is not merged.
+CREATE TABLE IF NOT EXISTS LoanPolicy (
+    member_category   VARCHAR(20) NOT NULL,
+    book_type         VARCHAR(20) NOT NULL,
+    max_loans         INT NOT NULL CHECK (max_loans >= 0),
+    loan_period_days  INT NOT NULL CHECK (loan_period_days > 0),
+    daily_fine        NUMERIC(6, 2) NOT NULL DEFAULT 0.50 CHECK (daily_fine >= 0),
+    grace_days        INT NOT NULL DEFAULT 0 CHECK (grace_days >= 0),
+    max_fine          NUMERIC(10, 2) CHECK (max_fine >= 0),  -- NULL means uncapped
+    max_renewals      INT NOT NULL DEFAULT 0 CHECK (max_renewals >= 0),
+    updated_at        TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (member_category, book_type)
+);
+
+-- The '*'/'*' row is the library-wide default: the rules LoanDAO used to hard-code.
+INSERT INTO LoanPolicy (member_category, book_type, max_loans, loan_period_days, daily_fine, grace_days, max_fine, max_renewals)
+VALUES ('*', '*', 3, 7, 0.50, 0, NULL, 0),
+       ('STUDENT', '*', 5, 14, 0.25, 0, 10.00, 1),
+       ('STAFF', '*', 10, 28, 0.50, 0, NULL, 2),
+       ('CHILD', '*', 3, 14, 0.10, 0, 5.00, 1)
+ON CONFLICT (member_category, book_type) DO NOTHING;
+
+-- Most specific row first: exact match, then a rule for the book type (reference, short loan...)
+-- that applies to everyone, then the category's rule, then the default. At most 4 PK probes.
+CREATE OR REPLACE FUNCTION loan_policy_for(category VARCHAR, type VARCHAR) RETURNS LoanPolicy AS $$
+    SELECT * FROM LoanPolicy
+    WHERE member_category IN (category, '*') AND book_type IN (type, '*')
+    ORDER BY book_type = '*', member_category = '*'
+    LIMIT 1;
+$$ LANGUAGE SQL STABLE;
+
+-- Renewals taken so far (LoanDAO.renew_loan). The archive is a column-for-column copy of Loan.
+ALTER TABLE Loan ADD COLUMN IF NOT EXISTS renewals INT NOT NULL DEFAULT 0;
+ALTER TABLE IF EXISTS LoanArchive ADD COLUMN IF NOT EXISTS renewals INT NOT NULL DEFAULT 0;
@@ -0,0 +1,3 @@
+-- 0015_copy_allocation.down.sql
+
+DROP INDEX IF EXISTS bookcopy_available_idx;
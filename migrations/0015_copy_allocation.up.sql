@@ -0,0 +1,5 @@
+-- 0015_copy_allocation.up.sql
+-- Checkouts by book (kiosk, API) lend a physical copy as well (CopyDAO.take_copy): find an
+-- AVAILABLE copy of the book without scanning its shelf. bookcopy_status_idx covers the other statuses.
+
+CREATE INDEX IF NOT EXISTS bookcopy_available_idx ON BookCopy (book_id) WHERE status = 'AVAILABLE';
@@ -0,0 +1,24 @@
+# 0016_archive_history_index.py
+# Member loan history reads LoanArchive as well as Loan. Its member index gains loan_id so archive
+# pages are one index range in (loan_date, loan_id) keyset order, like loan_member_history_idx.
+# LoanArchive only exists once loan_partition_manager.py migrate has run (it then creates this
+# index itself); before that this migration records itself as applied without changing anything.
+
+
+def up(cursor):
+    cursor.execute("SELECT to_regclass('loanarchive') IS NOT NULL;")
+    if not cursor.fetchone()[0]:
+        return
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS loanarchive_member_history_idx
+            ON LoanArchive (member_id, loan_date DESC, loan_id DESC);
+    """)
+    cursor.execute("DROP INDEX IF EXISTS loanarchive_member_idx;")
+
+
+def down(cursor):
+    cursor.execute("SELECT to_regclass('loanarchive') IS NOT NULL;")
+    if not cursor.fetchone()[0]:
+        return
+    cursor.execute("CREATE INDEX IF NOT EXISTS loanarchive_member_idx ON LoanArchive (member_id, loan_date DESC);")
+    cursor.execute("DROP INDEX IF EXISTS loanarchive_member_history_idx;")
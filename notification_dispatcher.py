@@ -0,0 +1,321 @@
+# notification_dispatcher.py
+# Nightly due-date reminders and overdue notices.
+# 1. plan: one set-based INSERT groups every affected member's loans into a Notification row
+#    (idempotent per member per night, see migration 0009).
+# 2. dispatch: pending notifications are claimed in batches, rendered from their stored payload
+#    and sent by `concurrency` asyncio SMTP workers, each holding one connection, with retries.
+# Usage: python notification_dispatcher.py [--date 2026-01-31] [--smtp-host localhost] [--smtp-port 25]
+#                                          [--concurrency 20] [--plan-only | --send-only]
+
+import argparse
+import asyncio
+import datetime
+import time
+from email.message import EmailMessage
+from string import Template
+
+from db_connector import get_db_connector
+
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+# Reminder for loans due this many days after the run date
+DUE_SOON_DAYS = 2
+# Overdue notices go out on these days past the due date (not every night)
+OVERDUE_NOTICE_DAYS = (1, 7, 14, 28)
+# Runs (nights) a notification is retried before it is marked FAILED
+MAX_ATTEMPTS = 5
+# Send attempts within one run for transient SMTP errors, with exponential backoff
+RETRIES_PER_RUN = 3
+RETRY_BACKOFF_SECONDS = 0.5
+CLAIM_LEASE = '10 minutes'
+
+SMTP_CONFIG = {
+    "host": "localhost",
+    "port": 25,
+    "username": None,
+    "password": None,
+    "start_tls": None,  # None: STARTTLS if the server offers it
+    "sender": "SmartLibrary <noreply@smartlibrary.local>",
+    "message_id_domain": "smartlibrary.local"
+}
+
+DUE_SOON_LINE = Template("  - $title (due $due_date)")
+OVERDUE_LINE = Template("  - $title (due $due_date, $days_overdue day(s) overdue, fine so far $$$fine)")
+MESSAGE_BODY = Template("""Hello $first_name,
+
+$sections
+You can return books at any SmartLibrary loan desk. Fines stop growing on the day a book comes back.
+
+SmartLibrary
+""")
+
+
+def render_message(notification, sender=None):
+    """Builds the EmailMessage for one claimed notification from its stored payload."""
+    payload = notification['payload']
+    sections = []
+    if payload['overdue']:
+        lines = [OVERDUE_LINE.substitute(title=loan['title'], due_date=loan['due_date'],
+                                         days_overdue=loan['days_overdue'], fine=f"{loan['fine']:.2f}")
+                 for loan in payload['overdue']]
+        sections.append("These books are overdue:\n" + "\n".join(lines) + "\n")
+    if payload['due_soon']:
+        lines = [DUE_SOON_LINE.substitute(title=loan['title'], due_date=loan['due_date'])
+                 for loan in payload['due_soon']]
+        sections.append(f"These books are due in {DUE_SOON_DAYS} days:\n" + "\n".join(lines) + "\n")
+
+    message = EmailMessage()
+    message['From'] = sender or SMTP_CONFIG['sender']
+    message['To'] = notification['recipient']
+    message['Subject'] = ("Overdue books on your SmartLibrary account" if payload['overdue']
+                          else f"Reminder: books due in {DUE_SOON_DAYS} days")
+    # Same key, same Message-ID: lets mail systems drop a resend after a crash mid-batch
+    message['Message-ID'] = (f"<{notification['idempotency_key'].replace(':', '.')}"
+                             f"@{SMTP_CONFIG['message_id_domain']}>")
+    message.set_content(MESSAGE_BODY.substitute(first_name=payload['first_name'], sections="\n".join(sections)))
+    return message
+
+
+class NotificationDispatcher:
+    """Plans the night's notices in one query and sends them over a bounded pool of SMTP connections."""
+
+    def __init__(self, concurrency=20, batch_size=1000, smtp_config=None):
+        self.db_connector = get_db_connector()
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.smtp_config = dict(SMTP_CONFIG, **(smtp_config or {}))
+
+    # --- Planning ---
+
+    def plan(self, run_date=None):
+        """Queues one notification per member with a loan due in DUE_SOON_DAYS or reaching an
+        OVERDUE_NOTICE_DAYS mark; it lists all of that member's due-soon and overdue loans.
+        Members without an email address are skipped. Returns the number of new notifications."""
+        run_date = run_date or datetime.date.today()
+        due_soon = run_date + datetime.timedelta(days=DUE_SOON_DAYS)
+        trigger_dates = [due_soon] + [run_date - datetime.timedelta(days=d) for d in OVERDUE_NOTICE_DAYS]
+
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    WITH triggered AS (
+                        SELECT DISTINCT member_id FROM Loan
+                        WHERE return_date IS NULL AND due_date = ANY(%(trigger_dates)s::date[])
+                    )
+                    INSERT INTO Notification (idempotency_key, member_id, recipient, payload)
+                    SELECT 'loan-notice:' || %(run_date)s::date || ':' || u.user_id, u.user_id, u.email,
+                        json_build_object(
+                            'first_name', u.first_name,
+                            'due_soon', COALESCE(json_agg(json_build_object(
+                                    'title', b.title, 'due_date', l.due_date) ORDER BY b.title)
+                                FILTER (WHERE l.due_date = %(due_soon)s), '[]'),
+                            'overdue', COALESCE(json_agg(json_build_object(
+                                    'title', b.title, 'due_date', l.due_date,
+                                    'days_overdue', %(run_date)s::date - l.due_date,
+                                    'fine', COALESCE(a.accrued_amount, 0)) ORDER BY l.due_date)
+                                FILTER (WHERE l.due_date < %(run_date)s), '[]'))
+                    FROM triggered t
+                    JOIN "User" u ON u.user_id = t.member_id
+                    JOIN Loan l ON l.member_id = t.member_id AND l.return_date IS NULL
+                        AND (l.due_date = %(due_soon)s OR l.due_date < %(run_date)s)
+                    JOIN Book b ON b.book_id = l.book_id
+                    LEFT JOIN LoanFineAccrual a ON a.loan_id = l.loan_id
+                    WHERE u.email IS NOT NULL AND u.email <> ''
+                    GROUP BY u.user_id, u.email, u.first_name
+                    ON CONFLICT ON CONSTRAINT notification_idempotency_key DO NOTHING;
+                """, {'run_date': run_date, 'due_soon': due_soon, 'trigger_dates': trigger_dates})
+                queued = cursor.rowcount
+                conn.commit()
+                return queued
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    # --- Outbox ---
+
+    def _claim_batch(self, after_id=0):
+        """Leases the next batch of pending notifications above after_id (safe with several
+        dispatchers running)."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    UPDATE Notification n SET claimed_until = NOW() + INTERVAL '{CLAIM_LEASE}'
+                    FROM (
+                        SELECT notification_id FROM Notification
+                        WHERE status = 'PENDING' AND (claimed_until IS NULL OR claimed_until < NOW())
+                          AND notification_id > %s
+                        ORDER BY notification_id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    ) c
+                    WHERE n.notification_id = c.notification_id
+                    RETURNING n.notification_id, n.idempotency_key, n.recipient, n.payload;
+                """, (after_id, self.batch_size))
+                batch = [{'notification_id': record[0], 'idempotency_key': record[1],
+                          'recipient': record[2], 'payload': record[3]} for record in cursor.fetchall()]
+                conn.commit()
+                return batch
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def _record_results(self, results):
+        """Writes (notification_id, status, error) outcomes back in one statement."""
+        if not results:
+            return
+        ids, statuses, errors = (list(column) for column in zip(*results))
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # A transient failure stays PENDING for the next run until MAX_ATTEMPTS is reached
+                cursor.execute("""
+                    UPDATE Notification n SET
+                        status = CASE WHEN r.status = 'PENDING' AND n.attempts + 1 >= %s THEN 'FAILED'
+                                      ELSE r.status END,
+                        attempts = n.attempts + 1,
+                        last_error = r.error,
+                        sent_at = CASE WHEN r.status = 'SENT' THEN NOW() END,
+                        claimed_until = NULL
+                    FROM unnest(%s::bigint[], %s::text[], %s::text[]) AS r(notification_id, status, error)
+                    WHERE n.notification_id = r.notification_id;
+                """, (MAX_ATTEMPTS, ids, statuses, errors))
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    # --- Sending ---
+
+    async def _connect(self):
+        config = self.smtp_config
+        client = aiosmtplib.SMTP(hostname=config['host'], port=config['port'], start_tls=config['start_tls'])
+        await client.connect()
+        if config['username']:
+            await client.login(config['username'], config['password'])
+        return client
+
+    async def _send(self, client, message):
+        """Sends one message, reconnecting and backing off on transient errors.
+        Returns (client, status, error); status is SENT, FAILED (permanent) or PENDING (retry later)."""
+        error = None
+        for attempt in range(RETRIES_PER_RUN):
+            try:
+                if client is None or not client.is_connected:
+                    client = await self._connect()
+                await client.send_message(message)
+                return client, 'SENT', None
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                return client, 'FAILED', str(e)
+            except aiosmtplib.SMTPResponseException as e:
+                # 5xx is permanent (bad address, rejected content); 4xx is worth retrying
+                if e.code >= 500:
+                    return client, 'FAILED', f"{e.code} {e.message}"
+                error = f"{e.code} {e.message}"
+            except (aiosmtplib.SMTPException, OSError) as e:
+                error = str(e) or type(e).__name__
+                client = None
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+        return client, 'PENDING', error
+
+    async def _worker(self, queue, results):
+        client = None
+        try:
+            while True:
+                notification = await queue.get()
+                try:
+                    if notification is None:
+                        return
+                    client, status, error = await self._send(
+                        client, render_message(notification, self.smtp_config['sender']))
+                    results.append((notification['notification_id'], status, error))
+                finally:
+                    queue.task_done()
+        finally:
+            if client is not None and client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+    async def dispatch(self):
+        """Sends every pending notification. Returns a summary dict."""
+        if aiosmtplib is None:
+            raise Exception("Sending notifications requires aiosmtplib (pip install aiosmtplib).")
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        # Bounded: claiming runs at most one batch ahead of the senders
+        queue = asyncio.Queue(maxsize=self.batch_size)
+        results = []
+        counts = {'SENT': 0, 'FAILED': 0, 'PENDING': 0}
+        workers = [asyncio.create_task(self._worker(queue, results)) for _ in range(self.concurrency)]
+
+        async def flush():
+            done = results[:]
+            del results[:]
+            for _, status, _ in done:
+                counts[status] += 1
+            await loop.run_in_executor(None, self._record_results, done)
+
+        try:
+            # Keyset over the outbox: what fails transiently in this run waits for the next run
+            last_id = 0
+            while True:
+                batch = await loop.run_in_executor(None, self._claim_batch, last_id)
+                if not batch:
+                    break
+                last_id = max(notification['notification_id'] for notification in batch)
+                for notification in batch:
+                    await queue.put(notification)
+                await flush()
+            await queue.join()
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+            await flush()
+
+        elapsed = time.perf_counter() - started
+        return {'sent': counts['SENT'], 'failed': counts['FAILED'], 'retry_later': counts['PENDING'],
+                'seconds': round(elapsed, 2),
+                'per_second': round(counts['SENT'] / elapsed, 1) if elapsed else 0.0}
+
+    def run(self, run_date=None):
+        """Plans tonight's notices, then sends everything pending. Returns (queued, summary)."""
+        queued = self.plan(run_date)
+        return queued, asyncio.run(self.dispatch())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Send due-date reminders and overdue notices.")
+    parser.add_argument('--date', type=datetime.date.fromisoformat, default=None,
+                        help="Run date (default today).")
+    parser.add_argument('--smtp-host', default=SMTP_CONFIG['host'])
+    parser.add_argument('--smtp-port', type=int, default=SMTP_CONFIG['port'])
+    parser.add_argument('--concurrency', type=int, default=20, help="Parallel SMTP connections.")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--plan-only', action='store_true', help="Queue notifications without sending.")
+    mode.add_argument('--send-only', action='store_true', help="Send what is already queued.")
+    args = parser.parse_args()
+
+    dispatcher = NotificationDispatcher(args.concurrency, args.batch_size,
+                                        {'host': args.smtp_host, 'port': args.smtp_port})
+    try:
+        if not args.send_only:
+            print(f"Queued {dispatcher.plan(args.date)} new notification(s).")
+        if not args.plan_only:
+            print(asyncio.run(dispatcher.dispatch()))
+    finally:
+        get_db_connector().close_connection()
@@ -0,0 +1,122 @@
+# password_rehash.py
+# One-off migration of "User".password from plain text to bcrypt hashes (see password_utility.py).
+# Usage: python password_rehash.py [--workers N] [--rounds 12] [--batch-size 16]
+# Resumable: only passwords that are not hashed yet are read, and every batch commits on its own,
+# so an interrupted run loses at most the batches in flight. Run it again to finish.
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from psycopg2.extras import execute_values
+
+from db_connector import get_db_connector
+from password_utility import DEFAULT_ROUNDS, hash_passwords, plaintext_condition
+
+
+class PasswordRehasher:
+    """Streams plaintext passwords, bcrypt-hashes them in worker processes and writes the hashes back."""
+
+    def __init__(self, workers=None, rounds=DEFAULT_ROUNDS, batch_size=16):
+        self.db_connector = get_db_connector()
+        self.workers = workers or os.cpu_count() or 1
+        self.rounds = rounds
+        self.batch_size = batch_size
+
+    def run(self):
+        """Hashes every plaintext password. Returns a summary dict."""
+        started = time.perf_counter()
+        hashed = 0
+        updated = 0
+
+        # bcrypt is CPU-bound: one process per core scales whether or not the installed bcrypt
+        # build releases the GIL, and leaves this process free to stream and write.
+        # 'spawn' workers start clean instead of inheriting (and later closing) pooled connections.
+        executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        reader = self.db_connector.get_connection()
+        writer = self.db_connector.get_connection()
+        try:
+            # Server-side cursor: users arrive batch_size at a time instead of all at once
+            with reader.cursor(name='password_rehash_cursor') as stream, writer.cursor() as cursor:
+                stream.itersize = self.batch_size
+                # The same prefixes login treats as hashed (password_utility.is_hashed)
+                stream.execute(f"""
+                    SELECT user_id, password FROM "User"
+                    WHERE {plaintext_condition()}
+                    ORDER BY user_id;
+                """)
+
+                pending = set()
+                exhausted = False
+                while pending or not exhausted:
+                    # Keep every worker busy with one batch queued behind it, and no more in memory
+                    while not exhausted and len(pending) < 2 * self.workers:
+                        rows = stream.fetchmany(self.batch_size)
+                        if rows:
+                            pending.add(executor.submit(hash_passwords, rows, self.rounds))
+                        else:
+                            exhausted = True
+                    if not pending:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results = future.result()
+                        # Only where the plaintext is unchanged: a password reset mid-run is not overwritten
+                        execute_values(cursor, """
+                            UPDATE "User" u SET password = v.hash
+                            FROM (VALUES %s) AS v(user_id, old_password, hash)
+                            WHERE u.user_id = v.user_id AND u.password = v.old_password;
+                        """, results, page_size=len(results))
+                        writer.commit()
+                        hashed += len(results)
+                        updated += cursor.rowcount
+            reader.rollback()
+            executor.shutdown()
+        except BaseException as e:
+            # Including KeyboardInterrupt: committed batches stay, the next run picks up the rest
+            executor.shutdown(wait=False, cancel_futures=True)
+            reader.rollback()
+            writer.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(reader)
+            self.db_connector.putconn(writer)
+
+        seconds = time.perf_counter() - started
+        rate = hashed / seconds if seconds else 0.0
+        return {
+            'hashed': hashed,
+            'updated': updated,
+            'skipped': hashed - updated,
+            'seconds': seconds,
+            'hashes_per_second': rate,
+            'hashes_per_second_per_core': rate / self.workers,
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replace plaintext passwords with bcrypt hashes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Hashing processes (default: one per core).")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="bcrypt cost factor.")
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help="Users per worker task and per UPDATE.")
+    args = parser.parse_args()
+
+    rehasher = PasswordRehasher(args.workers, args.rounds, args.batch_size)
+    try:
+        summary = rehasher.run()
+        print(f"--- Password rehash complete ({rehasher.workers} worker(s), cost {args.rounds}) ---")
+        print(f"Passwords hashed:      {summary['hashed']}")
+        print(f"Users updated:         {summary['updated']}")
+        print(f"Skipped (changed):     {summary['skipped']}")
+        print(f"Elapsed:               {summary['seconds']:.2f} s")
+        print(f"Throughput:            {summary['hashes_per_second']:.1f} hashes/s "
+              f"({summary['hashes_per_second_per_core']:.1f} per core)")
+    except KeyboardInterrupt:
+        print("Interrupted. Finished batches are saved; run again to hash the rest.")
+    finally:
+        get_db_connector().close_connection()
@@ -1,20 +1,52 @@
 # password_utility.py
 import bcrypt
+import hmac
 import sys
 
+# bcrypt cost factor: each +1 doubles the time per hash (and per login check)
+DEFAULT_ROUNDS = 12
 
-def generate_hash(password):
+# Stored values starting with one of these are bcrypt hashes; anything else is a not yet migrated plaintext
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+
+def generate_hash(password, rounds=DEFAULT_ROUNDS):
     """Generates a bcrypt hash for a given plaintext password."""
     # Encode the password to bytes
     encoded_password = password.encode('utf-8')
 
     # Generate the salt and hash the password
     # The 'gensalt()' function handles generating a secure, random salt.
-    hashed_password = bcrypt.hashpw(encoded_password, bcrypt.gensalt()).decode('utf-8')
+    hashed_password = bcrypt.hashpw(encoded_password, bcrypt.gensalt(rounds)).decode('utf-8')
 
     return hashed_password
 
 
+def is_hashed(stored_password):
+    return stored_password.startswith(BCRYPT_PREFIXES)
+
+
+def plaintext_condition(column='password'):
+    """SQL condition that is true where column holds a plaintext password: the negation of is_hashed()."""
+    prefixes = ", ".join(f"'{prefix}'" for prefix in BCRYPT_PREFIXES)
+    return f"left({column}, 4) NOT IN ({prefixes})"
+
+
+def check_password(password, stored_password):
+    """True if password matches the stored bcrypt hash (or the stored plaintext, for users not yet rehashed)."""
+    if is_hashed(stored_password):
+        return bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8'))
+    return hmac.compare_digest(password.encode('utf-8'), stored_password.encode('utf-8'))
+
+
+def hash_passwords(rows, rounds=DEFAULT_ROUNDS):
+    """Hashes (user_id, plaintext) rows. Returns (user_id, plaintext, hash) rows.
+
+    Module-level so password_rehash.py can run it in worker processes.
+    """
+    return [(user_id, password, generate_hash(password, rounds)) for user_id, password in rows]
+
+
 if __name__ == '__main__':
     # Usage: python password_utility.py <username> <base_password>
     if len(sys.argv) != 3:
@@ -35,4 +67,5 @@ if __name__ == '__main__':
     print(f"Target Username: {username}")
     print(f"Full Password:   {full_password}")
     print(f"Bcrypt Hash:     {hash_output}")
-    print("\n>>> COPY THIS HASH STRING AND PASTE IT INTO THE SQL SCRIPT. <<<")
\ No newline at end of file
+    print("\n>>> COPY THIS HASH STRING AND PASTE IT INTO THE SQL SCRIPT. <<<")
+    print("    (To hash every existing password at once, run password_rehash.py.)")
\ No newline at end of file
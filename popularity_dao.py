@@ -0,0 +1,61 @@
+# popularity_dao.py
+
+import psycopg2
+from db_connector import get_db_connector
+from library_errors import BusinessRuleError
+from records import PopularBookRecord, intern_text
+
+# Rolling windows (days) tracked in BookPopularity; must match PopularityWindow (migration 0012)
+POPULARITY_WINDOWS = {'day': 1, 'week': 7, 'month': 30}
+
+
+class PopularityDAO:
+    """Data Access Object for the rolling per-book checkout counters ("Popular now")."""
+
+    def __init__(self):
+        self.db_connector = get_db_connector()
+
+    def get_top_books(self, window='week', n=10):
+        """Fetches the n most borrowed books of the last day, week or month, most borrowed first."""
+        if window not in POPULARITY_WINDOWS:
+            raise BusinessRuleError(f"Unknown popularity window '{window}'. Use one of: {', '.join(POPULARITY_WINDOWS)}.")
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # The first n entries of bookpopularity_top_idx, then n Book lookups by primary key
+                query = """
+                    SELECT p.book_id, b.title, b.authors_display, b.available_copies, p.checkouts
+                    FROM (
+                        SELECT book_id, checkouts FROM BookPopularity
+                        WHERE window_name = %s
+                        ORDER BY checkouts DESC, book_id
+                        LIMIT %s
+                    ) p
+                    JOIN Book b ON b.book_id = p.book_id
+                    ORDER BY p.checkouts DESC, p.book_id;
+                """
+                cursor.execute(query, (window, n))
+                return [PopularBookRecord(record[0], record[1],
+                                          intern_text(record[2]) if record[2] else "N/A",
+                                          record[3], record[4])
+                        for record in cursor.fetchall()]
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
+
+    def roll_windows(self):
+        """Takes the days that have aged out of each window off its counters. Returns windows rolled."""
+        conn = self.db_connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT roll_popularity();")
+                rolled = cursor.fetchone()[0]
+                conn.commit()
+                return rolled
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            self.db_connector.putconn(conn)
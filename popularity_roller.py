@@ -0,0 +1,41 @@
+# popularity_roller.py
+# Nightly job that ages expired days out of the rolling popularity windows (day/week/month).
+# Checkouts are counted as they happen (migration 0012); this only subtracts. Safe to run late,
+# twice, or more often than daily.
+# Usage: python popularity_roller.py [--interval SECONDS] [--show 10]
+
+import argparse
+import time
+
+from popularity_dao import PopularityDAO, POPULARITY_WINDOWS
+from db_connector import get_db_connector
+
+
+def run_roll(popularity_dao, show):
+    """Rolls the windows and prints the current leaders of each."""
+    rolled = popularity_dao.roll_windows()
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Rolled {rolled} popularity window(s) forward.")
+    for window in POPULARITY_WINDOWS if show else ():
+        leaders = popularity_dao.get_top_books(window, show)
+        print(f"  Top {window}: " + ("; ".join(f"{book['title']} ({book['checkouts']})" for book in leaders)
+                                     or "no checkouts"))
+    return rolled
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Roll the popularity windows forward.")
+    parser.add_argument('--interval', type=int, default=0,
+                        help="Repeat every N seconds (default: run once and exit).")
+    parser.add_argument('--show', type=int, default=0, help="Also print the top N of each window.")
+    args = parser.parse_args()
+
+    popularity_dao = PopularityDAO()
+    try:
+        run_roll(popularity_dao, args.show)
+        while args.interval > 0:
+            time.sleep(args.interval)
+            run_roll(popularity_dao, args.show)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        get_db_connector().close_connection()
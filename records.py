@@ -0,0 +1,112 @@
+# records.py
+# Compact row objects returned by the DAOs. Each class stores its columns in __slots__
+# (no per-row __dict__ or repeated key strings) but still reads like the dicts the widgets
+# were written against: record['title'], record.get('authors', ''), dict(record).
+
+import sys
+
+
+class Record:
+    """Base class for slotted DAO rows with a read-mostly dict-compatible interface."""
+
+    __slots__ = ()
+
+    def __init__(self, *values, **named):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+        for field in self.__slots__[len(values):]:
+            setattr(self, field, named.get(field))
+
+    # --- dict compatibility ---
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.__slots__]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self):
+        # Hashable like the tuples the DAOs returned before; changing a field of a record
+        # that is already in a set or used as a dict key changes its hash
+        return hash((type(self), tuple(self.values())))
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def intern_text(value):
+    """Interns short repeated strings (author lists, names) so identical values share one object."""
+    return sys.intern(value) if value else value
+
+
+class BookRecord(Record):
+    __slots__ = ('book_id', 'title', 'isbn', 'year', 'total_copies', 'available_copies', 'authors')
+
+
+class MemberRecord(Record):
+    __slots__ = ('id', 'first_name', 'last_name', 'username', 'current_loans', 'category')
+
+
+class ClubRecord(Record):
+    __slots__ = ('club_id', 'name', 'description', 'max_members', 'current_members')
+
+
+class ActiveLoanRecord(Record):
+    __slots__ = ('loan_id', 'book_title', 'member_username', 'loan_date', 'due_date')
+
+
+class OverdueLoanRecord(Record):
+    __slots__ = ('loan_id', 'title', 'first_name', 'last_name', 'member_id', 'due_date', 'days_overdue')
+
+
+class LoanHistoryRecord(Record):
+    __slots__ = ('loan_id', 'book_id', 'title', 'loan_date', 'due_date', 'return_date', 'fine_amount')
+
+
+class PopularBookRecord(Record):
+    __slots__ = ('book_id', 'title', 'authors', 'available_copies', 'checkouts')
+
+
+class WeedResultRecord(Record):
+    __slots__ = ('book_id', 'title', 'status', 'active_loans')
+
+
+class LoanPolicyRecord(Record):
+    __slots__ = ('member_category', 'book_type', 'max_loans', 'loan_period_days',
+                 'daily_fine', 'grace_days', 'max_fine', 'max_renewals')
@@ -0,0 +1,71 @@
+# scan_processor.py
+# Barcode scanning pipeline for the loan desk: scans are queued the moment Enter arrives and
+# processed in order on one worker thread, so the input box never waits for the database.
+
+import queue
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+CHECKOUT = 'checkout'
+RETURN = 'return'
+
+
+class ScanProcessor(QObject):
+    """Runs queued checkout/return scans against LoanDAO on a background thread.
+
+    Signals (delivered on the GUI thread): scan_queued(seq, barcode) as soon as a scan is accepted,
+    checkout_done(seq, barcode, loan_record, ms), return_done(seq, barcode, result_dict, ms) and
+    scan_failed(seq, barcode, message) once it has been processed.
+    """
+
+    scan_queued = Signal(int, str)
+    checkout_done = Signal(int, str, object, float)
+    return_done = Signal(int, str, object, float)
+    scan_failed = Signal(int, str, str)
+
+    def __init__(self, loan_dao, parent=None):
+        super().__init__(parent)
+        self.loan_dao = loan_dao
+        self.scans = queue.Queue()
+        self.sequence = 0
+        self.worker = None
+
+    def submit(self, barcode, mode, member_id=None):
+        """Queues one scan. Returns its sequence number."""
+        if self.worker is None:
+            # Scans are applied strictly in order: a patron's loan limit depends on the ones before.
+            # So there is only ever this one worker; it lives until stop().
+            self.worker = threading.Thread(target=self._run, name="scan-worker", daemon=True)
+            self.worker.start()
+        self.sequence += 1
+        self.scans.put((self.sequence, barcode, mode, member_id))
+        self.scan_queued.emit(self.sequence, barcode)
+        return self.sequence
+
+    def pending(self):
+        return self.scans.qsize()
+
+    def stop(self, timeout=10):
+        """At application exit: applies the scans still queued, then ends the worker."""
+        if self.worker is not None:
+            self.scans.put(None)
+            self.worker.join(timeout)
+
+    def _run(self):
+        while True:
+            scan = self.scans.get()
+            if scan is None:
+                return
+            seq, barcode, mode, member_id = scan
+            start = time.perf_counter()
+            try:
+                if mode == CHECKOUT:
+                    loan = self.loan_dao.process_copy_checkout(barcode, member_id)
+                    self.checkout_done.emit(seq, barcode, loan, (time.perf_counter() - start) * 1000)
+                else:
+                    result = self.loan_dao.process_copy_return(barcode)
+                    self.return_done.emit(seq, barcode, result, (time.perf_counter() - start) * 1000)
+            except Exception as e:
+                self.scan_failed.emit(seq, barcode, str(e))
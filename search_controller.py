@@ -0,0 +1,250 @@
+# search_controller.py
+# Search-as-you-type for the catalog tables: debounced, cancellable, cached and streamed.
+
+import threading
+import time
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QStringListModel, QThreadPool, QTimer, Signal, Qt
+from PySide6.QtWidgets import QCompleter
+
+from book_dao import BookDAO
+from autocomplete_index import get_autocomplete_index, search_term
+
+DEBOUNCE_MS = 250          # Wait this long after the last keystroke before querying
+MIN_PREFIX_LENGTH = 2      # Shorter terms are not searched live
+CACHE_ENTRIES = 32         # Recent complete result sets kept for local narrowing
+CACHE_MAX_ROWS = 5000      # Larger result sets are not worth keeping
+CACHE_TTL_SECONDS = 60     # Availability counts go stale; re-query after this
+STREAM_BATCH_SIZE = 200
+QUERY_TIMEOUT_MS = 5000
+
+
+def book_matches(book, term):
+    """Python mirror of the search_books predicate (title/author ILIKE, ISBN LIKE)."""
+    lowered = term.lower()
+    return (lowered in (book.get('title') or '').lower()
+            or term in (book.get('isbn') or '')
+            or lowered in (book.get('authors') or '').lower())
+
+
+class _SearchSignals(QObject):
+    batch_ready = Signal(int, list)
+    finished = Signal(int, int)
+    failed = Signal(int, str)
+
+
+class _SearchTask(QRunnable):
+    """Runs one streaming search on the thread pool."""
+
+    def __init__(self, controller, generation, term):
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.term = term
+        self.signals = controller.task_signals
+        self.rows = []
+
+    def run(self):
+        def on_batch(books):
+            if self.generation != self.controller.generation:
+                return False  # superseded by a newer keystroke
+            self.rows.extend(books)
+            self.signals.batch_ready.emit(self.generation, books)
+            return True
+
+        try:
+            total = self.controller.book_dao.stream_search_books(
+                self.term, on_batch, STREAM_BATCH_SIZE, QUERY_TIMEOUT_MS,
+                on_connection=lambda conn: self.controller.set_active_connection(self.generation, conn)
+            )
+            if self.generation == self.controller.generation:
+                self.controller.remember(self.term, self.rows)
+                self.signals.finished.emit(self.generation, total)
+        except Exception as e:
+            # A cancelled query raises QueryCanceled; only report errors for the current search
+            if self.generation == self.controller.generation:
+                self.signals.failed.emit(self.generation, str(e))
+
+
+class SearchController(QObject):
+    """Turns keystrokes in a search box into at most one in-flight catalog query.
+
+    Signals: search_started(term) before results for a new term arrive, results_batch(books)
+    for each streamed batch, search_finished(term, total, explicit) at the end, search_failed(message),
+    and search_cleared() when the box is emptied.
+    """
+
+    search_started = Signal(str)
+    results_batch = Signal(list)
+    search_finished = Signal(str, int, bool)
+    search_failed = Signal(str)
+    search_cleared = Signal()
+
+    def __init__(self, parent=None, book_dao=None):
+        super().__init__(parent)
+        self.book_dao = book_dao or BookDAO()
+        self.generation = 0
+        self.current_term = ''
+        self.running_term = ''
+        self.explicit = False
+        self.cache = OrderedDict()  # term -> (cached_at, complete result list)
+        self.active_connection = None
+        self.active_generation = None
+        self.connection_lock = threading.Lock()
+
+        self.task_signals = _SearchSignals()
+        self.task_signals.batch_ready.connect(self._on_batch)
+        self.task_signals.finished.connect(self._on_finished)
+        self.task_signals.failed.connect(self._on_failed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(lambda: self._start(self.current_term, explicit=False))
+
+    # --- Entry points ---
+
+    def text_edited(self, text):
+        """Slot for QLineEdit.textEdited: restarts the debounce window."""
+        term = text.strip()
+        self.current_term = term
+        if not term:
+            self.debounce_timer.stop()
+            self.cancel_in_flight()
+            self.search_cleared.emit()
+        elif len(term) >= MIN_PREFIX_LENGTH:
+            self.debounce_timer.start()
+        else:
+            self.debounce_timer.stop()
+
+    def search_now(self, text):
+        """Immediate search (Enter or the Search button), ignoring the debounce and minimum length."""
+        term = text.strip()
+        self.current_term = term
+        self.debounce_timer.stop()
+        if not term:
+            self.cancel_in_flight()
+            self.search_cleared.emit()
+            return
+        self._start(term, explicit=True)
+
+    # --- Query lifecycle ---
+
+    def _start(self, term, explicit):
+        self.cancel_in_flight()
+        self.generation += 1
+        self.running_term = term
+        self.explicit = explicit
+        self.search_started.emit(term)
+
+        cached = self._narrow_from_cache(term)
+        if cached is not None:
+            self.results_batch.emit(cached)
+            self.search_finished.emit(term, len(cached), explicit)
+            return
+
+        QThreadPool.globalInstance().start(_SearchTask(self, self.generation, term))
+
+    def cancel_in_flight(self):
+        """Cancels the running query on the server, if any; its late batches are then ignored."""
+        self.generation += 1
+        with self.connection_lock:
+            if self.active_connection is not None:
+                self.active_connection.cancel()
+
+    def set_active_connection(self, generation, conn):
+        """Called from the worker when its query acquires (conn) or releases (None) a connection."""
+        with self.connection_lock:
+            if conn is None:
+                if self.active_generation == generation:
+                    self.active_connection = None
+                    self.active_generation = None
+                return
+            self.active_connection = conn
+            self.active_generation = generation
+            # Superseded before the query even started
+            if generation != self.generation:
+                conn.cancel()
+
+    # --- Cache ---
+
+    def remember(self, term, rows):
+        if len(rows) > CACHE_MAX_ROWS:
+            return
+        with self.connection_lock:
+            self.cache[term.lower()] = (time.monotonic(), list(rows))
+            self.cache.move_to_end(term.lower())
+            while len(self.cache) > CACHE_ENTRIES:
+                self.cache.popitem(last=False)
+
+    def invalidate_cache(self):
+        """Drops cached results, e.g. after books are added or deleted."""
+        with self.connection_lock:
+            self.cache.clear()
+
+    def _narrow_from_cache(self, term):
+        """Answers from the longest cached prefix of term: its results are a superset of term's."""
+        lowered = term.lower()
+        oldest_allowed = time.monotonic() - CACHE_TTL_SECONDS
+        with self.connection_lock:
+            for length in range(len(lowered), 0, -1):
+                entry = self.cache.get(lowered[:length])
+                if entry is not None and entry[0] >= oldest_allowed:
+                    self.cache.move_to_end(lowered[:length])
+                    rows = entry[1]
+                    break
+            else:
+                return None
+        if length == len(lowered):
+            return list(rows)
+        return [book for book in rows if book_matches(book, term)]
+
+    # --- Worker signal relays (GUI thread) ---
+
+    def _on_batch(self, generation, books):
+        if generation == self.generation:
+            self.results_batch.emit(books)
+
+    def _on_finished(self, generation, total):
+        if generation == self.generation:
+            self.search_finished.emit(self.running_term, total, self.explicit)
+
+    def _on_failed(self, generation, message):
+        if generation == self.generation:
+            self.search_failed.emit(message)
+
+
+
+class SuggestionCompleter(QCompleter):
+    """Autocomplete dropdown for a search box, answered from the in-memory index (no query).
+
+    Choosing a suggestion runs the search for it immediately. Until the shared index has been built
+    (see main.py) the box simply shows no suggestions.
+    """
+
+    def __init__(self, line_edit, search_controller):
+        self.model = QStringListModel()
+        super().__init__(self.model, line_edit)
+        self.line_edit = line_edit
+        self.search_controller = search_controller
+        # The index already ranks and filters; show its list as is
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self.update_suggestions)
+        self.activated.connect(self.choose)
+
+    def update_suggestions(self, text):
+        index = get_autocomplete_index(wait=False)
+        suggestions = index.suggest(text) if index is not None and text.strip() else []
+        self.model.setStringList(suggestions)
+        if suggestions:
+            self.complete()
+        else:
+            self.popup().hide()
+
+    def choose(self, suggestion):
+        term = search_term(suggestion)
+        self.line_edit.setText(term)
+        self.search_controller.search_now(term)
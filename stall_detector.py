@@ -0,0 +1,138 @@
+# stall_detector.py
+# GUI freeze watchdog. A QTimer on the GUI thread beats every HEARTBEAT_MS; a helper thread
+# notices when the beats stop, samples the GUI thread's stack (sys._current_frames) until they
+# resume, and writes one report per stall naming the slot that held the event loop.
+# Opt-in: python main.py --stall-report [--stall-threshold-ms 250] [--stall-log stall_report.log]
+
+import collections
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+
+from PySide6.QtCore import QObject, QTimer
+
+HEARTBEAT_MS = 50
+DEFAULT_THRESHOLD_MS = 250
+SAMPLE_INTERVAL_MS = 10
+TOP_STACKS = 5
+# Rolling report: at most REPORT_MAX_BYTES per file, REPORT_BACKUPS old files kept
+REPORT_MAX_BYTES = 1_000_000
+REPORT_BACKUPS = 3
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_name(code):
+    # co_qualname (3.11+) gives 'LibrarianMainWidget.handle_tab_change' rather than just the method
+    return getattr(code, 'co_qualname', code.co_name)
+
+
+def _app_stack(frame):
+    """The GUI thread's stack as (location, name, filename) tuples, outermost first, starting at
+    the first frame below the event loop (the slot Qt called)."""
+    frames = list(traceback.walk_stack(frame))[::-1]
+    # Frames up to and including the one that called app.exec() are the same in every sample
+    start = 0
+    for i, (f, _) in enumerate(frames):
+        if f.f_code.co_name == '<module>':
+            start = i + 1
+    return [(f"{os.path.basename(f.f_code.co_filename)}:{lineno}", _frame_name(f.f_code), f.f_code.co_filename)
+            for f, lineno in frames[start:]]
+
+
+def attribute_slot(stack):
+    """The slot a stalled stack belongs to: its outermost application frame that is not a lambda."""
+    for location, name, filename in stack:
+        if filename.startswith(APP_DIR) and not name.endswith('<lambda>'):
+            return name
+    return stack[0][1] if stack else "<event loop>"
+
+
+class StallDetector(QObject):
+    """Detects GUI-thread stalls above threshold_ms and logs a sampled profile of each one."""
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, report_path='stall_report.log', parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.totals = collections.defaultdict(lambda: [0, 0.0, 0.0])  # slot -> [stalls, total s, worst s]
+
+        self.report = logging.getLogger('smartlibrary.stalls')
+        self.report.setLevel(logging.INFO)
+        self.report.propagate = False
+        self.handler = logging.handlers.RotatingFileHandler(
+            report_path, maxBytes=REPORT_MAX_BYTES, backupCount=REPORT_BACKUPS, encoding='utf-8')
+        self.handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        self.report.addHandler(self.handler)
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(HEARTBEAT_MS)
+        self.heartbeat.timeout.connect(self.beat)
+        self.stopping = threading.Event()
+        self.watchdog = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        """Must be called on the GUI thread."""
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.heartbeat.start()
+        self.watchdog.start()
+        self.report.info(f"watchdog started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        self.heartbeat.stop()
+        self.stopping.set()
+        if self.watchdog.is_alive():
+            self.watchdog.join(timeout=1)
+        for slot, (stalls, total, worst) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            self.report.info(f"SUMMARY {slot}: {stalls} stall(s), {total * 1000:.0f} ms total, "
+                             f"worst {worst * 1000:.0f} ms")
+        self.report.removeHandler(self.handler)
+        self.handler.close()
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+
+    def _watch(self):
+        interval = SAMPLE_INTERVAL_MS / 1000
+        while not self.stopping.wait(interval):
+            stalled_since = self.last_beat
+            # The timer itself is allowed HEARTBEAT_MS; anything beyond threshold is a stall
+            if time.monotonic() - stalled_since < self.threshold + HEARTBEAT_MS / 1000:
+                continue
+
+            samples = collections.Counter()
+            while self.last_beat == stalled_since and not self.stopping.is_set():
+                frame = sys._current_frames().get(self.gui_thread_id)
+                if frame is not None:
+                    samples[tuple(_app_stack(frame))] += 1
+                del frame
+                time.sleep(interval)
+            # Gap between the last beat before the stall and the first one after it
+            end = self.last_beat if self.last_beat != stalled_since else time.monotonic()
+            self._write_report(end - stalled_since, samples)
+
+    def _write_report(self, duration, samples):
+        total = sum(samples.values())
+        if not total:
+            return
+        by_slot = collections.Counter()
+        for stack, count in samples.items():
+            by_slot[attribute_slot(stack)] += count
+        slot = by_slot.most_common(1)[0][0]
+
+        stats = self.totals[slot]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+
+        lines = [f"STALL {duration * 1000:.0f} ms in {slot} ({total} samples)"]
+        for stack, count in samples.most_common(TOP_STACKS):
+            path = " > ".join(f"{name} ({location})" for location, name, _ in stack)
+            lines.append(f"    {count * 100 / total:5.1f}%  {path}")
+        self.report.info("\n".join(lines))
@@ -0,0 +1,84 @@
+# test_bulk_weeding.py
+# Weeds a handful of throwaway books in one call and checks the per-book report and author cleanup.
+
+import time
+
+from db_connector import get_db_connector
+from book_dao import BookDAO
+from loan_dao import LoanDAO
+
+
+def author_exists(connector, author_id):
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM Author WHERE author_id = %s);", (author_id,))
+            return cursor.fetchone()[0]
+    finally:
+        connector.putconn(conn)
+
+
+def run_bulk_weeding_tests():
+    """Tests that bulk weeding deletes, skips books on loan, reports missing ids and removes orphaned authors."""
+    print("--- 📚 SmartLibrary Bulk Weeding Test Script ---")
+
+    # NOTE: the member ID relies on the sample data (see test_loan_workflow.py).
+    TEST_MEMBER_ID = 4
+
+    connector = get_db_connector()
+    book_dao = BookDAO()
+    loan_dao = LoanDAO()
+    try:
+        # Throwaway books sharing one new author
+        stamp = int(time.time())
+        author_id = book_dao.add_author("Weeding", f"Test{stamp}")
+        books = [book_dao.add_book(f"Weeding Test {stamp} #{n}", None, 1901, 1, [author_id]) for n in range(3)]
+        book_ids = [book.book_id for book in books]
+        success, loan_id = loan_dao.create_loan(book_ids[0], TEST_MEMBER_ID)
+        if not success:
+            print(f"⚠️ SKIPPED: Checkout rejected ({loan_id}).")
+            book_dao.weed_books(book_ids)
+            return
+
+        # --- Test 1: One call, batch size 2, mixed outcomes ---
+        print(f"\n--- 1. Weeding books {book_ids} and a missing ID (Book {book_ids[0]} is on loan) ---")
+        result = book_dao.weed_books(book_ids + [-1], batch_size=2)
+        statuses = {book.book_id: book.status for book in result['report']}
+        expected = {book_ids[0]: 'ACTIVE_LOANS', book_ids[1]: 'WEEDED', book_ids[2]: 'WEEDED', -1: 'NOT_FOUND'}
+        if statuses == expected and result['weeded'] == 2:
+            print("✅ SUCCESS: 2 weeded, 1 skipped for its active loan, 1 reported missing.")
+        else:
+            print(f"❌ FAILURE: Report was {statuses}, expected {expected}.")
+
+        # --- Test 2: The author still has a book, so stays ---
+        print("\n--- 2. Author of a remaining book (Should stay) ---")
+        if author_exists(connector, author_id) and result['authors_removed'] == 0:
+            print(f"✅ SUCCESS: Author ID {author_id} kept.")
+        else:
+            print(f"❌ FAILURE: Author ID {author_id} was removed while a book remains.")
+
+        # --- Test 3: Weeding the last book removes the orphaned author ---
+        print(f"\n--- 3. Returning the loan and weeding Book {book_ids[0]} ---")
+        loan_dao.return_loan(loan_id)
+        result = book_dao.weed_books([book_ids[0]])
+        if result['weeded'] == 1 and result['authors_removed'] == 1 and not author_exists(connector, author_id):
+            print(f"✅ SUCCESS: Book weeded and Author ID {author_id} removed with it.")
+        else:
+            print(f"❌ FAILURE: Result was {result}.")
+
+        # --- Test 4: The loan keeps its title in the member's history ---
+        print("\n--- 4. Loan history of the weeded book ---")
+        history = loan_dao.get_member_loan_history(TEST_MEMBER_ID, limit=50)
+        titles = [loan['title'] for loan in history if loan['loan_id'] == loan_id]
+        if titles == [books[0].title]:
+            print(f"✅ SUCCESS: History still shows '{titles[0]}'.")
+        else:
+            print(f"❌ FAILURE: History shows {titles} for loan {loan_id}.")
+    finally:
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_bulk_weeding_tests()
@@ -0,0 +1,104 @@
+# test_catalog_snapshot.py
+# Builds an offline catalog snapshot from the database and checks it against BookDAO, then
+# syncs a change and browses with the database connection closed.
+
+import os
+import tempfile
+import time
+
+from db_connector import get_db_connector
+from book_dao import BookDAO
+from catalog_snapshot import OfflineCatalog
+
+
+def same_books(left, right):
+    return [(b['book_id'], b['available_copies']) for b in left] == \
+           [(b['book_id'], b['available_copies']) for b in right]
+
+
+def run_catalog_snapshot_tests():
+    """Tests snapshot parity with the live catalog, delta sync and outage browsing."""
+    print("--- 📚 SmartLibrary Offline Catalog Test Script ---")
+
+    book_dao = BookDAO()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'catalog.snapshot')
+    catalog = OfflineCatalog(path, book_dao)
+
+    # --- Test 1: A fresh snapshot lists exactly what BookDAO lists ---
+    print("\n--- 1. Building a snapshot and comparing the first page ---")
+    start = time.perf_counter()
+    catalog.rebuild()
+    print(f"   Snapshot of {len(catalog):,} books written in {time.perf_counter() - start:.2f} s")
+    if same_books(catalog.get_books_page(100), book_dao.get_books_page(100)):
+        print("✅ SUCCESS: First catalog page matches get_books_page.")
+    else:
+        print("❌ FAILURE: Snapshot page differs from the live catalog.")
+
+    first = catalog.get_books_page(1)
+    if not first:
+        print("⚠️ SKIPPED: The catalog is empty; nothing more to test.")
+        get_db_connector().close_connection()
+        return
+    book = first[0]
+
+    # --- Test 2: Search agrees with search_books ---
+    term = book['title'][:4]
+    print(f"\n--- 2. Searching for '{term}' ---")
+    if same_books(catalog.search_books(term), book_dao.search_books(term)):
+        print("✅ SUCCESS: Snapshot search matches search_books.")
+    else:
+        print("❌ FAILURE: Snapshot search differs from search_books.")
+
+    # --- Test 3: A change made after the snapshot arrives with sync() ---
+    print(f"\n--- 3. Changing book {book['book_id']} and syncing ---")
+    connector = get_db_connector()
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE Book SET publication_year = COALESCE(publication_year, 2000) + 1 "
+                           "WHERE book_id = %s RETURNING publication_year;", (book['book_id'],))
+            new_year = cursor.fetchone()[0]
+            conn.commit()
+    finally:
+        connector.putconn(conn)
+    try:
+        changed = catalog.sync()
+        synced = catalog.get_book_details(book['book_id'])
+        if changed >= 1 and synced['year'] == new_year:
+            print(f"✅ SUCCESS: {changed} change(s) fetched; book {book['book_id']} now shows {new_year}.")
+        else:
+            print(f"❌ FAILURE: Sync fetched {changed} change(s); book shows {synced['year']}, expected {new_year}.")
+    finally:
+        conn = connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("UPDATE Book SET publication_year = %s WHERE book_id = %s;",
+                               (book['year'], book['book_id']))
+                conn.commit()
+        finally:
+            connector.putconn(conn)
+
+    # --- Test 4: Browsing keeps working with no database ---
+    print("\n--- 4. Browsing with the database connection closed ---")
+    connector.close_connection()
+    reopened = OfflineCatalog(path, book_dao)
+    start = time.perf_counter()
+    page = reopened.get_books_page(100)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    if page and reopened.search_books(term):
+        print(f"✅ SUCCESS: First page ({len(page)} books) read from the snapshot in {elapsed_ms:.1f} ms, offline.")
+    else:
+        print("❌ FAILURE: The snapshot could not be browsed offline.")
+    try:
+        reopened.sync()
+        print("❌ FAILURE: sync() succeeded with the connection closed.")
+    except Exception:
+        print("✅ SUCCESS: sync() failed cleanly and the catalog is marked offline."
+              if reopened.online is False else "❌ FAILURE: catalog not marked offline.")
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_catalog_snapshot_tests()
@@ -0,0 +1,81 @@
+# test_hold_queue.py
+
+from loan_dao import LoanDAO
+from hold_dao import HoldDAO
+from book_dao import BookDAO
+from db_connector import get_db_connector
+
+
+def run_hold_tests():
+    """Tests the hold queue: place, allocate on return, checkout of a reserved copy, cancel."""
+
+    # NOTE: These IDs rely on the sample data you inserted into the database.
+    # Book ID 9 should have exactly 1 copy; Members 4, 5 and 6 must have room for a loan.
+    TEST_BOOK_ID = 9
+    BORROWER_ID = 4
+    FIRST_HOLDER_ID = 5
+    SECOND_HOLDER_ID = 6
+
+    loan_dao = LoanDAO()
+    hold_dao = HoldDAO()
+    book_dao = BookDAO()
+
+    print("--- 📚 SmartLibrary Hold Queue Test Script ---")
+
+    # --- Test 1: Borrow the only copy ---
+    print(f"\n--- 1. Member {BORROWER_ID} borrows the last copy of Book ID {TEST_BOOK_ID} ---")
+    success, loan_id = loan_dao.create_loan(TEST_BOOK_ID, BORROWER_ID)
+    if success:
+        print(f"✅ SUCCESS: Loan {loan_id} created. Available copies: {book_dao.get_book_availability(TEST_BOOK_ID)}")
+    else:
+        print(f"❌ FAILURE: Loan rejected. Reason: {loan_id}")
+        get_db_connector().close_connection()
+        return
+
+    # --- Test 2: Queue two members (FIFO) ---
+    print("\n--- 2. Two members place holds ---")
+    first_hold = hold_dao.place_hold(TEST_BOOK_ID, FIRST_HOLDER_ID)
+    second_hold = hold_dao.place_hold(TEST_BOOK_ID, SECOND_HOLDER_ID)
+    print(f"✅ SUCCESS: Holds {first_hold} and {second_hold} placed.")
+
+    # --- Test 3: Duplicate hold is rejected ---
+    print("\n--- 3. Duplicate hold (Should Fail) ---")
+    try:
+        hold_dao.place_hold(TEST_BOOK_ID, FIRST_HOLDER_ID)
+        print("❌ FAILURE: Duplicate hold was allowed.")
+    except Exception as e:
+        print(f"✅ SUCCESS: Duplicate hold rejected. Reason: {e}")
+
+    # --- Test 4: Return allocates the copy to the first holder, not the shelf ---
+    print(f"\n--- 4. Returning Loan {loan_id} ---")
+    loan_dao.process_return(loan_id)
+    available = book_dao.get_book_availability(TEST_BOOK_ID)
+    if available == 0 and hold_dao.has_ready_hold(TEST_BOOK_ID, FIRST_HOLDER_ID):
+        print(f"✅ SUCCESS: Copy reserved for Member {FIRST_HOLDER_ID}; shelf count stays 0.")
+    else:
+        print(f"❌ FAILURE: Expected a READY hold for Member {FIRST_HOLDER_ID} (available={available}).")
+
+    # --- Test 5: Second holder cannot take the reserved copy ---
+    print(f"\n--- 5. Member {SECOND_HOLDER_ID} tries to check out the reserved copy (Should Fail) ---")
+    success, result = loan_dao.create_loan(TEST_BOOK_ID, SECOND_HOLDER_ID)
+    print(("❌ FAILURE: Reserved copy was handed out." if success
+           else f"✅ SUCCESS: Checkout rejected. Reason: {result}"))
+
+    # --- Test 6: First holder collects ---
+    print(f"\n--- 6. Member {FIRST_HOLDER_ID} collects the reserved copy ---")
+    success, held_loan_id = loan_dao.create_loan(TEST_BOOK_ID, FIRST_HOLDER_ID)
+    print((f"✅ SUCCESS: Loan {held_loan_id} created from hold." if success
+           else f"❌ FAILURE: Holder could not collect. Reason: {held_loan_id}"))
+
+    # --- Cleanup: cancel the second hold and return the loan ---
+    hold_dao.cancel_hold(second_hold, SECOND_HOLDER_ID)
+    if success:
+        loan_dao.process_return(held_loan_id)
+    print(f"\nCleanup done. Available copies: {book_dao.get_book_availability(TEST_BOOK_ID)}")
+
+    print("\n--- Testing Complete ---")
+    get_db_connector().close_connection()
+
+
+if __name__ == '__main__':
+    run_hold_tests()
@@ -0,0 +1,74 @@
+# test_loan_history.py
+# Pages through a member's loan history and checks it against a plain query.
+
+from db_connector import get_db_connector
+from loan_dao import LoanDAO
+
+
+def run_loan_history_tests():
+    """Tests that keyset pages cover the whole history, newest first, with no gaps or repeats."""
+    print("--- 📚 SmartLibrary Loan History Test Script ---")
+
+    # NOTE: uses the member with the most loans.
+    connector = get_db_connector()
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT member_id FROM Loan GROUP BY member_id ORDER BY COUNT(*) DESC LIMIT 1;
+            """)
+            record = cursor.fetchone()
+            member_id = record[0] if record else None
+            # Archived loans are part of the history too
+            cursor.execute("SELECT to_regclass('loanhistory') IS NOT NULL;")
+            loans = "LoanHistory" if cursor.fetchone()[0] else "Loan"
+            cursor.execute(f"""
+                SELECT loan_id FROM {loans} WHERE member_id = %s ORDER BY loan_date DESC, loan_id DESC;
+            """, (member_id,))
+            expected = [row[0] for row in cursor.fetchall()]
+    finally:
+        connector.putconn(conn)
+    if member_id is None:
+        print("⚠️ SKIPPED: There are no loans.")
+        connector.close_connection()
+        return
+
+    loan_dao = LoanDAO()
+    try:
+        # --- Test 1: Small pages walk the whole history in order ---
+        print(f"\n--- 1. Paging member {member_id}'s {len(expected)} loan(s), 2 at a time ---")
+        seen, before, pages = [], None, 0
+        while True:
+            page = loan_dao.get_member_loan_history(member_id, before, limit=2)
+            if not page:
+                break
+            pages += 1
+            seen.extend(loan['loan_id'] for loan in page)
+            before = (page[-1]['loan_date'], page[-1]['loan_id'])
+        if seen == expected:
+            print(f"✅ SUCCESS: {pages} page(s) returned every loan exactly once, newest first.")
+        else:
+            print(f"❌ FAILURE: Pages returned {seen[:10]}..., expected {expected[:10]}...")
+
+        # --- Test 2: Rows carry the book title ---
+        print("\n--- 2. First page has titles ---")
+        first = loan_dao.get_member_loan_history(member_id)
+        if first and all(loan['title'] for loan in first):
+            print(f"✅ SUCCESS: Newest loan is '{first[0]['title']}' ({first[0]['loan_date']}).")
+        else:
+            print("❌ FAILURE: History rows are missing titles.")
+
+        # --- Test 3: An unknown member has an empty history ---
+        print("\n--- 3. Unknown member (Should be empty) ---")
+        if loan_dao.get_member_loan_history(-1) == []:
+            print("✅ SUCCESS: No rows for an unknown member.")
+        else:
+            print("❌ FAILURE: Rows returned for an unknown member.")
+    finally:
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_loan_history_tests()
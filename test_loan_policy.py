@@ -0,0 +1,98 @@
+# test_loan_policy.py
+# Checks that checkout and renewal follow the member's LoanPolicy and that the cache agrees with the database.
+
+from datetime import date, timedelta
+
+from db_connector import get_db_connector
+from loan_dao import LoanDAO
+from loan_policy_dao import LoanPolicyDAO, get_loan_policies, ANY
+from member_dao import MemberDAO
+from member_management_dao import MemberManagementDAO
+
+
+def loan_due_date(connector, loan_id):
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT due_date FROM Loan WHERE loan_id = %s;", (loan_id,))
+            return cursor.fetchone()[0]
+    finally:
+        connector.putconn(conn)
+
+
+def run_loan_policy_tests():
+    """Tests policy lookup, the per-category loan period and renewal limits."""
+    print("--- 📚 SmartLibrary Loan Policy Test Script ---")
+
+    # NOTE: These IDs rely on the sample data (see test_loan_workflow.py).
+    # The member is moved to STUDENT for the test and back to their category at the end.
+    TEST_MEMBER_ID = 4
+    TEST_BOOK_ID = 7
+
+    connector = get_db_connector()
+    loan_dao = LoanDAO()
+    policy_dao = LoanPolicyDAO()
+    management_dao = MemberManagementDAO()
+    original_category = MemberDAO().get_member_details(TEST_MEMBER_ID).category
+    loan_id = None
+    try:
+        management_dao.set_member_category(TEST_MEMBER_ID, 'STUDENT')
+
+        # --- Test 1: The cache picks the same policy as loan_policy_for() ---
+        print("\n--- 1. Resolving the STUDENT policy ---")
+        expected = policy_dao.get_policy_for_loan(TEST_BOOK_ID, TEST_MEMBER_ID)
+        cached = get_loan_policies().policy_for('STUDENT', 'STANDARD')
+        if dict(cached) == dict(expected):
+            print(f"✅ SUCCESS: {expected['max_loans']} loans, {expected['loan_period_days']} days, "
+                  f"{expected['max_renewals']} renewal(s).")
+        else:
+            print(f"❌ FAILURE: Cache has {dict(cached)}, database has {dict(expected)}.")
+
+        # --- Test 2: Checkout uses the policy's loan period ---
+        print(f"\n--- 2. Checking out Book ID {TEST_BOOK_ID} as a STUDENT ---")
+        success, loan_id = loan_dao.create_loan(TEST_BOOK_ID, TEST_MEMBER_ID)
+        if not success:
+            print(f"⚠️ SKIPPED: Checkout rejected ({loan_id}).")
+            loan_id = None
+            return
+        due_date = loan_due_date(connector, loan_id)
+        if due_date == date.today() + timedelta(days=expected['loan_period_days']):
+            print(f"✅ SUCCESS: Due {due_date}.")
+        else:
+            print(f"❌ FAILURE: Due {due_date}, expected {expected['loan_period_days']} days from today.")
+
+        # --- Test 3: Renewals stop at max_renewals ---
+        print(f"\n--- 3. Renewing {expected['max_renewals'] + 1} time(s) (Last should fail) ---")
+        renewed = 0
+        for _ in range(expected['max_renewals'] + 1):
+            try:
+                loan_dao.renew_loan(loan_id)
+                renewed += 1
+            except Exception as e:
+                print(f"   Refused: {e}")
+                break
+        extended = loan_due_date(connector, loan_id)
+        if renewed == expected['max_renewals'] and \
+                extended == due_date + timedelta(days=renewed * expected['loan_period_days']):
+            print(f"✅ SUCCESS: Renewed {renewed} time(s), now due {extended}.")
+        else:
+            print(f"⚠️ WARNING: Renewed {renewed} time(s), due {extended} (a WAITING hold also blocks renewal).")
+
+        # --- Test 4: The default policy cannot be removed ---
+        print("\n--- 4. Deleting the '*' / '*' policy (Should fail) ---")
+        try:
+            policy_dao.delete_policy(ANY, ANY)
+            print("❌ FAILURE: The default policy was deleted.")
+        except Exception as e:
+            print(f"✅ SUCCESS: Rejected. Reason: {e}")
+    finally:
+        if loan_id is not None:
+            loan_dao.return_loan(loan_id)
+        management_dao.set_member_category(TEST_MEMBER_ID, original_category)
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_loan_policy_tests()
@@ -0,0 +1,102 @@
+# test_notification_dispatcher.py
+# Plans and sends loan notices into a local SMTP sink (requires aiosmtpd and aiosmtplib).
+
+import asyncio
+import datetime
+
+from aiosmtpd.controller import Controller
+
+from db_connector import get_db_connector
+from notification_dispatcher import NotificationDispatcher, DUE_SOON_DAYS
+
+SINK_HOST = '127.0.0.1'
+SINK_PORT = 8025
+
+
+class SinkHandler:
+    """aiosmtpd handler that keeps every accepted message in memory."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode('utf-8', errors='replace')))
+        return '250 OK'
+
+
+def start_sink(port=SINK_PORT):
+    handler = SinkHandler()
+    controller = Controller(handler, hostname=SINK_HOST, port=port)
+    controller.start()
+    return controller, handler
+
+
+def run_notification_tests():
+    """Tests planning idempotency and delivery of a due-soon reminder."""
+    print("--- 📚 SmartLibrary Notification Dispatcher Test Script ---")
+
+    # NOTE: needs at least one open loan whose member has an email address.
+    connector = get_db_connector()
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT l.due_date, u.email, b.title
+                FROM Loan l JOIN "User" u ON u.user_id = l.member_id JOIN Book b ON b.book_id = l.book_id
+                WHERE l.return_date IS NULL AND u.email IS NOT NULL AND u.email <> ''
+                ORDER BY l.loan_id DESC LIMIT 1;
+            """)
+            record = cursor.fetchone()
+    finally:
+        connector.putconn(conn)
+    if record is None:
+        print("⚠️ SKIPPED: No open loan belongs to a member with an email address.")
+        connector.close_connection()
+        return
+
+    due_date, email, title = record
+    # Pretend tonight is DUE_SOON_DAYS before that loan's due date
+    run_date = due_date - datetime.timedelta(days=DUE_SOON_DAYS)
+    controller, sink = start_sink()
+    dispatcher = NotificationDispatcher(concurrency=4, smtp_config={'host': SINK_HOST, 'port': SINK_PORT})
+
+    try:
+        # --- Test 1: Planning queues the reminder ---
+        print(f"\n--- 1. Planning notices for {run_date} ---")
+        queued = dispatcher.plan(run_date)
+        print(f"✅ SUCCESS: {queued} notification(s) queued." if queued else
+              "⚠️ Nothing new queued (already planned for this date?).")
+
+        # --- Test 2: Re-planning the same night is a no-op ---
+        print("\n--- 2. Planning the same night again (Should queue 0) ---")
+        again = dispatcher.plan(run_date)
+        if again == 0:
+            print("✅ SUCCESS: Idempotency key prevented duplicates.")
+        else:
+            print(f"❌ FAILURE: {again} duplicate notification(s) queued.")
+
+        # --- Test 3: Sending delivers the reminder to the sink ---
+        print("\n--- 3. Dispatching to the local SMTP sink ---")
+        summary = asyncio.run(dispatcher.dispatch())
+        delivered = [content for recipients, content in sink.messages if email in recipients]
+        if delivered and title in delivered[0]:
+            print(f"✅ SUCCESS: {summary['sent']} sent; reminder for '{title}' reached {email}.")
+        else:
+            print(f"❌ FAILURE: No reminder for {email} reached the sink ({summary}).")
+
+        # --- Test 4: A second dispatch sends nothing ---
+        print("\n--- 4. Dispatching again (Should send 0) ---")
+        summary = asyncio.run(dispatcher.dispatch())
+        if summary['sent'] == 0:
+            print("✅ SUCCESS: Sent notifications are not re-sent.")
+        else:
+            print(f"❌ FAILURE: {summary['sent']} notification(s) sent twice.")
+    finally:
+        controller.stop()
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_notification_tests()
@@ -0,0 +1,132 @@
+# test_pgbouncer_mode.py
+# Runs the DAO layer through a local PgBouncer in transaction mode (see local_pgbouncer.py).
+# Requires the pgbouncer binary; the database in db_connector.DB_CONFIG must be reachable.
+
+import threading
+
+import psycopg2
+
+import db_connector
+from db_connector import DB_CONFIG, get_db_connector
+from local_pgbouncer import LocalPgBouncer
+from book_dao import BookDAO
+from fine_engine import FineEngine
+from loan_dao import LoanDAO
+from member_dao import MemberDAO
+
+SERVER_CONNECTIONS = 4
+CLIENT_THREADS = 40
+ROUNDS_PER_THREAD = 25
+
+
+def count_server_backends():
+    """Client backends on the library database, counted over a direct (non-pooled) connection."""
+    conn = psycopg2.connect(host=DB_CONFIG["host"], port=DB_CONFIG["port"], database=DB_CONFIG["database"],
+                            user=DB_CONFIG["user"], password=DB_CONFIG["password"])
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM pg_stat_activity
+                WHERE datname = %s AND backend_type = 'client backend' AND pid <> pg_backend_pid();
+            """, (DB_CONFIG["database"],))
+            return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run_pgbouncer_tests():
+    """Session state is refused, DAO transactions work, and 40 clients share a handful of server connections."""
+    print("--- 📚 SmartLibrary Transaction Pooling Test Script ---")
+    baseline = count_server_backends()
+
+    with LocalPgBouncer(server_connections=SERVER_CONNECTIONS):
+        db_connector.POOLER_CONFIG["enabled"] = True
+        db_connector.POOL_CONFIG["max_connections"] = CLIENT_THREADS
+        connector = get_db_connector()
+        book_dao = BookDAO()
+        member_dao = MemberDAO()
+        loan_dao = LoanDAO(book_dao)
+
+        # --- Test 1: Session-level statements are refused before they reach the pooler ---
+        print("\n--- 1. Session-level SET (Should Fail) ---")
+        conn = connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET statement_timeout = 1000;")
+            print("❌ FAILURE: Session-level SET was allowed.")
+        except Exception as e:
+            print(f"✅ SUCCESS: Refused. Reason: {e}")
+        finally:
+            connector.putconn(conn)
+
+        # --- Test 2: Transaction-scoped settings still work ---
+        print("\n--- 2. SET LOCAL and a server-side cursor (stream_search_books) ---")
+        rows = book_dao.stream_search_books("the", lambda batch: True)
+        print(f"✅ SUCCESS: Streamed {rows} rows through the pooler.")
+
+        # --- Test 3: ON COMMIT DROP temp table (fine accrual) ---
+        print("\n--- 3. Fine accrual pass (temp staging table) ---")
+        summary = FineEngine().run()
+        print(f"✅ SUCCESS: Accrual ran through the pooler: {summary}")
+
+        # --- Test 4: Checkout and return, each its own transaction ---
+        print("\n--- 4. Checkout and return through the pooler ---")
+        conn = connector.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT member_id FROM Member WHERE current_loans = 0 LIMIT 1;")
+                member = cursor.fetchone()
+                cursor.execute("SELECT book_id FROM Book WHERE available_copies > 1 LIMIT 1;")
+                book = cursor.fetchone()
+        finally:
+            connector.putconn(conn)
+        if member and book:
+            loan_id = loan_dao.process_checkout(book[0], member[0])
+            fine = loan_dao.process_return(loan_id)
+            print(f"✅ SUCCESS: Loan {loan_id} checked out and returned (fine ${fine}).")
+        else:
+            print("⚠️ SKIPPED: Needs a member with no loans and a book with 2+ copies on the shelf.")
+
+        # --- Test 5: Many clients, few server connections ---
+        print(f"\n--- 5. {CLIENT_THREADS} concurrent clients over {SERVER_CONNECTIONS} server connections ---")
+        errors = []
+        peak = [0]
+        done = threading.Event()
+
+        def client(index):
+            try:
+                for _ in range(ROUNDS_PER_THREAD):
+                    book_dao.get_books_page(20, index * 20)
+                    member_dao.get_member_loan_count(member[0] if member else 0)
+            except Exception as e:
+                errors.append(e)
+
+        def monitor():
+            while not done.is_set():
+                peak[0] = max(peak[0], count_server_backends() - baseline)
+                done.wait(0.05)
+
+        watcher = threading.Thread(target=monitor)
+        watcher.start()
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(CLIENT_THREADS)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        done.set()
+        watcher.join()
+
+        if errors:
+            print(f"❌ FAILURE: {len(errors)} client error(s), e.g. {errors[0]}")
+        elif peak[0] <= SERVER_CONNECTIONS:
+            print(f"✅ SUCCESS: Peak of {peak[0]} new server connection(s) for {CLIENT_THREADS} clients.")
+        else:
+            print(f"❌ FAILURE: {peak[0]} server connections opened; the pooler allows {SERVER_CONNECTIONS}.")
+
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_pgbouncer_tests()
@@ -0,0 +1,83 @@
+# test_popularity.py
+# Checks that a checkout moves the rolling popularity counters and that rolling is idempotent.
+
+from db_connector import get_db_connector
+from loan_dao import LoanDAO
+from popularity_dao import PopularityDAO, POPULARITY_WINDOWS
+
+
+def window_count(connector, window, book_id):
+    conn = connector.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT checkouts FROM BookPopularity WHERE window_name = %s AND book_id = %s;",
+                           (window, book_id))
+            record = cursor.fetchone()
+            return record[0] if record else 0
+    finally:
+        connector.putconn(conn)
+
+
+def run_popularity_tests():
+    """Tests counter maintenance on checkout, top-N reads and window rolling."""
+    print("--- 📚 SmartLibrary Popularity Counter Test Script ---")
+
+    # NOTE: These IDs rely on the sample data (see test_loan_workflow.py).
+    # The checkout is returned at the end, but it stays counted: it happened.
+    TEST_MEMBER_ID = 4
+    TEST_BOOK_ID = 7
+
+    connector = get_db_connector()
+    loan_dao = LoanDAO()
+    popularity_dao = PopularityDAO()
+    try:
+        # --- Test 1: A checkout counts in every window ---
+        print(f"\n--- 1. Checking out Book ID {TEST_BOOK_ID} ---")
+        before = {window: window_count(connector, window, TEST_BOOK_ID) for window in POPULARITY_WINDOWS}
+        success, loan_id = loan_dao.create_loan(TEST_BOOK_ID, TEST_MEMBER_ID)
+        if not success:
+            print(f"⚠️ SKIPPED: Checkout rejected ({loan_id}).")
+            return
+        after = {window: window_count(connector, window, TEST_BOOK_ID) for window in POPULARITY_WINDOWS}
+        if all(after[window] == before[window] + 1 for window in POPULARITY_WINDOWS):
+            print(f"✅ SUCCESS: Counters moved {before} -> {after}.")
+        else:
+            print(f"❌ FAILURE: Counters {before} -> {after}, expected +1 each.")
+
+        # --- Test 2: Top-N reads the counters ---
+        print("\n--- 2. Top 10 of the day ---")
+        top = popularity_dao.get_top_books('day', 10)
+        counts = [book['checkouts'] for book in top]
+        if top and counts == sorted(counts, reverse=True):
+            print(f"✅ SUCCESS: #1 today is '{top[0]['title']}' with {top[0]['checkouts']} checkout(s).")
+        else:
+            print(f"❌ FAILURE: Unexpected top list: {top}")
+
+        # --- Test 3: Rolling twice changes nothing the second time ---
+        print("\n--- 3. Rolling the windows twice (Second roll should be a no-op) ---")
+        popularity_dao.roll_windows()
+        settled = {window: window_count(connector, window, TEST_BOOK_ID) for window in POPULARITY_WINDOWS}
+        rolled_again = popularity_dao.roll_windows()
+        if rolled_again == 0 and settled == {window: window_count(connector, window, TEST_BOOK_ID)
+                                             for window in POPULARITY_WINDOWS}:
+            print("✅ SUCCESS: Rolling is idempotent; today's checkout is still counted.")
+        else:
+            print(f"❌ FAILURE: Second roll moved {rolled_again} window(s).")
+
+        # --- Test 4: Unknown windows are rejected ---
+        print("\n--- 4. Unknown window (Should fail) ---")
+        try:
+            popularity_dao.get_top_books('year', 5)
+            print("❌ FAILURE: 'year' was accepted.")
+        except Exception as e:
+            print(f"✅ SUCCESS: Rejected. Reason: {e}")
+
+        loan_dao.return_loan(loan_id)
+    finally:
+        connector.close_connection()
+
+    print("\n--- Testing Complete ---")
+
+
+if __name__ == '__main__':
+    run_popularity_tests()
@@ -2,10 +2,11 @@
 
 import psycopg2
 from db_connector import get_db_connector
+from password_utility import check_password
 
 
 class UserDAO:
-    """Data Access Object for User and Role entities, using plain text password for dev."""
+    """Data Access Object for User and Role entities. Passwords are stored as bcrypt hashes."""
 
     def __init__(self):
         self.db_connector = get_db_connector()
@@ -40,15 +41,16 @@ class UserDAO:
         except psycopg2.Error as e:
             conn.rollback()
             raise e
+        finally:
+            self.db_connector.putconn(conn)
 
     def verify_login(self, username, password):
-        """Authenticates a user using simple text comparison."""
+        """Authenticates a user against their bcrypt hash (or plain text, until password_rehash.py has run)."""
         user_data = self.get_user_by_username(username)
 
         if user_data:
-            # Simple text comparison for development purposes
-            if password == user_data['password']:
+            if check_password(password, user_data['password']):
                 del user_data['password']  # Security best practice, remove password before returning
                 return user_data
 
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,71 @@
+# weed_books_dialog.py
+
+from datetime import date
+
+from PySide6.QtWidgets import (
+    QDialog, QFormLayout, QSpinBox, QCheckBox,
+    QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox
+)
+
+
+class WeedBooksDialog(QDialog):
+    """Collects the weeding criteria; the librarian widget previews and confirms the matches."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🧹 Weed Collection")
+        self.setFixedSize(420, 200)
+
+        self.result_data = None
+
+        main_layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        # Criteria: each one is optional, the chosen ones must all match
+        self.borrowed_check = QCheckBox("Not borrowed in (years):")
+        self.borrowed_check.setChecked(True)
+        self.years_input = QSpinBox()
+        self.years_input.setRange(1, 50)
+        self.years_input.setValue(5)
+        self.borrowed_check.toggled.connect(self.years_input.setEnabled)
+
+        self.published_check = QCheckBox("Published before:")
+        self.year_input = QSpinBox()
+        self.year_input.setRange(1000, date.today().year + 1)
+        self.year_input.setValue(date.today().year - 20)
+        self.year_input.setEnabled(False)
+        self.published_check.toggled.connect(self.year_input.setEnabled)
+
+        form_layout.addRow(self.borrowed_check, self.years_input)
+        form_layout.addRow(self.published_check, self.year_input)
+
+        main_layout.addLayout(form_layout)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.ok_button = QPushButton("Find Books")
+        self.cancel_button = QPushButton("Cancel")
+
+        self.ok_button.clicked.connect(self.accept_data)
+        self.cancel_button.clicked.connect(self.reject)
+
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(self.cancel_button)
+
+        main_layout.addLayout(button_layout)
+
+    def accept_data(self):
+        """Validate and collect the data."""
+        if not self.borrowed_check.isChecked() and not self.published_check.isChecked():
+            QMessageBox.warning(self, "Input Error", "Please choose at least one criterion.")
+            return
+
+        self.result_data = {
+            'not_borrowed_years': self.years_input.value() if self.borrowed_check.isChecked() else None,
+            'published_before': self.year_input.value() if self.published_check.isChecked() else None,
+        }
+
+        self.accept()
+
+    def get_data(self):
+        return self.result_data